@@ -0,0 +1,91 @@
+"""
+Batch Processing Entry Point
+Chấm điểm EAR/MAR/alert cho video đã ghi - không GUI, không âm thanh
+
+Ví dụ:
+    python batch_process.py clips/*.mp4 -o results/scores.npz
+    python batch_process.py clips/*.mp4 -o results/scores.npz --workers 8
+"""
+import argparse
+import sys
+import time
+
+from src.config import ConfigManager
+from src.offline import VideoScorer, ResultWriter, ParallelScorer
+
+
+def parse_args(argv=None):
+    """Đọc tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(
+        description="Headless drowsiness scoring for recorded video files")
+    parser.add_argument("videos", nargs="+", help="Video files to score")
+    parser.add_argument("-o", "--output", default="results/scores.npz",
+                        help="Output file (.npz columnar or .csv)")
+    parser.add_argument("-c", "--config", default="config/settings.json",
+                        help="Config file with thresholds")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes (1 = in-process, 0 = one per CPU)")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def run_sequential(args, writer: ResultWriter) -> int:
+    """Chấm điểm tuần tự trong process hiện tại, trả về số video lỗi"""
+    config = ConfigManager(args.config)
+    scorer = VideoScorer(config)
+    failed = 0
+
+    try:
+        for video_path in args.videos:
+            # Một video lỗi không dừng cả batch (giống ParallelScorer)
+            try:
+                result = scorer.score(video_path)
+            except Exception as e:
+                print(f"[Batch] Lỗi {video_path}: {e}")
+                failed += 1
+                continue
+
+            writer.write(result)
+            stats = result["stats"]
+            print(f"[Batch] {video_path}: {stats['frames']} frames, {stats['fps']:.1f} fps")
+    finally:
+        scorer.release()
+    return failed
+
+
+def run_parallel(args, writer: ResultWriter) -> int:
+    """Chấm điểm bằng process pool, trả về số video lỗi"""
+    # Đảm bảo file config tồn tại trước khi các worker cùng load
+    ConfigManager(args.config)
+
+    scorer = ParallelScorer(args.config, workers=args.workers or None)
+    worker_stats = scorer.run(args.videos, writer.write)
+
+    for pid, stats in sorted(worker_stats.items()):
+        print(f"[Batch] Worker {pid}: {stats['clips']} clips, {stats['frames']} frames, "
+              f"{stats['fps']:.1f} fps")
+
+    return len(scorer.errors)
+
+
+def main(argv=None):
+    """Hàm main - chấm điểm toàn bộ video"""
+    args = parse_args(argv)
+    start_time = time.perf_counter()
+
+    with ResultWriter(args.output, VideoScorer.COLUMNS) as writer:
+        if args.workers == 1:
+            failed = run_sequential(args, writer)
+        else:
+            failed = run_parallel(args, writer)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"[Batch] Xong {len(args.videos) - failed}/{len(args.videos)} video, "
+          f"{writer.rows_written} frames trong {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Benchmark Entry Point
+Đo latency từng stage của pipeline detection và throughput end-to-end
+
+Ví dụ:
+    python benchmark.py -o results/benchmark.json
+    python benchmark.py --video clips/driver.mp4 --iterations 500
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import types
+
+import cv2
+import numpy as np
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+from src.config import ConfigManager
+from src.detection import FaceDetector, MeshRenderer, MetricsProcessor
+from src.alert import AlertLevel
+from src.core import overlay
+
+
+# Độ phân giải chuẩn (width, height)
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+# Kích thước khung video mặc định của GUI - lưới được vẽ sau khi scale về đây
+DISPLAY_SIZE = (800, 600)
+
+STAGES = (
+    "process",
+    "get_landmarks",
+    "get_landmarks_key",
+    "process_metrics",
+    "detect_yawn",
+    "check_fatigue",
+    "detect_drowsiness",
+    "detect_blink",
+    "draw_mesh",
+    "draw_alert_box",
+)
+
+
+def parse_args(argv=None):
+    """Đọc tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(
+        description="Per-stage latency and throughput benchmark for the detection pipeline")
+    parser.add_argument("--video", help="Recorded video to use instead of synthetic frames "
+                        "(required for valid 'process' and end-to-end numbers)")
+    parser.add_argument("--iterations", type=int, default=300,
+                        help="Measured iterations per resolution")
+    parser.add_argument("--warmup", type=int, default=30,
+                        help="Unmeasured warm-up iterations per resolution")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS), help="Resolutions to run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data")
+    parser.add_argument("-c", "--config", default="config/settings.json",
+                        help="Config file with thresholds")
+    parser.add_argument("-o", "--output", default="results/benchmark.json",
+                        help="JSON output file")
+    return parser.parse_args(argv)
+
+
+def make_synthetic_results(rng: np.random.Generator):
+    """
+    Tạo kết quả giống MediaPipe (protobuf thật) để đo các stage sau detection
+    khi frame không có khuôn mặt
+    """
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y in zip(rng.uniform(0.3, 0.7, FaceDetector.NUM_LANDMARKS),
+                    rng.uniform(0.25, 0.75, FaceDetector.NUM_LANDMARKS)):
+        landmark_list.landmark.add(x=float(x), y=float(y), z=0.0)
+    return types.SimpleNamespace(multi_face_landmarks=[landmark_list])
+
+
+def load_frames(args, rng: np.random.Generator, max_frames: int = 120) -> list:
+    """Đọc frame từ video, hoặc sinh frame tổng hợp có seed cố định"""
+    if args.video:
+        cap = cv2.VideoCapture(args.video)
+        if not cap.isOpened():
+            raise IOError(f"Không mở được video: {args.video}")
+        frames = []
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise IOError(f"Video không có frame: {args.video}")
+        return frames
+
+    return [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(8)]
+
+
+def summarize(samples_ms: list) -> dict:
+    """Tính p50/p95/p99 (ms)"""
+    data = np.asarray(samples_ms, dtype=np.float64)
+    if data.size == 0:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {
+        "n": int(data.size),
+        "mean_ms": float(data.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def run_resolution(size, frames, detector, config, synthetic_results, args) -> dict:
+    """Chạy benchmark cho một độ phân giải"""
+    width, height = size
+    scaled = [cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+              for frame in frames]
+    # Cùng đường vẽ với DetectionEngine: scale về khung hiển thị rồi vẽ lưới lên đó
+    display_scale = min(DISPLAY_SIZE[0] / width, DISPLAY_SIZE[1] / height)
+    display_size = (max(1, int(width * display_scale)), max(1, int(height * display_scale)))
+    displayed = [cv2.resize(frame, display_size, interpolation=cv2.INTER_AREA)
+                 for frame in scaled]
+    work = np.empty_like(scaled[0])
+    display_work = np.empty_like(displayed[0])
+
+    processor = MetricsProcessor(config)
+    # Cùng đường vẽ với DetectionEngine (sprite render sẵn)
+    overlay_cache = overlay.OverlayCache()
+    samples = {name: [] for name in STAGES}
+    end_to_end = []
+    faces_found = 0
+
+    timer = time.perf_counter
+    total = args.warmup + args.iterations
+
+    for i in range(total):
+        frame = scaled[i % len(scaled)]
+        timestamp = i / 30.0
+        timings = {}
+
+        t_start = timer()
+        results = detector.process(frame)
+        t = timer()
+        timings["process"] = t - t_start
+
+        if results.multi_face_landmarks:
+            faces_found += i >= args.warmup
+        else:
+            results = synthetic_results
+
+        t0 = timer()
+        detector.get_landmarks(results, (height, width))
+        t1 = timer()
+        landmarks = detector.get_landmarks(results, (height, width), key_only=True)
+        t2 = timer()
+        timings["get_landmarks"] = t1 - t0
+        timings["get_landmarks_key"] = t2 - t1
+
+        left_eye, right_eye = detector.get_eye_landmarks(landmarks)
+        mouth = detector.get_mouth_landmarks(landmarks)
+
+        t0 = timer()
+        ear, mar = processor.process_metrics(left_eye, right_eye, mouth)
+        t1 = timer()
+        processor.detect_yawn(mar, timestamp)
+        t2 = timer()
+        processor.check_fatigue(timestamp)
+        t3 = timer()
+        processor.detect_drowsiness(ear, timestamp)
+        t4 = timer()
+        processor.detect_blink(ear, timestamp)
+        t5 = timer()
+        timings["process_metrics"] = t1 - t0
+        timings["detect_yawn"] = t2 - t1
+        timings["check_fatigue"] = t3 - t2
+        timings["detect_drowsiness"] = t4 - t3
+        timings["detect_blink"] = t5 - t4
+
+        # Vẽ lên bản sao để frame nguồn không bị thay đổi
+        np.copyto(work, frame)
+        np.copyto(display_work, displayed[i % len(displayed)])
+        t0 = timer()
+        points = detector.get_mesh_points(results, (height, width))
+        if points is not None:
+            detector.mesh_renderer.draw(display_work, points, display_scale)
+        MeshRenderer.draw_eyes(display_work, left_eye, right_eye, display_scale)
+        t1 = timer()
+        overlay_cache.draw_alert_box(work, AlertLevel.DROWSY)
+        t2 = timer()
+        timings["draw_mesh"] = t1 - t0
+        timings["draw_alert_box"] = t2 - t1
+
+        # End-to-end không tính thời gian copy frame
+        total_time = t2 - t_start - (t0 - t5)
+
+        if i >= args.warmup:
+            for name, value in timings.items():
+                samples[name].append(value * 1000.0)
+            end_to_end.append(total_time * 1000.0)
+
+    e2e = summarize(end_to_end)
+    e2e["fps"] = 1000.0 / e2e["mean_ms"] if e2e.get("mean_ms") else 0.0
+    stages = {name: summarize(values) for name, values in samples.items()}
+
+    # Không tìm thấy mặt (vd. frame tổng hợp): FaceMesh dừng sớm ở bước detect,
+    # "process" và end-to-end không phản ánh chi phí model thật
+    valid = faces_found > 0
+    stages["process"]["valid"] = valid
+    e2e["valid"] = valid
+    if not valid:
+        print(f"[Benchmark] Cảnh báo: không tìm thấy khuôn mặt ở {width}x{height} - "
+              "'process' và end-to-end không hợp lệ, dùng --video với clip có người lái")
+
+    return {
+        "width": width,
+        "height": height,
+        "face_found_ratio": faces_found / args.iterations if args.iterations else 0.0,
+        "stages": stages,
+        "end_to_end": e2e,
+    }
+
+
+def main(argv=None):
+    """Hàm main - chạy benchmark và ghi JSON"""
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+
+    config = ConfigManager(args.config)
+    frames = load_frames(args, rng)
+    synthetic_results = make_synthetic_results(rng)
+    detector = FaceDetector(mesh_level=config.get("display.mesh_level", "full"))
+
+    report = {
+        "meta": {
+            "source": args.video or "synthetic",
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "mesh_level": detector.mesh_renderer.level,
+            "display_size": list(DISPLAY_SIZE),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "mediapipe": getattr(mp, "__version__", "unknown"),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+
+    try:
+        for name in args.resolutions:
+            print(f"[Benchmark] Đang chạy {name}...")
+            report["results"][name] = run_resolution(
+                RESOLUTIONS[name], frames, detector, config, synthetic_results, args)
+    finally:
+        detector.release()
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in report["results"].items():
+        note = "" if result["end_to_end"]["valid"] else " (INVALID: no face found)"
+        print(f"[Benchmark] {name}: {result['end_to_end']['fps']:.1f} fps, "
+              f"p99 {result['end_to_end']['p99_ms']:.2f} ms{note}")
+    print(f"[Benchmark] Đã ghi kết quả: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
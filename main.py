@@ -3,11 +3,19 @@ Main Entry Point
 Hệ thống Cảnh báo Ngủ Khi Lái Xe
 """
 import sys
+import time
+
+_START_TIME = time.perf_counter()
+
 from PyQt5.QtWidgets import QApplication
 
+# Chỉ import GUI + config: cv2, mediapipe, pygame được EngineLoader import sau
+# khi cửa sổ đã hiện
 from src.config import ConfigManager
 from src.interface import MainWindow
 
+_IMPORT_TIME = time.perf_counter()
+
 
 def main():
     """Hàm main - khởi động ứng dụng"""
@@ -15,6 +23,7 @@ def main():
     print("HỆ THỐNG CẢNH BÁO NGỦ KHI LÁI XE")
     print("Driver Drowsiness Detection System")
     print("=" * 60)
+    print(f"\n[Main] Import GUI: {(_IMPORT_TIME - _START_TIME) * 1000:.0f}ms")
     
     # Khởi tạo ConfigManager
     config = ConfigManager()
@@ -28,6 +37,7 @@ def main():
     window = MainWindow(config)
     window.show()
     
+    print(f"[Main] Cửa sổ hiển thị sau {(time.perf_counter() - _START_TIME) * 1000:.0f}ms")
     print("[Main] Ứng dụng đã khởi động")
     print("Nhấn nút 'BẮT ĐẦU' để bắt đầu phát hiện\n")
     
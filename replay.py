@@ -0,0 +1,99 @@
+"""
+Replay Entry Point
+Chạy lại logic cảnh báo trên landmark log đã ghi - không camera, không FaceMesh
+
+Ví dụ:
+    python replay.py recordings/landmarks.bin
+    python replay.py recordings/*.bin --set thresholds.ear=0.2 --set durations.drowsiness=1.5
+    python replay.py recordings/landmarks.bin --speed 1 -o results/replay.csv
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from src.alert.alert_level import AlertLevel
+from src.config import ConfigManager
+from src.offline import LandmarkLog, LandmarkReplay, ResultWriter
+
+
+def parse_args(argv=None):
+    """Đọc tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(
+        description="Replay recorded landmarks through the metrics and alert logic")
+    parser.add_argument("logs", nargs="+", help="Landmark log files (recording.path)")
+    parser.add_argument("-c", "--config", default="config/settings.json",
+                        help="Config file with thresholds")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="PATH=VALUE",
+                        help="Override a config value for this run (JSON value), "
+                             "e.g. thresholds.ear=0.2")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Playback speed vs real time (0 = as fast as possible)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Optional per-frame output (.npz or .csv)")
+    return parser.parse_args(argv)
+
+
+def apply_overrides(config: ConfigManager, overrides):
+    """Áp dụng các override PATH=VALUE (chỉ trong bộ nhớ, không lưu file)"""
+    values = {}
+    for item in overrides:
+        path, sep, raw = item.partition("=")
+        if not sep:
+            raise ValueError(f"Override không hợp lệ: {item} (cần PATH=VALUE)")
+        try:
+            values[path] = json.loads(raw)
+        except json.JSONDecodeError:
+            values[path] = raw
+    config.set_many(values)
+    for path, value in values.items():
+        print(f"[Replay] {path} = {value}")
+
+
+def main(argv=None):
+    """Hàm main - replay toàn bộ log"""
+    args = parse_args(argv)
+    config = ConfigManager(args.config)
+    apply_overrides(config, args.overrides)
+
+    replay = LandmarkReplay(config)
+    writer = ResultWriter(args.output, LandmarkReplay.COLUMNS) if args.output else None
+    start_time = time.perf_counter()
+    total_frames = 0
+    failed = 0
+
+    try:
+        for path in args.logs:
+            try:
+                log = LandmarkLog(path)
+            except (IOError, ValueError) as e:
+                print(f"[Replay] {e}")
+                failed += 1
+                continue
+
+            result = replay.replay(log, args.speed)
+            if writer is not None:
+                writer.write(result)
+
+            stats = result["stats"]
+            alerts = result["alert"]
+            counts = ", ".join(f"{level.name}={int(np.count_nonzero(alerts == level.value))}"
+                               for level in AlertLevel)
+            print(f"[Replay] {path}: {stats['frames']} frames "
+                  f"({int(result['face'].sum())} có mặt), {counts}, {stats['fps']:.0f} fps")
+            total_frames += stats["frames"]
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"[Replay] Xong {len(args.logs) - failed}/{len(args.logs)} log, "
+          f"{total_frames} frames trong {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,12 @@
 """Alert module"""
-from .alert_system import AlertSystem, AlertLevel
+from .alert_level import AlertLevel
 
 __all__ = ['AlertSystem', 'AlertLevel']
+
+
+def __getattr__(name):
+    # AlertSystem cần pygame - chỉ import khi dùng (chế độ headless không cần)
+    if name == 'AlertSystem':
+        from .alert_system import AlertSystem
+        return AlertSystem
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,11 @@
+"""
+Alert Level - Mức độ cảnh báo (không phụ thuộc pygame)
+"""
+from enum import Enum
+
+
+class AlertLevel(Enum):
+    """Mức độ cảnh báo"""
+    NONE = 0      # Không cảnh báo
+    FATIGUE = 1   # Cảnh báo vàng - mệt mỏi
+    DROWSY = 2    # Cảnh báo đỏ - ngủ gật
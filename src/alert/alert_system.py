@@ -3,14 +3,8 @@ Alert System - Hệ thống cảnh báo âm thanh và hình ảnh
 """
 import pygame
 import os
-from enum import Enum
 
-
-class AlertLevel(Enum):
-    """Mức độ cảnh báo"""
-    NONE = 0      # Không cảnh báo
-    FATIGUE = 1   # Cảnh báo vàng - mệt mỏi
-    DROWSY = 2    # Cảnh báo đỏ - ngủ gật
+from .alert_level import AlertLevel
 
 
 class AlertSystem:
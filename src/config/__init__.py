@@ -1,4 +1,6 @@
 """Config module"""
 from .config_manager import ConfigManager
+from .config_writer import ConfigWriter
+from .thresholds import Thresholds
 
-__all__ = ['ConfigManager']
+__all__ = ['ConfigManager', 'ConfigWriter', 'Thresholds']
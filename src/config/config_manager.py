@@ -2,10 +2,16 @@
 Configuration Manager
 Quản lý cấu hình từ file JSON với khả năng học ngưỡng
 """
+import atexit
+import copy
 import json
 import os
+import threading
 from typing import Dict, Any, Optional
 
+from .config_writer import ConfigWriter, write_json_atomic
+from .thresholds import SOURCE_PATHS, Thresholds
+
 
 class ConfigManager:
     """Quản lý cấu hình hệ thống"""
@@ -23,39 +29,90 @@ class ConfigManager:
             "yawn": 20,  # Tăng từ 15 lên 20 để chắc chắn hơn
             "blink": 3
         },
+        "durations": {
+            # Thời gian (giây) liên tục trước khi báo, không phụ thuộc FPS
+            # None = quy đổi từ consecutive_frames theo camera.fps
+            "drowsiness": None,
+            "yawn": None
+        },
         "fatigue_detection": {
             "blink_per_minute": 15,
-            "yawn_per_minute": 3
+            "yawn_per_minute": 3,
+            "windows": [10, 60, 300]  # Các cửa sổ đếm blink/ngáp (giây)
         },
         "learning": {
             "samples": 100,
             "weight": 0.3
         },
+        "detection": {
+            "max_num_faces": 1,  # >1: theo dõi nhiều mặt (tài xế + phụ xe)
+            "driver_policy": "largest",  # Chọn tài xế: largest / left / right
+            "max_missed_frames": 15,  # Số frame mất mặt trước khi bỏ ID
+            "roi_tracking": False,  # Chỉ đưa vùng quanh mặt vào FaceMesh
+            "roi_margin": 0.3,  # Lề quanh bounding box mặt (tỷ lệ)
+            "roi_max_size": 320  # Cạnh dài tối đa của ROI (pixel)
+        },
+        "performance": {
+            "adaptive_skip": False,  # Chỉ chạy FaceMesh mỗi N frame, ngoại suy ở giữa
+            "max_skip": 3,  # N tối đa
+            "ear_margin": 0.04,  # EAR < ngưỡng + margin thì luôn inference
+            "max_extrapolation": 0.25,  # Thời gian ngoại suy tối đa (giây)
+            "inference_workers": 1  # Số worker FaceMesh dùng chung cho nhiều camera
+        },
         "camera": {
             "index": 0,
             "width": 640,
             "height": 480,
-            "fps": 30
+            "fps": 30,
+            "buffer_size": 3,  # Số slot ring buffer giữa capture và processing
+            "keep_warm": False,  # Giữ camera mở khi STOP để START lại nhanh hơn
+            "backend": None,  # Backend OpenCV ưu tiên (vd. "DSHOW", "MSMF", "V4L2"), None = tự chọn
+            "probe_indices": [0, 1, 2],  # Index thử song song khi camera.index không dùng được
+            "probe_timeout": 3.0,  # Thời gian chờ tối đa mỗi lượt thử (giây)
+            "discovery_cache": "config/camera_cache.json",  # Camera tốt gần nhất
+            # Nhiều camera: [{"name": "cabin", "index": 0}, {"name": "dash", "index": 1}]
+            # Nguồn đầu tiên là nguồn chính; rỗng = chỉ dùng camera.index
+            "sources": []
         },
         "alert": {
             "sound_file": "data/alarm.wav"
         },
+        "recording": {
+            "enabled": False,  # Ghi landmarks từng frame để replay (replay.py)
+            "path": "recordings/landmarks.bin"
+        },
         "display": {
             "show_landmarks": True,
-            "show_fps": True
+            "show_fps": True,
+            # Mức chi tiết lưới mặt: "full", "lite" (viền + mống mắt), "off"
+            "mesh_level": "full",
+            "timing_interval": 1.0,  # Chu kỳ publish thống kê latency (giây)
+            "ui_rate": 5.0,  # Tần số cập nhật metrics trên GUI (Hz)
+            # Tần số hiển thị video tối đa (0 = mọi frame), độc lập với detection
+            "max_fps": 0,
+            "scaling": "smooth"  # Chất lượng scale frame hiển thị: "fast" / "smooth"
         }
     }
     
-    def __init__(self, config_path: str = "config/settings.json"):
+    def __init__(self, config_path: str = "config/settings.json", save_delay: float = 2.0):
         """
         Khởi tạo ConfigManager
         
         Args:
             config_path: Đường dẫn đến file cấu hình JSON
+            save_delay: Khoảng debounce của request_save (giây)
         """
         self.config_path = config_path
         self.config: Dict[str, Any] = {}
         
+        # Ghi nền cho request_save (tạo khi cần)
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._writer: Optional[ConfigWriter] = None
+        
+        # Snapshot ngưỡng cho vòng xử lý frame (thay thế nguyên khối khi đổi)
+        self.thresholds: Optional[Thresholds] = None
+        
         self._ensure_config_directory()
         self.load()
     
@@ -76,39 +133,82 @@ class ConfigManager:
             try:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     loaded_config = json.load(f)
-                    self.config = self._merge_configs(self.DEFAULT_CONFIG.copy(), loaded_config)
+                    self.config = self._merge_configs(copy.deepcopy(self.DEFAULT_CONFIG), loaded_config)
                 print(f"[Config] Đã load cấu hình từ: {self.config_path}")
+                self._publish_thresholds()
                 return True
             except Exception as e:
                 print(f"[Config] Lỗi khi load cấu hình: {e}")
-                self.config = self.DEFAULT_CONFIG.copy()
+                self.config = copy.deepcopy(self.DEFAULT_CONFIG)
+                self._publish_thresholds()
                 return False
         else:
             print(f"[Config] Không tìm thấy file cấu hình, sử dụng mặc định")
-            self.config = self.DEFAULT_CONFIG.copy()
+            self.config = copy.deepcopy(self.DEFAULT_CONFIG)
+            self._publish_thresholds()
             self.save()
             return False
     
     def save(self) -> bool:
         """
-        Lưu cấu hình vào file JSON
+        Lưu cấu hình vào file JSON ngay lập tức (chặn, ghi nguyên tử)
         
         Returns:
             True nếu lưu thành công
         """
         try:
             self._ensure_config_directory()
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
+            write_json_atomic(self.config_path, self._snapshot())
             print(f"[Config] Đã lưu cấu hình: {self.config_path}")
             return True
         except Exception as e:
             print(f"[Config] Lỗi khi lưu cấu hình: {e}")
             return False
     
+    def request_save(self):
+        """
+        Yêu cầu lưu cấu hình ở background thread (không chạm ổ đĩa)
+        
+        Các yêu cầu trong khoảng save_delay được gộp thành một lần ghi.
+        Dùng trong vòng xử lý frame thay cho save().
+        """
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._ensure_config_directory()
+                    self._writer = ConfigWriter(self.config_path, self._snapshot,
+                                                self.save_delay)
+                    self._writer.start()
+                    atexit.register(self.flush)
+        self._writer.request()
+    
+    def flush(self) -> bool:
+        """
+        Ghi ngay các thay đổi đang chờ của request_save (chặn)
+        
+        Returns:
+            False nếu lần ghi gặp lỗi
+        """
+        if self._writer is None:
+            return True
+        return self._writer.flush()
+    
+    def close(self):
+        """Ghi các thay đổi đang chờ và dừng background writer"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop(flush=True)
+            atexit.unregister(self.flush)
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Bản sao cấu hình nhất quán (không bị set() sửa giữa chừng)"""
+        with self._lock:
+            return copy.deepcopy(self.config)
+    
     def _merge_configs(self, default: Dict, loaded: Dict) -> Dict:
-        """Merge cấu hình loaded với mặc định"""
-        result = default.copy()
+        """Merge cấu hình loaded với mặc định (không dùng chung dict con với default)"""
+        result = copy.deepcopy(default)
         for key, value in loaded.items():
             if key in result and isinstance(result[key], dict) and isinstance(value, dict):
                 result[key] = self._merge_configs(result[key], value)
@@ -146,22 +246,54 @@ class ConfigManager:
             path: Đường dẫn cấu hình (vd: "thresholds.ear")
             value: Giá trị mới
         """
-        keys = path.split('.')
-        config = self.config
+        self.set_many({path: value})
+    
+    def set_many(self, values: Dict[str, Any]):
+        """
+        Đặt nhiều giá trị cấu hình cùng lúc
         
-        for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
+        Snapshot thresholds được publish một lần sau khi đặt xong tất cả,
+        nên thread khác không thấy bộ ngưỡng cập nhật dở dang.
         
-        config[keys[-1]] = value
+        Args:
+            values: Dict đường dẫn -> giá trị mới
+        """
+        with self._lock:
+            changed = False
+            for path, value in values.items():
+                keys = path.split('.')
+                config = self.config
+                for key in keys[:-1]:
+                    if key not in config:
+                        config[key] = {}
+                    config = config[key]
+                
+                if keys[-1] not in config or config[keys[-1]] != value:
+                    config[keys[-1]] = value
+                    changed = changed or self._affects_thresholds(path)
+            
+            if changed:
+                self._publish_thresholds()
+    
+    def _affects_thresholds(self, path: str) -> bool:
+        """Đường dẫn có ảnh hưởng tới snapshot thresholds không"""
+        prefix = path + '.'
+        return any(source == path or source.startswith(prefix)
+                   for source in SOURCE_PATHS)
+    
+    def _publish_thresholds(self):
+        """Tạo lại snapshot thresholds (gán một tham chiếu, đọc không cần lock)"""
+        with self._lock:
+            self.thresholds = Thresholds.from_config(self)
     
     def reset_to_defaults(self):
         """Reset về cấu hình mặc định"""
-        self.config = self.DEFAULT_CONFIG.copy()
+        with self._lock:
+            self.config = copy.deepcopy(self.DEFAULT_CONFIG)
+            self._publish_thresholds()
         self.save()
         print("[Config] Đã reset về cấu hình mặc định")
     
     def get_all(self) -> Dict[str, Any]:
-        """Lấy toàn bộ cấu hình"""
-        return self.config.copy()
+        """Lấy toàn bộ cấu hình (bản sao, sửa không ảnh hưởng config)"""
+        return self._snapshot()
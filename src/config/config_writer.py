@@ -0,0 +1,155 @@
+"""
+Config Writer - Ghi file cấu hình ở background thread
+Gộp các yêu cầu lưu trong khoảng debounce, ghi nguyên tử (file tạm + os.replace)
+"""
+import json
+import os
+import stat
+import tempfile
+import threading
+from typing import Any, Callable, Dict
+
+
+# umask của process (đọc một lần lúc import) - quyền cho file mới tạo
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]):
+    """
+    Ghi JSON nguyên tử: ghi ra file tạm cùng thư mục rồi đổi tên
+    (giữ quyền của file cũ, file mới theo umask như open())
+
+    Args:
+        path: Đường dẫn file đích
+        data: Dữ liệu cần ghi
+
+    Raises:
+        OSError: Nếu không ghi được file
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    # Tên file tạm theo file đích (vd. .settings.json-xxxx.tmp)
+    prefix = f".{os.path.basename(path)}-"
+    fd, temp_path = tempfile.mkstemp(prefix=prefix, suffix=".tmp", dir=directory)
+    try:
+        # mkstemp luôn tạo file 0600
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigWriter(threading.Thread):
+    """
+    Thread ghi cấu hình nền
+
+    - request() chỉ đặt cờ, không chạm tới ổ đĩa (gọi được từ frame thread)
+    - Sau lần request đầu tiên, thread đợi delay giây rồi ghi một lần
+      cho tất cả yêu cầu trong khoảng đó
+    """
+
+    def __init__(self, path: str, snapshot: Callable[[], Dict[str, Any]],
+                 delay: float = 2.0):
+        """
+        Khởi tạo ConfigWriter
+
+        Args:
+            path: Đường dẫn file cấu hình
+            snapshot: Hàm trả về bản sao cấu hình hiện tại (gọi trên writer thread)
+            delay: Khoảng debounce (giây)
+        """
+        super().__init__(name="ConfigWriter", daemon=True)
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+
+        self._condition = threading.Condition()
+        self._pending = False
+        self._stopped = False
+        self._write_lock = threading.Lock()
+
+        # Thống kê
+        self.requests = 0
+        self.writes = 0
+        self.error = None
+
+    def request(self):
+        """Yêu cầu lưu cấu hình (không chặn)"""
+        with self._condition:
+            self.requests += 1
+            if not self._pending:
+                self._pending = True
+                self._condition.notify()
+
+    def run(self):
+        """Vòng lặp: chờ yêu cầu -> debounce -> ghi"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                # Debounce: stop()/flush() có thể đánh thức sớm
+                self._condition.wait(self.delay)
+                if self._stopped:
+                    return
+
+            self._write_pending()
+
+    def flush(self) -> bool:
+        """
+        Ghi ngay các thay đổi đang chờ (gọi từ thread bất kỳ, chặn tới khi ghi xong)
+
+        Returns:
+            False nếu lần ghi gặp lỗi
+        """
+        return self._write_pending()
+
+    def stop(self, flush: bool = True):
+        """
+        Dừng writer thread
+
+        Args:
+            flush: Ghi các thay đổi đang chờ trước khi dừng
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        if flush:
+            self.flush()
+
+    def _write_pending(self) -> bool:
+        """Ghi file nếu có yêu cầu đang chờ"""
+        with self._write_lock:
+            with self._condition:
+                if not self._pending:
+                    return True
+                self._pending = False
+
+            try:
+                write_json_atomic(self.path, self.snapshot())
+                self.writes += 1
+                self.error = None
+                print(f"[Config] Đã lưu cấu hình: {self.path}")
+                return True
+            except Exception as e:
+                self.error = str(e)
+                print(f"[Config] Lỗi khi lưu cấu hình: {e}")
+                # Giữ yêu cầu để ghi lại ở lần debounce tiếp theo
+                with self._condition:
+                    self._pending = True
+                return False
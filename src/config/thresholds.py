@@ -0,0 +1,64 @@
+"""
+Thresholds - Snapshot bất biến của các giá trị cấu hình đọc mỗi frame
+Đọc thuộc tính của snapshot thay vì ConfigManager.get (tách path + duyệt dict)
+"""
+from typing import NamedTuple
+
+
+class Thresholds(NamedTuple):
+    """Các ngưỡng và tham số dùng trong vòng xử lý frame"""
+
+    ear: float
+    mar: float
+    blink: float
+    yawn: float
+    drowsiness_frames: int
+    yawn_frames: int
+    show_fps: bool
+    # Thời gian (giây) mắt nhắm / miệng há liên tục trước khi báo
+    drowsiness_seconds: float
+    yawn_seconds: float
+
+    @classmethod
+    def from_config(cls, config_manager) -> "Thresholds":
+        """
+        Tạo snapshot từ ConfigManager
+
+        Args:
+            config_manager: ConfigManager instance
+
+        Returns:
+            Thresholds
+        """
+        values = {
+            field: config_manager.get(path, default)
+            for field, (path, default) in THRESHOLD_PATHS.items()
+        }
+
+        # durations.* = null -> quy đổi từ consecutive_frames theo camera.fps.
+        # Bộ đếm cũ báo ở frame thứ N, tức (N - 1) chu kỳ frame sau frame đầu;
+        # trừ thêm nửa frame để timestamp dao động không làm báo trễ một frame
+        fps = config_manager.get("camera.fps", 30) or 30
+        for name in ("drowsiness", "yawn"):
+            seconds = config_manager.get(f"durations.{name}")
+            if seconds is None:
+                seconds = max(0.0, values[f"{name}_frames"] - 1.5) / fps
+            values[f"{name}_seconds"] = float(seconds)
+
+        return cls(**values)
+
+
+# Field -> (đường dẫn cấu hình, giá trị mặc định)
+THRESHOLD_PATHS = {
+    "ear": ("thresholds.ear", 0.25),
+    "mar": ("thresholds.mar", 0.6),
+    "blink": ("thresholds.blink", 0.25),
+    "yawn": ("thresholds.yawn", 0.65),
+    "drowsiness_frames": ("consecutive_frames.drowsiness", 20),
+    "yawn_frames": ("consecutive_frames.yawn", 20),
+    "show_fps": ("display.show_fps", True),
+}
+
+# Tất cả đường dẫn cấu hình mà snapshot phụ thuộc
+SOURCE_PATHS = tuple(path for path, _ in THRESHOLD_PATHS.values()) + (
+    "durations.drowsiness", "durations.yawn", "camera.fps")
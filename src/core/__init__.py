@@ -1,4 +1,18 @@
 """Core module"""
-from .detection_engine import DetectionEngine
 
-__all__ = ['DetectionEngine']
+__all__ = ['DetectionEngine', 'FrameAnalyzer', 'MultiFaceAnalyzer']
+
+
+def __getattr__(name):
+    # Các class này kéo theo mediapipe (và PyQt5 với DetectionEngine) - chỉ import
+    # khi dùng, để GUI hiện ra trước và chế độ headless không cần PyQt5
+    if name == 'DetectionEngine':
+        from .detection_engine import DetectionEngine
+        return DetectionEngine
+    if name == 'FrameAnalyzer':
+        from .frame_analyzer import FrameAnalyzer
+        return FrameAnalyzer
+    if name == 'MultiFaceAnalyzer':
+        from .multi_face_analyzer import MultiFaceAnalyzer
+        return MultiFaceAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,287 @@
+"""
+Camera Discovery - Tìm camera dùng được mà không chặn lâu
+Thử các index song song (mỗi lần thử có timeout) và lưu camera tốt gần nhất
+ra file, lần khởi động sau thử camera đó trước
+"""
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from ..config.config_writer import write_json_atomic
+
+
+class CameraInfo(NamedTuple):
+    """Camera đã mở được và thông số thực tế sau khi set"""
+
+    index: int
+    backend: str  # Tên backend OpenCV ("DSHOW", "MSMF", "V4L2", ... "" = tự chọn)
+    width: int
+    height: int
+    fps: float
+
+
+class _ProbeRound:
+    """Kết quả của một lượt thử song song (probe về muộn thì tự release)"""
+
+    def __init__(self, count: int):
+        self.cond = threading.Condition()
+        # None = đang thử, str = lỗi, tuple = (cap, frame, info)
+        self.outcomes: List[object] = [None] * count
+        self.closed = False
+
+    def report(self, position: int, outcome):
+        with self.cond:
+            late = self.closed
+            if not late:
+                self.outcomes[position] = outcome
+                self.cond.notify_all()
+        if late and isinstance(outcome, tuple):
+            # Đã chọn camera khác (hoặc hết giờ) - trả camera lại
+            outcome[0].release()
+
+
+class CameraDiscovery:
+    """Mở camera theo thứ tự ưu tiên: camera đã cache -> index cấu hình -> các index khác"""
+
+    # 2: lưu thêm mode được yêu cầu ("requested_mode")
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_path: Optional[str] = "config/camera_cache.json",
+                 candidates: Sequence[int] = (0, 1, 2), timeout: float = 3.0,
+                 backend: Optional[str] = None):
+        """
+        Khởi tạo CameraDiscovery
+
+        Args:
+            cache_path: File lưu camera tốt gần nhất (None = không cache)
+            candidates: Các index thử khi index cấu hình không dùng được
+            timeout: Thời gian tối đa (giây) chờ một lượt thử
+            backend: Backend OpenCV ưu tiên (vd. "DSHOW"), None = tự chọn
+        """
+        self.cache_path = cache_path
+        self.candidates = list(candidates)
+        self.timeout = timeout
+        self.backend = backend or ""
+
+    @classmethod
+    def from_config(cls, config_manager) -> "CameraDiscovery":
+        """
+        Tạo CameraDiscovery theo section "camera" của config
+
+        Args:
+            config_manager: ConfigManager instance
+
+        Returns:
+            CameraDiscovery
+        """
+        return cls(
+            cache_path=config_manager.get("camera.discovery_cache", "config/camera_cache.json"),
+            candidates=config_manager.get("camera.probe_indices", [0, 1, 2]),
+            timeout=config_manager.get("camera.probe_timeout", 3.0),
+            backend=config_manager.get("camera.backend")
+        )
+
+    def open(self, index: int, width: int, height: int,
+             fps: float) -> Tuple[cv2.VideoCapture, np.ndarray, CameraInfo]:
+        """
+        Mở camera dùng được, ưu tiên camera đã cache cho index này
+
+        Args:
+            index: Index camera trong cấu hình
+            width: Chiều rộng mong muốn
+            height: Chiều cao mong muốn
+            fps: FPS mong muốn
+
+        Returns:
+            (VideoCapture đã mở, frame đầu tiên, CameraInfo)
+
+        Raises:
+            IOError: Nếu không có camera nào mở và đọc được frame
+        """
+        start_time = time.perf_counter()
+        requested_mode = (width, height, fps)
+        tried = set()
+
+        cached = self.load_cache(index, requested_mode)
+        if cached is not None:
+            # Đường nhanh: chỉ thử camera tốt lần trước, với mode thực tế lần trước
+            result = self._probe_all([(cached.index, cached.backend)],
+                                     cached.width, cached.height, cached.fps)
+            tried.add(cached.index)
+            if isinstance(result, tuple):
+                return self._finish(index, result, start_time, "cache", requested_mode)
+            print(f"[Camera] Camera đã cache ({cached.index}) không dùng được: {result}")
+
+        # Index cấu hình trước, sau đó các index khác - thử song song
+        # (mỗi index một lần, index đã cache không thử lại với backend khác)
+        order = []
+        for candidate in [index] + self.candidates:
+            if candidate not in tried:
+                tried.add(candidate)
+                order.append((candidate, self.backend))
+        result = self._probe_all(order, width, height, fps)
+        if isinstance(result, tuple):
+            return self._finish(index, result, start_time, "probe", requested_mode)
+        raise IOError(f"Không tìm thấy camera khả dụng ({result})")
+
+    def load_cache(self, index: int,
+                   requested_mode: Tuple[int, int, float]) -> Optional[CameraInfo]:
+        """
+        Đọc camera tốt gần nhất đã lưu cho index cấu hình này
+
+        Args:
+            index: Index camera trong cấu hình
+            requested_mode: (width, height, fps) đang yêu cầu
+
+        Returns:
+            CameraInfo - width/height/fps là mode thực tế lần trước nếu cache
+            được ghi cho cùng mode yêu cầu, ngược lại là requested_mode.
+            None nếu chưa có cache hoặc cache của index khác
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.CACHE_VERSION or data.get("requested") != index:
+                return None
+            info = CameraInfo(**data["camera"])
+            if data.get("requested_mode") != list(requested_mode):
+                # Cấu hình đổi độ phân giải/FPS - chỉ dùng lại camera, không dùng mode cũ
+                width, height, fps = requested_mode
+                info = info._replace(width=width, height=height, fps=fps)
+            return info
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[Camera] Bỏ qua cache camera: {e}")
+            return None
+
+    def save_cache(self, index: int, info: CameraInfo, requested_mode: Tuple[int, int, float]):
+        """
+        Lưu camera tốt (ghi nguyên tử)
+
+        Args:
+            index: Index camera trong cấu hình
+            info: Camera đã mở được (mode thực tế)
+            requested_mode: (width, height, fps) đã yêu cầu khi mở
+        """
+        if not self.cache_path:
+            return
+        data = {"version": self.CACHE_VERSION, "requested": index,
+                "requested_mode": list(requested_mode), "camera": info._asdict()}
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            write_json_atomic(self.cache_path, data)
+        except OSError as e:
+            print(f"[Camera] Không lưu được cache camera: {e}")
+
+    def _finish(self, index: int, result, start_time: float, source: str,
+                requested_mode: Tuple[int, int, float]):
+        """Lưu cache và báo camera đã chọn"""
+        cap, frame, info = result
+        self.save_cache(index, info, requested_mode)
+        elapsed = (time.perf_counter() - start_time) * 1000.0
+        backend = info.backend or "auto"
+        print(f"[Camera] Camera {info.index} ({backend}) {info.width}x{info.height} "
+              f"@ {info.fps:.0f}fps - {source}, {elapsed:.0f}ms")
+        return cap, frame, info
+
+    def _probe_all(self, candidates: List[Tuple[int, str]], width: int, height: int,
+                   fps: float):
+        """
+        Thử song song các camera, chọn camera ưu tiên nhất mở được
+
+        Chờ tới khi mọi camera ưu tiên hơn đã thất bại, hoặc hết timeout
+        (khi đó lấy camera ưu tiên nhất đã mở được). Thread thử bị treo
+        trong OpenCV là daemon, tự release camera nếu trả về muộn.
+
+        Returns:
+            (cap, frame, info) nếu thành công, ngược lại chuỗi mô tả lỗi
+        """
+        if not candidates:
+            return "không có index để thử"
+
+        probe_round = _ProbeRound(len(candidates))
+        for position, (index, backend) in enumerate(candidates):
+            thread = threading.Thread(
+                target=self._probe, name=f"CameraProbe-{index}",
+                args=(probe_round, position, index, backend, width, height, fps),
+                daemon=True)
+            thread.start()
+
+        deadline = time.perf_counter() + self.timeout
+        with probe_round.cond:
+            while True:
+                chosen = self._choose(probe_round.outcomes, final=False)
+                remaining = deadline - time.perf_counter()
+                if chosen is not None or remaining <= 0:
+                    break
+                probe_round.cond.wait(remaining)
+            if chosen is None:
+                chosen = self._choose(probe_round.outcomes, final=True)
+            probe_round.closed = True
+            outcomes = list(probe_round.outcomes)
+
+        # Trả lại các camera mở được nhưng không được chọn
+        for position, outcome in enumerate(outcomes):
+            if isinstance(outcome, tuple) and position != chosen:
+                outcome[0].release()
+
+        if chosen is not None and chosen >= 0:
+            return outcomes[chosen]
+        errors = [f"{index}: {outcome or 'timeout'}"
+                  for (index, _), outcome in zip(candidates, outcomes)]
+        return "; ".join(errors)
+
+    @staticmethod
+    def _choose(outcomes: List[object], final: bool) -> Optional[int]:
+        """
+        Vị trí camera được chọn: -1 = tất cả thất bại, None = còn phải chờ
+
+        Args:
+            outcomes: Kết quả theo thứ tự ưu tiên
+            final: Hết giờ - không chờ các lượt thử còn treo
+        """
+        for position, outcome in enumerate(outcomes):
+            if isinstance(outcome, tuple):
+                return position
+            if outcome is None and not final:
+                # Camera ưu tiên hơn chưa có kết quả
+                return None
+        return -1
+
+    def _probe(self, probe_round: _ProbeRound, position: int, index: int, backend: str,
+               width: int, height: int, fps: float):
+        """Mở một camera, set thông số và đọc thử một frame (chạy trong thread riêng)"""
+        cap = None
+        try:
+            api = getattr(cv2, f"CAP_{backend}", cv2.CAP_ANY) if backend else cv2.CAP_ANY
+            cap = cv2.VideoCapture(index, api)
+            if not cap.isOpened():
+                raise IOError("không mở được")
+
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            cap.set(cv2.CAP_PROP_FPS, fps)
+
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                raise IOError("mở được nhưng không đọc được frame")
+
+            try:
+                backend_name = cap.getBackendName()
+            except cv2.error:
+                backend_name = backend
+            info = CameraInfo(index=index, backend=backend_name,
+                              width=int(frame.shape[1]), height=int(frame.shape[0]),
+                              fps=float(cap.get(cv2.CAP_PROP_FPS) or fps))
+            probe_round.report(position, (cap, frame, info))
+        except Exception as e:
+            if cap is not None:
+                cap.release()
+            probe_round.report(position, str(e))
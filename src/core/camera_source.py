@@ -0,0 +1,128 @@
+"""
+Camera Source - Một nguồn camera: VideoCapture + ring buffer + thread capture
+Dùng cho chế độ nhiều camera (camera.sources)
+"""
+import cv2
+from typing import List, Optional
+
+from .frame_buffer import FrameRingBuffer
+from .frame_capture import FrameCapture
+
+
+class CameraSource:
+    """Mở một camera và đọc frame liên tục vào ring buffer riêng"""
+
+    def __init__(self, name: str, index: int, width: int = 640, height: int = 480,
+                 fps: int = 30, buffer_size: int = 3):
+        """
+        Khởi tạo CameraSource
+
+        Args:
+            name: Tên nguồn (hiển thị trong log/thống kê)
+            index: Index camera (hoặc đường dẫn/URL cho cv2.VideoCapture)
+            width: Chiều rộng yêu cầu
+            height: Chiều cao yêu cầu
+            fps: FPS yêu cầu
+            buffer_size: Số slot ring buffer
+        """
+        self.name = name
+        self.index = index
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.frame_buffer: Optional[FrameRingBuffer] = None
+        self.capture: Optional[FrameCapture] = None
+
+    @classmethod
+    def list_from_config(cls, config_manager) -> List["CameraSource"]:
+        """
+        Tạo danh sách nguồn từ camera.sources
+
+        Mỗi phần tử là index camera hoặc dict {name, index, width, height, fps};
+        giá trị thiếu lấy từ camera.width/height/fps/buffer_size
+
+        Args:
+            config_manager: ConfigManager instance
+
+        Returns:
+            Danh sách CameraSource (rỗng nếu không cấu hình nhiều nguồn)
+        """
+        width = config_manager.get("camera.width", 640)
+        height = config_manager.get("camera.height", 480)
+        fps = config_manager.get("camera.fps", 30)
+        buffer_size = config_manager.get("camera.buffer_size", 3)
+
+        sources = []
+        for position, entry in enumerate(config_manager.get("camera.sources", []) or []):
+            if not isinstance(entry, dict):
+                entry = {"index": entry}
+            index = entry.get("index", position)
+            sources.append(cls(
+                name=str(entry.get("name", f"cam{index}")),
+                index=index,
+                width=entry.get("width", width),
+                height=entry.get("height", height),
+                fps=entry.get("fps", fps),
+                buffer_size=entry.get("buffer_size", buffer_size)
+            ))
+        return sources
+
+    def open(self):
+        """
+        Mở camera, đọc thử một frame và khởi động thread capture
+
+        Raises:
+            IOError: Nếu không mở được camera hoặc không đọc được frame
+        """
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            raise IOError(f"Camera '{self.name}' ({self.index}) không mở được")
+
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+        ret, test_frame = self.cap.read()
+        if not ret:
+            self.cap.release()
+            self.cap = None
+            raise IOError(f"Camera '{self.name}' ({self.index}) không đọc được frame")
+
+        self.frame_buffer = FrameRingBuffer(self.buffer_size)
+        self.frame_buffer.allocate(test_frame.shape, test_frame.dtype)
+        self.capture = FrameCapture(self.cap, self.frame_buffer)
+        self.capture.name = f"FrameCapture-{self.name}"
+        self.capture.start()
+
+        h, w = test_frame.shape[:2]
+        print(f"[Camera] '{self.name}' ({self.index}) khởi động: {w}x{h} @ {self.fps}fps")
+
+    @property
+    def is_open(self) -> bool:
+        """Camera đang mở và thread capture còn chạy"""
+        return self.capture is not None and self.capture.is_alive()
+
+    @property
+    def error(self) -> Optional[str]:
+        """Lỗi của thread capture (None nếu không có)"""
+        return self.capture.error if self.capture is not None else None
+
+    def close(self):
+        """Dừng thread capture và release camera"""
+        if self.capture is not None:
+            self.capture.stop()
+            self.capture = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def get_stats(self) -> dict:
+        """Thống kê ring buffer (rỗng nếu chưa mở)"""
+        if self.frame_buffer is None:
+            return {}
+        return self.frame_buffer.get_stats()
@@ -4,15 +4,29 @@ Detection Engine - Core processing loop chạy trong thread riêng
 Giao tiếp với GUI qua PyQt signals
 """
 import cv2
+import threading
 import time
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
-from typing import Optional
+from typing import Dict, List, Optional
 
 from ..config import ConfigManager
-from ..detection import FaceDetector, MetricsProcessor
+from ..detection import FaceDetector, MeshRenderer
 from ..alert import AlertSystem, AlertLevel
 from ..learning import LearningEngine
+from ..offline.landmark_log import LandmarkRecorder
+from . import overlay
+from .camera_discovery import CameraDiscovery
+from .camera_source import CameraSource
+from .frame_analyzer import FrameAnalyzer
+from .frame_buffer import FrameRingBuffer
+from .frame_capture import FrameCapture
+from .frame_store import DisplayFrameStore
+from .inference_pool import InferencePool, InferenceStream
+from .inference_scheduler import InferenceScheduler
+from .multi_face_analyzer import MultiFaceAnalyzer
+from .stage_timer import StageTimer
+from .state_store import MetricsSnapshot, StateChangeFilter
 
 
 class DetectionEngine(QThread):
@@ -22,13 +36,17 @@ class DetectionEngine(QThread):
     """
     
     # Signals để giao tiếp với GUI
-    frame_processed = pyqtSignal(np.ndarray, float)  # (frame, fps)
+    frame_ready = pyqtSignal(float)  # fps - frame nằm trong frame_store
+    # Trạng thái rời rạc: chỉ emit khi đổi. Metrics liên tục (EAR, MAR, tiến độ
+    # học...) nằm trong metrics_snapshot, GUI đọc theo display.ui_rate
     face_detected = pyqtSignal(bool)  # True/False
-    metrics_updated = pyqtSignal(dict)  # {"ear": float, "mar": float, ...}
     alert_changed = pyqtSignal(int)  # AlertLevel.value
     status_changed = pyqtSignal(str, str)  # (status_text, color)
-    learning_progress = pyqtSignal(float)  # 0-100
     error_occurred = pyqtSignal(str)  # error message
+    timings_updated = pyqtSignal(dict)  # {stage: {"p50_ms": ..., "p99_ms": ...}}
+    running_changed = pyqtSignal(bool)  # True khi bắt đầu phiên, False khi tạm dừng
+    start_latency = pyqtSignal(float)  # ms từ resume() tới frame đầu tiên
+    initialized = pyqtSignal(dict)  # {"face_mesh_ms", "warm_up_ms", "audio_ms", ...}
     
     def __init__(self, config_manager: ConfigManager):
         """
@@ -41,226 +59,560 @@ class DetectionEngine(QThread):
         
         self.config = config_manager
         
-        # Components
-        self.face_detector = FaceDetector()
-        self.processor = MetricsProcessor(self.config)
-        self.alert_system = AlertSystem(self.config)
+        # Đo thời gian từng stage (histogram cố định)
+        self.stage_timer = StageTimer()
+        # Sprite khung cảnh báo render sẵn
+        self.overlay_cache = overlay.OverlayCache()
+        self.timing_interval = self.config.get("display.timing_interval", 1.0)
+        self._last_timing_publish = 0.0
+        
+        # Components: FaceMesh và âm thanh được tạo trong engine thread
+        # (_initialize, ngay khi start()) để cửa sổ hiện ra không phải chờ
+        self.face_detector: Optional[FaceDetector] = None
+        self.scheduler: Optional[InferenceScheduler] = None
+        self.analyzer = None
+        self.alert_system: Optional[AlertSystem] = None
+        self.multi_face = self.config.get("detection.max_num_faces", 1) > 1
+        # Thời gian khởi tạo từng phần (ms), có sau _initialize
+        self.init_timings: Dict[str, float] = {}
+        
         self.learning_engine = LearningEngine(self.config)
         
         # Video capture
         self.cap: Optional[cv2.VideoCapture] = None
+        self.capture: Optional[FrameCapture] = None
+        self.frame_buffer: Optional[FrameRingBuffer] = None
         
-        # Control flags
-        self.is_running = False
+        # Nhiều camera (camera.sources): nguồn đầu tiên là nguồn chính (hiển thị,
+        # learning, signals), cảnh báo lấy mức cao nhất giữa các nguồn
+        self.camera_discovery = CameraDiscovery.from_config(self.config)
+        self.sources: List[CameraSource] = CameraSource.list_from_config(self.config)
+        self.pool: Optional[InferencePool] = None
+        self._stream_alerts: Dict[str, AlertLevel] = {}
+        
+        # Ghi landmarks của nguồn chính để replay offline
+        self.recorder: Optional[LandmarkRecorder] = None
+        if self.config.get("recording.enabled", False):
+            self.recorder = LandmarkRecorder(
+                self.config.get("recording.path", "recordings/landmarks.bin"),
+                len(FaceDetector.KEY_INDICES))
+        
+        # Frame hiển thị cho GUI (double buffer, đã RGB + scale), tần số riêng
+        # (display.max_fps) - frame không hiển thị bỏ qua vẽ overlay
+        self.frame_store = DisplayFrameStore.from_config(self.config)
+        self._display_due = False
+        # Trạng thái gửi GUI: signal khi đổi + snapshot metrics theo tần số UI
+        self.state_filter = StateChangeFilter()
+        self.metrics_snapshot = MetricsSnapshot(self.config.get("display.ui_rate", 5.0))
+        self._learning_progress: Optional[float] = None
+        
+        # Control flags: is_running = engine còn sống (tới stop()),
+        # _paused = đang tạm dừng giữa các phiên (khởi đầu tạm dừng, chờ resume())
+        self.is_running = True
+        self._paused = True
+        self._resume_event = threading.Event()
+        self._resources_released = False
         self.show_landmarks = True
         
+        # Giữ camera mở khi tạm dừng (resume không phải mở + dò lại camera)
+        self.keep_camera_warm = self.config.get("camera.keep_warm", False)
+        # Analyzer của các nguồn phụ: tên -> (analyzer, stage_timer)
+        self._secondary: Dict[str, tuple] = {}
+        
+        # Độ trễ resume() -> frame đầu tiên được xử lý
+        self._start_request: Optional[float] = None
+        self.last_start_latency: Optional[float] = None
+        # Lưới mặt của frame hiện tại, vẽ sau khi scale: [(mesh (478, 2), key landmarks)]
+        self._display_meshes = []
+        
         # FPS tracking
         self.prev_time = time.time()
         
     def run(self):
-        """Main loop chạy trong thread riêng"""
-        camera_index = self.config.get("camera.index", 0)
-        
+        """
+        Thread sống suốt vòng đời engine: khởi tạo + warm-up FaceMesh ->
+        chờ resume() -> chạy một phiên -> pause() -> chờ tiếp, cho tới stop().
+        FaceMesh, âm thanh và (nếu camera.keep_warm) camera được giữ giữa các phiên
+        """
         try:
-            # Thử mở camera với index được config
-            self.cap = cv2.VideoCapture(camera_index)
+            try:
+                self._initialize()
+            except Exception as e:
+                self.is_running = False
+                self._paused = True
+                # GUI đang chờ running_changed sau khi bấm START (emit trước lỗi
+                # để trạng thái cuối cùng trên GUI là thông báo lỗi)
+                self.running_changed.emit(False)
+                self.error_occurred.emit(f"Lỗi khởi tạo engine: {str(e)}")
+                return
             
-            if not self.cap.isOpened():
-                # Thử tự động tìm camera khác
-                print(f"[Engine] Camera {camera_index} không mở được, đang thử camera khác...")
-                found = False
-                for i in range(3):  # Thử index 0, 1, 2
-                    if i == camera_index:
-                        continue
-                    self.cap = cv2.VideoCapture(i)
-                    if self.cap.isOpened():
-                        test_ret, _ = self.cap.read()
-                        if test_ret:
-                            camera_index = i
-                            found = True
-                            print(f"[Engine] Tìm thấy camera tại index {i}")
-                            break
-                        else:
-                            self.cap.release()
+            while self.is_running:
+                if not self._resume_event.wait(timeout=0.5) or not self.is_running:
+                    continue
                 
-                if not found:
-                    self.error_occurred.emit(
-                        "Không tìm thấy camera khả dụng!\n\n"
-                        "Kiểm tra:\n"
-                        "1. Camera đã được cắm và bật\n"
-                        "2. Đóng các app khác (Zoom, Teams, Chrome...)\n"
-                        "3. Kiểm tra quyền camera trong Windows Settings"
-                    )
-                    return
+                self._begin_session()
+                try:
+                    if len(self.sources) > 1:
+                        self._run_streams()
+                    else:
+                        self._run_camera()
+                except Exception as e:
+                    self.error_occurred.emit(f"Lỗi engine: {str(e)}")
+                self._end_session()
+        finally:
+            self._cleanup()
+    
+    def _initialize(self):
+        """
+        Tạo FaceMesh (kèm một lần inference trên frame đen) và hệ thống âm thanh
+        
+        Chạy trong engine thread: GUI vẫn phản hồi trong lúc nạp model,
+        resume() gọi sớm sẽ bắt đầu phiên ngay khi khởi tạo xong
+        """
+        clock = time.perf_counter
+        t0 = clock()
+        self.face_detector = FaceDetector.from_config(self.config)
+        t1 = clock()
+        frame_shape = (self.config.get("camera.height", 480),
+                       self.config.get("camera.width", 640))
+        warm_up = self.face_detector.warm_up(frame_shape)
+        
+        if self.multi_face:
+            # Nhiều mặt: mỗi mặt có MetricsProcessor riêng, chọn một mặt làm tài xế
+            if self.config.get("performance.adaptive_skip", False):
+                print("[Engine] Bỏ qua adaptive_skip ở chế độ nhiều mặt")
+            self.analyzer = MultiFaceAnalyzer(self.config, self.face_detector,
+                                              self.stage_timer)
+        else:
+            if self.config.get("performance.adaptive_skip", False):
+                self.scheduler = InferenceScheduler(
+                    target_fps=self.config.get("camera.fps", 30),
+                    max_interval=self.config.get("performance.max_skip", 3),
+                    ear_margin=self.config.get("performance.ear_margin", 0.04))
+            self.analyzer = FrameAnalyzer(self.config, self.face_detector,
+                                          self.stage_timer, self.scheduler)
+        t3 = clock()
+        self.alert_system = AlertSystem(self.config)
+        t4 = clock()
+        
+        self.init_timings = {
+            "face_mesh_ms": (t1 - t0) * 1000.0,
+            "warm_up_ms": warm_up * 1000.0,
+            "audio_ms": (t4 - t3) * 1000.0,
+            "total_ms": (t4 - t0) * 1000.0,
+        }
+        print(f"[Engine] Khởi tạo xong sau {self.init_timings['total_ms']:.0f}ms "
+              f"(FaceMesh {self.init_timings['face_mesh_ms']:.0f}ms, "
+              f"warm-up {self.init_timings['warm_up_ms']:.0f}ms, "
+              f"âm thanh {self.init_timings['audio_ms']:.0f}ms)")
+        self.initialized.emit(dict(self.init_timings))
+    
+    def _run_camera(self):
+        """Một phiên xử lý camera chính (tới khi pause/stop hoặc camera lỗi)"""
+        if self.capture is None:
+            if not self._open_camera():
+                return
+        else:
+            print("[Engine] Dùng lại camera đang mở (keep_warm)")
+        
+        self.running_changed.emit(True)
+        self.prev_time = time.time()
+        
+        clock = time.perf_counter
+        timer = self.stage_timer
+        
+        while self.is_running and not self._paused:
+            # Luôn lấy frame mới nhất, frame cũ bị bỏ qua
+            t_wait = clock()
+            item = self.frame_buffer.get_latest(timeout=0.5)
+            t_start = clock()
             
-            # Set camera properties
-            width = self.config.get("camera.width", 640)
-            height = self.config.get("camera.height", 480)
-            fps = self.config.get("camera.fps", 30)
+            if item is None:
+                if not self.capture.is_alive():
+                    if self.capture.error:
+                        self.error_occurred.emit(self.capture.error)
+                    break
+                continue
             
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-            self.cap.set(cv2.CAP_PROP_FPS, fps)
+            timer.record("capture_wait", t_start - t_wait)
+            frame, timestamp, _ = item
             
-            # Test đọc frame đầu tiên
-            ret, test_frame = self.cap.read()
-            if not ret:
-                self.error_occurred.emit(
-                    f"Camera {camera_index} mở được nhưng không đọc được frame.\n\n"
-                    "Thử:\n"
-                    "1. Đóng tất cả app đang dùng camera\n"
-                    "2. Rút và cắm lại camera\n"
-                    "3. Khởi động lại máy tính"
-                )
-                return
+            # Lật ngang để hiệu ứng mirror
+            frame = cv2.flip(frame, 1)
+            timer.record("flip", clock() - t_start)
             
-            print(f"[Engine] Camera {camera_index} khởi động: {width}x{height} @ {fps}fps")
+            # Tính FPS
+            current_time = time.time()
+            fps_value = 1 / (current_time - self.prev_time) if (current_time - self.prev_time) > 0 else 0
+            self.prev_time = current_time
             
-            self.is_running = True
-            frame_skip = 0
-            max_frame_skip = 10
+            # Xử lý detection
+            self._process_frame(frame, fps_value, timestamp)
             
-            while self.is_running:
-                ret, frame = self.cap.read()
-                
-                if not ret:
-                    frame_skip += 1
-                    if frame_skip >= max_frame_skip:
-                        self.error_occurred.emit("Mất kết nối camera sau nhiều lần thử")
-                        break
-                    self.msleep(50)
-                    continue
-                
-                frame_skip = 0  # Reset counter khi đọc thành công
-                
-                # Lật ngang để hiệu ứng mirror
-                frame = cv2.flip(frame, 1)
-                
-                # Tính FPS
-                current_time = time.time()
-                fps_value = 1 / (current_time - self.prev_time) if (current_time - self.prev_time) > 0 else 0
-                self.prev_time = current_time
-                
-                # Xử lý detection
-                self._process_frame(frame, fps_value)
-                
-                # Emit frame đã xử lý
-                self.frame_processed.emit(frame, fps_value)
-                
-                # Small delay để không overload CPU
-                self.msleep(10)  # 10ms delay
-                
-        except Exception as e:
-            self.error_occurred.emit(f"Lỗi engine: {str(e)}")
-        finally:
-            self._cleanup()
+            # Scale + đổi màu trong worker, GUI chỉ nhận thông báo
+            t_emit = clock()
+            if self._display_due and self._publish_frame(frame, fps_value):
+                self.frame_ready.emit(fps_value)
+            t_end = clock()
+            timer.record("emit_frame", t_end - t_emit)
+            timer.record("total", t_end - t_start)
+            self._report_first_frame()
+            
+            # Publish thống kê timing theo chu kỳ
+            if t_end - self._last_timing_publish >= self.timing_interval:
+                self._last_timing_publish = t_end
+                self.timings_updated.emit(timer.snapshot())
+    
+    def _open_camera(self) -> bool:
+        """
+        Mở camera chính và khởi động thread capture
+        
+        Returns:
+            True nếu mở được, False nếu lỗi (đã emit error_occurred)
+        """
+        camera_index = self.config.get("camera.index", 0)
+        
+        width = self.config.get("camera.width", 640)
+        height = self.config.get("camera.height", 480)
+        fps = self.config.get("camera.fps", 30)
+        
+        # Camera đã cache trước, sau đó thử song song các index (có timeout)
+        try:
+            self.cap, test_frame, info = self.camera_discovery.open(
+                camera_index, width, height, fps)
+        except IOError as e:
+            self.error_occurred.emit(
+                f"{e}\n\n"
+                "Kiểm tra:\n"
+                "1. Camera đã được cắm và bật\n"
+                "2. Đóng các app khác (Zoom, Teams, Chrome...)\n"
+                "3. Kiểm tra quyền camera trong Windows Settings"
+            )
+            return False
+        
+        print(f"[Engine] Camera {info.index} khởi động: {info.width}x{info.height} @ {info.fps:.0f}fps")
+        
+        # Thread capture riêng ghi vào ring buffer đã cấp phát trước
+        self.frame_buffer = FrameRingBuffer(self.config.get("camera.buffer_size", 3))
+        self.frame_buffer.allocate(test_frame.shape, test_frame.dtype)
+        self.capture = FrameCapture(self.cap, self.frame_buffer)
+        self.capture.start()
+        return True
     
-    def _process_frame(self, frame: np.ndarray, fps: float):
+    def _process_frame(self, frame: np.ndarray, fps: float,
+                       timestamp: Optional[float] = None):
         """
         Xử lý detection cho một frame
         
         Args:
             frame: Frame từ camera
             fps: FPS hiện tại
+            timestamp: Thời điểm capture của frame
+        """
+        # Phát hiện khuôn mặt + tính metrics + quyết định cảnh báo
+        results, landmarks, analysis = self.analyzer.analyze(frame, timestamp)
+        self._handle_result(frame, fps, timestamp, results, landmarks, analysis)
+    
+    def _handle_result(self, frame: np.ndarray, fps: float, timestamp: Optional[float],
+                       results, landmarks: Optional[np.ndarray], analysis: Optional[dict]):
+        """
+        Learning, cảnh báo, emit trạng thái và vẽ overlay cho kết quả của nguồn chính
+        
+        Args:
+            frame: Frame đã phân tích (vẽ overlay trực tiếp lên frame)
+            fps: FPS hiện tại
+            timestamp: Thời điểm capture của frame
+            results: MediaPipe results
+            landmarks: Landmarks của tài xế (None nếu không có mặt)
+            analysis: Kết quả phân tích (None nếu không có mặt)
         """
-        # Phát hiện khuôn mặt
-        results = self.face_detector.process(frame)
+        clock = time.perf_counter
+        timer = self.stage_timer
+        self._display_meshes = []
+        # Frame này có được hiển thị không (quyết định trước khi vẽ)
+        display = self._display_due = self.frame_store.wants_frame()
+        
+        # Frame ngoại suy (adaptive skip) không phải số đo thật:
+        # không ghi vào log landmarks và không dùng để học ngưỡng
+        predicted = analysis is not None and analysis.get("predicted", False)
+        if self.recorder is not None and timestamp is not None and not predicted:
+            self.recorder.write(timestamp, landmarks if analysis is not None else None)
         
-        if results and results.multi_face_landmarks:
-            self.face_detected.emit(True)
+        if analysis is not None:
+            t0 = clock()
+            ear = analysis["ear"]
+            mar = analysis["mar"]
             
-            h, w = frame.shape[:2]
-            landmarks = self.face_detector.get_landmarks(results, (h, w))
+            # Lấy ngưỡng hiện tại (một snapshot cho cả frame)
+            thresholds = self.config.thresholds
+            ear_threshold = thresholds.ear
             
-            if landmarks is not None:
-                # Lấy landmarks
-                left_eye, right_eye = self.face_detector.get_eye_landmarks(landmarks)
-                mouth = self.face_detector.get_mouth_landmarks(landmarks)
-                
-                # Tính metrics
-                ear, mar = self.processor.process_metrics(left_eye, right_eye, mouth)
-                
-                # Tính chất lượng phát hiện (dựa vào khoảng cách giữa các điểm)
-                eye_width = np.linalg.norm(left_eye[0] - left_eye[3])
-                quality = min(1.0, eye_width / 30.0)  # Normalize, mắt rộ >30px là tốt
-                
-                # Lấy ngưỡng hiện tại
-                ear_threshold = self.config.get("thresholds.ear", 0.25)
-                
-                # Chế độ học liên tục - CHỈ HỌC TRONG KHOẢNG GẦN NGƯỠNG
-                if self.learning_engine.is_enabled():
-                    # Chỉ học khi:
-                    # - Mắt mở (EAR > 0.20) - không học lúc ngủ
-                    # - Không quá cao (EAR < ngưỡng + 0.08) - không để ngưỡng tăng quá
-                    # => Học trong khoảng hợp lý gần ngưỡng
-                    is_in_learning_range = 0.20 < ear < (ear_threshold + 0.08)
-                    if is_in_learning_range and quality >= 0.75:
-                        self.learning_engine.add_sample(ear, mar, quality)
-                        progress = self.learning_engine.get_progress()
-                        if progress > 0:
-                            self.learning_progress.emit(progress)
-                
-                # Phát hiện các trạng thái
-                # Kiểm tra ngáp (không hiển thị ngay, chỉ đếm số lần)
-                self.processor.detect_yawn(mar)
-                
-                # Kiểm tra miệng có đang há rộng không (nghi ngờ ngáp)
-                is_mouth_wide = self.processor.is_mouth_wide_open(mar)
-                
-                # Kiểm tra mệt mỏi (ngáp nhiều + blink bất thường)
-                is_fatigued = self.processor.check_fatigue()
-                
-                # Kiểm tra drowsy - CHỈ KHI miệng KHÔNG há rộng và KHÔNG mệt mỏi
-                # (Tránh nhầm: khi ngáp mắt nhắm là bình thường)
-                if not is_mouth_wide and not is_fatigued:
-                    is_drowsy = self.processor.detect_drowsiness(ear)
-                else:
-                    is_drowsy = False
-                
-                self.processor.detect_blink(ear)
-                
-                # Cập nhật alert - Ưu tiên: Fatigue > Drowsy > Normal
-                if is_fatigued:
-                    # Mệt mỏi: Ngáp nhiều + Blink bất thường
-                    self.alert_system.update_alert(AlertLevel.FATIGUE)
-                    self.status_changed.emit("Fatigue", "#FFC107")
-                    self.alert_changed.emit(AlertLevel.FATIGUE.value)
-                elif is_drowsy:
-                    # Ngủ gật: Mắt nhắm liên tục + miệng không há
-                    self.alert_system.update_alert(AlertLevel.DROWSY)
-                    self.status_changed.emit("DROWSY!", "#f44336")
-                    self.alert_changed.emit(AlertLevel.DROWSY.value)
-                else:
-                    # Bình thường
-                    self.alert_system.update_alert(AlertLevel.NONE)
-                    self.status_changed.emit("Normal", "#4CAF50")
-                    self.alert_changed.emit(AlertLevel.NONE.value)
-                
-                # Emit metrics
-                metrics = {
+            # Chế độ học liên tục - CHỈ HỌC TRONG KHOẢNG GẦN NGƯỠNG
+            progress = 0.0
+            if self.learning_engine.is_enabled() and not predicted:
+                # Chỉ học khi:
+                # - Mắt mở (EAR > 0.20) - không học lúc ngủ
+                # - Không quá cao (EAR < ngưỡng + 0.08) - không để ngưỡng tăng quá
+                # => Học trong khoảng hợp lý gần ngưỡng
+                is_in_learning_range = 0.20 < ear < (ear_threshold + 0.08)
+                if is_in_learning_range and analysis["quality"] >= 0.75:
+                    self.learning_engine.add_sample(ear, mar, analysis["quality"])
+                    progress = self.learning_engine.get_progress()
+            
+            # Cập nhật alert - Ưu tiên: Fatigue > Drowsy > Normal
+            alert_level = analysis["alert_level"]
+            self._update_alert(alert_level)
+            t1 = clock()
+            timer.record("alert", t1 - t0)
+            
+            if progress > 0:
+                self._learning_progress = progress
+            
+            if alert_level == AlertLevel.FATIGUE:
+                # Mệt mỏi: Ngáp nhiều + Blink bất thường
+                status = ("Fatigue", "#FFC107")
+            elif alert_level == AlertLevel.DROWSY:
+                # Ngủ gật: Mắt nhắm liên tục + miệng không há
+                status = ("DROWSY!", "#f44336")
+            else:
+                # Bình thường
+                status = ("Normal", "#4CAF50")
+            self._emit_state(True, status, alert_level)
+            
+            # Snapshot metrics theo tần số UI (snapshot ngưỡng mới nếu learning vừa cập nhật)
+            if self.metrics_snapshot.due():
+                thresholds = self.config.thresholds
+                self.metrics_snapshot.publish({
                     "ear": ear,
                     "mar": mar,
-                    "blink_rate": self.processor.get_blink_rate(),
-                    "yawn_count": self.processor.get_yawn_count(),
-                    "ear_threshold": self.config.get("thresholds.ear", 0.25),
-                    "mar_threshold": self.config.get("thresholds.mar", 0.6)
-                }
-                self.metrics_updated.emit(metrics)
-                
+                    "blink_rate": self.analyzer.processor.get_blink_rate(timestamp),
+                    "yawn_count": self.analyzer.processor.get_yawn_count(timestamp),
+                    "ear_threshold": thresholds.ear,
+                    "mar_threshold": thresholds.mar,
+                    "learning_progress": self._learning_progress
+                })
+            t2 = clock()
+            timer.record("emit_state", t2 - t1)
+            
+            if display:
                 # Vẽ landmarks nếu bật
-                if self.show_landmarks:
-                    self.face_detector.draw_landmarks(frame, results, draw_full_mesh=True)
+                if self.multi_face:
+                    self._draw_faces(frame, results)
+                elif self.show_landmarks:
+                    self._queue_mesh(results, frame.shape[:2], landmarks)
                 
                 # Vẽ alert box
                 self._draw_alert_box(frame, self.alert_system.get_alert_level())
         else:
-            self.face_detected.emit(False)
-            self.status_changed.emit("No face detected", "#9E9E9E")
+            t1 = clock()
+            self._emit_state(False, ("No face detected", "#9E9E9E"), None)
+            t2 = clock()
+            timer.record("emit_state", t2 - t1)
+            
+            # Chế độ nhiều mặt: vẫn vẽ phụ xe khi không thấy tài xế
+            if display and self.multi_face:
+                self._draw_faces(frame, results)
         
         # Vẽ FPS
-        if self.config.get("display.show_fps", True):
-            cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        if display and self.config.thresholds.show_fps:
+            overlay.draw_fps(frame, fps)
+        timer.record("drawing", clock() - t2)
+    
+    def _emit_state(self, face: bool, status: tuple, alert_level: Optional[AlertLevel]):
+        """
+        Emit trạng thái rời rạc khi đổi so với lần emit trước
+        
+        Args:
+            face: Có phát hiện khuôn mặt
+            status: (status_text, color)
+            alert_level: Mức cảnh báo (None = không có mặt, giữ mức cũ)
+        """
+        changed = self.state_filter.changed
+        if changed("face", face):
+            self.face_detected.emit(face)
+        if changed("status", status):
+            self.status_changed.emit(*status)
+        if alert_level is not None and changed("alert", alert_level):
+            self.alert_changed.emit(alert_level.value)
+    
+    def _update_alert(self, alert_level: AlertLevel, source: Optional[str] = None):
+        """
+        Cập nhật AlertSystem
+        
+        Nhiều camera: giữ mức cảnh báo gần nhất của từng nguồn và báo mức cao nhất
+        
+        Args:
+            alert_level: Mức cảnh báo của nguồn ở frame này
+            source: Tên nguồn (None = nguồn chính)
+        """
+        if self.pool is None:
+            self.alert_system.update_alert(alert_level)
+            return
+        self._stream_alerts[source or self.sources[0].name] = alert_level
+        self.alert_system.update_alert(
+            max(self._stream_alerts.values(), key=lambda level: level.value))
+    
+    def _run_streams(self):
+        """Main loop nhiều camera: capture riêng từng nguồn, inference dùng chung pool"""
+        try:
+            opened = []
+            for source in self.sources:
+                if source.is_open:
+                    # keep_warm: camera vẫn chạy từ phiên trước
+                    opened.append(source)
+                    continue
+                try:
+                    source.close()  # Bỏ capture đã chết (nếu có)
+                    source.open()
+                    opened.append(source)
+                except IOError as e:
+                    print(f"[Engine] {e}")
+            
+            if not opened or opened[0] is not self.sources[0]:
+                self.error_occurred.emit(
+                    f"Không mở được camera chính '{self.sources[0].name}'!\n\n"
+                    "Kiểm tra camera.sources trong config/settings.json")
+                return
+            
+            # Nguồn chính dùng analyzer/timer của engine, nguồn phụ có analyzer riêng
+            streams = [InferenceStream(opened[0].name, opened[0].frame_buffer,
+                                       self.analyzer, self.stage_timer)]
+            for source in opened[1:]:
+                # Analyzer (và FaceMesh) của nguồn phụ giữ lại giữa các phiên
+                if source.name not in self._secondary:
+                    timer = StageTimer()
+                    detector = FaceDetector.from_config(self.config)
+                    if self.multi_face:
+                        analyzer = MultiFaceAnalyzer(self.config, detector, timer)
+                    else:
+                        analyzer = FrameAnalyzer(self.config, detector, timer)
+                    self._secondary[source.name] = (analyzer, timer)
+                analyzer, timer = self._secondary[source.name]
+                streams.append(InferenceStream(source.name, source.frame_buffer,
+                                               analyzer, timer))
+            
+            self.frame_buffer = opened[0].frame_buffer
+            self.pool = InferencePool(
+                streams, self.config.get("performance.inference_workers", 1))
+            self.pool.start()
+            print(f"[Engine] {len(streams)} camera, {self.pool.worker_count} inference worker")
+            
+            self.running_changed.emit(True)
+            self.prev_time = time.time()
+            primary = streams[0]
+            clock = time.perf_counter
+            timer = self.stage_timer
+            
+            while self.is_running and not self._paused:
+                item = self.pool.get_result(timeout=0.5)
+                if item is None:
+                    if primary.closed or not self.pool.is_active():
+                        error = opened[0].error or self.pool.error
+                        if error:
+                            self.error_occurred.emit(error)
+                        break
+                    continue
+                
+                stream, frame, timestamp, output = item
+                # "total" do pool.release ghi lên timer của stream (nguồn chính: self.stage_timer)
+                try:
+                    if output is None:
+                        # Analyzer của nguồn này lỗi, pool đã đóng stream
+                        self.error_occurred.emit(stream.error)
+                        if stream is primary:
+                            break
+                        self._stream_alerts.pop(stream.name, None)
+                        continue
+                    
+                    results, landmarks, analysis = output
+                    if stream is not primary:
+                        # Nguồn phụ: chỉ góp mức cảnh báo
+                        if analysis is not None:
+                            self._update_alert(analysis["alert_level"], stream.name)
+                        continue
+                    
+                    current_time = time.time()
+                    elapsed = current_time - self.prev_time
+                    fps_value = 1 / elapsed if elapsed > 0 else 0
+                    self.prev_time = current_time
+                    
+                    self._handle_result(frame, fps_value, timestamp,
+                                        results, landmarks, analysis)
+                    
+                    t_emit = clock()
+                    if self._display_due and self._publish_frame(frame, fps_value):
+                        self.frame_ready.emit(fps_value)
+                    t_end = clock()
+                    timer.record("emit_frame", t_end - t_emit)
+                    self._report_first_frame()
+                    
+                    if t_end - self._last_timing_publish >= self.timing_interval:
+                        self._last_timing_publish = t_end
+                        self.timings_updated.emit(timer.snapshot())
+                finally:
+                    self.pool.release(stream)
+                
+        finally:
+            # Worker dừng sau mỗi phiên (kể cả keep_warm), tạo lại khi resume
+            self._stop_pool()
+    
+    def _draw_faces(self, frame: np.ndarray, results):
+        """
+        Vẽ landmarks và nhãn ID của tất cả khuôn mặt (chế độ nhiều mặt)
+        
+        Args:
+            frame: Frame để vẽ
+            results: MediaPipe results của frame
+        """
+        for face in self.analyzer.faces:
+            if self.show_landmarks:
+                self._queue_mesh(results, frame.shape[:2], face["landmarks"], face["index"])
+            overlay.draw_face_label(frame, face["landmarks"], face["id"],
+                                    face["is_driver"], face["analysis"]["alert_level"])
+    
+    def _queue_mesh(self, results, frame_shape, landmarks: Optional[np.ndarray],
+                    face_index: int = 0):
+        """
+        Lưu lưới mặt để vẽ sau khi scale về kích thước hiển thị (frame_store)
+        
+        Args:
+            results: MediaPipe results của frame
+            frame_shape: Kích thước frame capture (height, width)
+            landmarks: Key landmarks (20, 2) của khuôn mặt
+            face_index: Vị trí khuôn mặt trong multi_face_landmarks
+        """
+        points = None
+        if len(self.face_detector.mesh_renderer.point_indices):
+            # Chỉ các điểm mà mức lưới hiện tại vẽ (lite ~ viền + mống mắt)
+            points = self.face_detector.get_mesh_points(results, frame_shape, face_index)
+        if points is not None:
+            # Copy vì buffer của FaceDetector bị ghi đè ở mặt tiếp theo
+            points = points.copy()
+        elif landmarks is None:
+            return
+        self._display_meshes.append((points, landmarks))
+    
+    def _draw_display_meshes(self, image: np.ndarray, scale: float):
+        """
+        Vẽ các lưới đã lưu ở frame này (gọi từ frame_store.publish)
+        
+        Args:
+            image: Frame BGR đã scale về kích thước hiển thị
+            scale: Tỷ lệ từ frame capture sang image
+        """
+        for points, landmarks in self._display_meshes:
+            if points is not None:
+                self.face_detector.mesh_renderer.draw(image, points, scale)
+            if landmarks is not None:
+                left_eye, right_eye = FaceDetector.get_eye_landmarks(landmarks)
+                MeshRenderer.draw_eyes(image, left_eye, right_eye, scale)
+    
+    def _publish_frame(self, frame: np.ndarray, fps: float) -> bool:
+        """Đưa frame vào frame_store, vẽ lưới mặt ở độ phân giải hiển thị"""
+        draw = self._draw_display_meshes if self._display_meshes else None
+        notify = self.frame_store.publish(frame, fps, draw)
+        self._display_meshes = []
+        return notify
     
     def _draw_alert_box(self, frame: np.ndarray, alert_level: AlertLevel):
         """
@@ -270,57 +622,196 @@ class DetectionEngine(QThread):
             frame: Frame để vẽ
             alert_level: Mức độ cảnh báo
         """
-        h, w = frame.shape[:2]
+        self.overlay_cache.draw_alert_box(frame, alert_level)
+    
+    def preload(self):
+        """Start engine thread ở trạng thái tạm dừng để khởi tạo + warm-up FaceMesh trước"""
+        if not self._resources_released and not self.isRunning():
+            self.start()
+    
+    def resume(self):
+        """Bắt đầu / chạy tiếp detection (gọi từ GUI thread, không chặn)"""
+        if self._resources_released or not self.is_running:
+            # Engine đã dừng (stop() hoặc khởi tạo lỗi) - báo lại để GUI bật nút
+            self.running_changed.emit(False)
+            self.error_occurred.emit("Detection engine đã dừng, hãy khởi động lại ứng dụng")
+            return
+        self._start_request = time.perf_counter()
+        self._paused = False
+        self._resume_event.set()
+        if not self.isRunning():
+            self.start()
+    
+    def pause(self):
+        """
+        Tạm dừng detection (gọi từ GUI thread, không chặn)
         
-        if alert_level == AlertLevel.DROWSY:
-            color = (0, 0, 255)  # Đỏ
-            text = "WARNING: DROWSY!"
-            thickness = 10
-        elif alert_level == AlertLevel.FATIGUE:
-            color = (0, 255, 255)  # Vàng
-            text = "Warning: Fatigue"
-            thickness = 5
+        Giữ FaceMesh, âm thanh và learning; camera được giữ nếu camera.keep_warm
+        """
+        self._paused = True
+        self._resume_event.clear()
+    
+    @property
+    def is_active(self) -> bool:
+        """Đang chạy detection (không tạm dừng, chưa stop)"""
+        return self.is_running and not self._paused and self.isRunning()
+    
+    def stop(self):
+        """Dừng hẳn engine và giải phóng toàn bộ tài nguyên"""
+        print("[Engine] Đang dừng...")
+        self.is_running = False
+        self._resume_event.set()
+        if self.isRunning():
+            self.wait()  # Đợi thread kết thúc (thread tự dọn dẹp)
         else:
+            self._cleanup()
+    
+    def _report_first_frame(self):
+        """Ghi nhận độ trễ từ resume() tới frame đầu tiên được xử lý"""
+        if self._start_request is None:
             return
+        latency = time.perf_counter() - self._start_request
+        self._start_request = None
+        self.last_start_latency = latency
+        print(f"[Engine] Frame đầu tiên sau {latency * 1000:.0f}ms")
+        self.start_latency.emit(latency * 1000.0)
+    
+    def _begin_session(self):
+        """Bắt đầu một phiên: thống kê latency chỉ tính frame của phiên này"""
+        self.stage_timer.reset()
+        for _, timer in self._secondary.values():
+            timer.reset()
+        self._last_timing_publish = 0.0
+    
+    def _end_session(self):
+        """Kết thúc một phiên: tắt cảnh báo, reset trạng thái, đóng camera nếu cần"""
+        failed = self.is_running and not self._paused
+        if failed:
+            # Phiên kết thúc do lỗi camera/inference -> về trạng thái tạm dừng
+            self.pause()
         
-        # Vẽ viền
-        cv2.rectangle(frame, (thickness, thickness),
-                     (w - thickness, h - thickness), color, thickness)
+        if failed or not (self.is_running and self.keep_camera_warm):
+            self._close_cameras()
         
-        # Vẽ text
-        text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
-        text_x = (w - text_size[0]) // 2
-        text_y = 80
+        self._start_request = None
+        self._stream_alerts.clear()
+        if self.alert_system:
+            self.alert_system.update_alert(AlertLevel.NONE)
+        if self.analyzer:
+            self.analyzer.reset()
+        for analyzer, _ in self._secondary.values():
+            analyzer.reset()
+        self._display_meshes = []
+        self.frame_store.clear()
+        # Phiên sau emit lại toàn bộ trạng thái
+        self.state_filter.reset()
+        self.metrics_snapshot.clear()
+        self._learning_progress = None
         
-        cv2.rectangle(frame, (text_x - 10, text_y - text_size[1] - 10),
-                     (text_x + text_size[0] + 10, text_y + 10), color, -1)
+        # Ghi ngưỡng đã học còn chờ trong background writer
+        self.config.flush()
         
-        cv2.putText(frame, text, (text_x, text_y),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        self.running_changed.emit(False)
+        print("[Engine] Đã tạm dừng")
     
-    def stop(self):
-        """Dừng engine"""
-        print("[Engine] Đang dừng...")
-        self.is_running = False
-        self.wait()  # Đợi thread kết thúc
+    def _stop_pool(self):
+        """Dừng inference worker của chế độ nhiều camera"""
+        if self.pool:
+            for name, stats in self.pool.get_stats().items():
+                total = stats["timings"]["total"]
+                print(f"[Engine] '{name}': analyzed={stats['frames_analyzed']}, "
+                      f"dropped={stats['capture'].get('frames_dropped', 0)}, "
+                      f"latency p50={total['p50_ms']:.1f}ms p99={total['p99_ms']:.1f}ms")
+            self.pool.stop()
+            self.pool = None
+    
+    def _close_cameras(self):
+        """Dừng capture thread và release tất cả camera"""
+        self._stop_pool()
+        for source in self.sources:
+            source.close()
+        
+        # Dừng capture thread trước khi release camera
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+        
+        if self.frame_buffer:
+            stats = self.frame_buffer.get_stats()
+            print(f"[Engine] Frames: processed={stats['frames_processed']}, "
+                  f"dropped={stats['frames_dropped']}")
+            self.frame_buffer = None
+        
+        if self.cap:
+            self.cap.release()
+            self.cap = None
     
     def _cleanup(self):
-        """Dọn dẹp tài nguyên"""
+        """Dọn dẹp tài nguyên (một lần, khi stop)"""
+        if self._resources_released:
+            return
+        self._resources_released = True
         try:
-            if self.cap:
-                self.cap.release()
-                self.cap = None
+            self._close_cameras()
+            for analyzer, _ in self._secondary.values():
+                analyzer.face_detector.release()
+            self._secondary.clear()
             
-            self.processor.reset()
-            self.alert_system.cleanup()
+            if self.analyzer:
+                self.analyzer.reset()
+            if self.alert_system:
+                self.alert_system.cleanup()
             
             if self.face_detector:
                 self.face_detector.release()
             
+            if self.recorder:
+                self.recorder.close()
+                self.recorder = None
+            
+            # Ghi ngưỡng đã học còn chờ trong background writer
+            self.config.flush()
+            
             print("[Engine] Đã dọn dẹp tài nguyên")
         except Exception as e:
             print(f"[Engine] Lỗi khi dọn dẹp: {e}")
     
+    def get_timing_snapshot(self) -> dict:
+        """
+        Lấy thống kê latency từng stage (an toàn khi gọi từ GUI thread)
+        
+        Returns:
+            Dict stage -> {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}
+        """
+        return self.stage_timer.snapshot()
+    
+    def reset_timings(self):
+        """Xóa thống kê latency (tự động ở đầu mỗi phiên)"""
+        self.stage_timer.reset()
+    
+    def get_capture_stats(self) -> dict:
+        """
+        Lấy thống kê capture (frames processed/dropped)
+        
+        Returns:
+            Dict thống kê, rỗng nếu chưa chạy
+        """
+        if self.frame_buffer is None:
+            return {}
+        return self.frame_buffer.get_stats()
+    
+    def get_stream_stats(self) -> dict:
+        """
+        Lấy thống kê từng camera ở chế độ nhiều camera
+        
+        Returns:
+            Dict tên nguồn -> {frames_analyzed, capture, timings}, rỗng nếu
+            không chạy nhiều camera
+        """
+        if self.pool is None:
+            return {}
+        return self.pool.get_stats()
+    
     def toggle_landmarks(self):
         """Bật/tắt hiển thị landmarks"""
         self.show_landmarks = not self.show_landmarks
@@ -0,0 +1,191 @@
+"""
+Frame Analyzer - Pipeline FaceDetector -> MetricsProcessor -> quyết định cảnh báo
+Không phụ thuộc GUI/âm thanh, dùng chung cho DetectionEngine và chế độ headless
+"""
+import time
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from ..detection import LandmarkLayout, MetricsProcessor
+from ..alert.alert_level import AlertLevel
+from .inference_scheduler import InferenceScheduler, LandmarkPredictor
+
+if TYPE_CHECKING:
+    from ..detection.face_detector import FaceDetector
+
+
+class FrameAnalyzer:
+    """Phân tích một frame (hoặc landmarks) và quyết định mức cảnh báo"""
+
+    def __init__(self, config_manager, face_detector: Optional["FaceDetector"] = None,
+                 stage_timer=None, scheduler: Optional[InferenceScheduler] = None):
+        """
+        Khởi tạo FrameAnalyzer
+
+        Args:
+            config_manager: ConfigManager instance
+            face_detector: FaceDetector dùng chung (None = tạo mới khi cần)
+            stage_timer: StageTimer để đo từng stage (None = không đo)
+            scheduler: InferenceScheduler để bỏ qua FaceMesh ở một số frame
+                (None = inference mọi frame)
+        """
+        self.config = config_manager
+        self.face_detector = face_detector
+        self.stage_timer = stage_timer
+        self.processor = MetricsProcessor(self.config)
+        
+        # Frame-skipping: landmarks ở frame không inference được ngoại suy
+        self.scheduler = scheduler
+        self.predictor = LandmarkPredictor(
+            self.config.get("performance.max_extrapolation", 0.25))
+        self._last_results = None
+
+    def analyze(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """
+        Phát hiện khuôn mặt và phân tích một frame BGR
+
+        Args:
+            frame: Frame BGR
+            timestamp: Thời điểm capture của frame (giây)
+
+        Returns:
+            (results, landmarks, analysis) - landmarks/analysis là None nếu không có mặt
+        """
+        if self.face_detector is None:
+            # Import khi cần: analyze_landmarks (replay) không cần mediapipe
+            from ..detection.face_detector import FaceDetector
+            self.face_detector = FaceDetector.from_config(self.config)
+
+        timer = self.stage_timer
+        clock = time.perf_counter
+        scheduler = self.scheduler
+        if timestamp is None:
+            timestamp = time.time()
+
+        if scheduler is not None and not scheduler.should_infer():
+            t0 = clock()
+            landmarks = self.predictor.predict(timestamp)
+            if landmarks is not None:
+                scheduler.record_prediction()
+                analysis = self.analyze_landmarks(landmarks, timestamp)
+                analysis["predicted"] = True
+                if timer is not None:
+                    timer.record("predict", clock() - t0)
+                return self._last_results, landmarks, analysis
+
+        t0 = clock()
+        rgb_frame = self.face_detector.to_rgb(frame)
+        t1 = clock()
+        results = self.face_detector.process_rgb(rgb_frame, frame)
+        t2 = clock()
+        if timer is not None:
+            timer.record("bgr_to_rgb", t1 - t0)
+            timer.record("inference", t2 - t1)
+        if scheduler is not None:
+            scheduler.record_inference(t2 - t0)
+        self._last_results = results
+
+        if not results or not results.multi_face_landmarks:
+            self.processor.mark_face_lost(timestamp)
+            self.predictor.reset()
+            if scheduler is not None:
+                scheduler.force_inference()
+            return results, None, None
+
+        h, w = frame.shape[:2]
+        # Chỉ cần 20 điểm mắt + miệng, dùng chung cho metrics và vẽ
+        landmarks = self.face_detector.get_landmarks(results, (h, w), key_only=True)
+        t3 = clock()
+        if timer is not None:
+            timer.record("landmarks", t3 - t2)
+        if landmarks is None:
+            self.processor.mark_face_lost(timestamp)
+            return results, None, None
+
+        if scheduler is not None:
+            self.predictor.update(landmarks, timestamp)
+
+        analysis = self.analyze_landmarks(landmarks, timestamp)
+        analysis["predicted"] = False
+        if timer is not None:
+            timer.record("metrics", clock() - t3)
+
+        return results, landmarks, analysis
+
+    def analyze_landmarks(self, landmarks: np.ndarray,
+                          timestamp: Optional[float] = None,
+                          metrics: Optional[Tuple[float, float]] = None) -> dict:
+        """
+        Tính metrics và quyết định cảnh báo từ landmarks pixel
+
+        Args:
+            landmarks: Full mesh (478, 2) hoặc key subset (20, 2)
+            timestamp: Thời điểm capture của frame (giây)
+            metrics: (ear, mar) thô đã tính theo batch (None = tính tại đây)
+
+        Returns:
+            Dict kết quả phân tích (ear, mar, quality, các trạng thái, alert_level)
+        """
+        self.processor.mark_face_found(timestamp)
+        left_eye, right_eye = LandmarkLayout.get_eye_landmarks(landmarks)
+        mouth = LandmarkLayout.get_mouth_landmarks(landmarks)
+
+        # Tính metrics
+        if metrics is not None:
+            ear, mar = self.processor.smooth_metrics(*metrics)
+        else:
+            ear, mar = self.processor.process_metrics(left_eye, right_eye, mouth)
+
+        # Tính chất lượng phát hiện (dựa vào khoảng cách giữa các điểm)
+        eye_width = np.linalg.norm(left_eye[0] - left_eye[3])
+        quality = min(1.0, eye_width / 30.0)  # Normalize, mắt rộng >30px là tốt
+
+        # Phát hiện các trạng thái
+        # Kiểm tra ngáp (không hiển thị ngay, chỉ đếm số lần)
+        self.processor.detect_yawn(mar, timestamp)
+
+        # Kiểm tra miệng có đang há rộng không (nghi ngờ ngáp)
+        is_mouth_wide = self.processor.is_mouth_wide_open(mar)
+
+        # Kiểm tra mệt mỏi (ngáp nhiều + blink bất thường)
+        is_fatigued = self.processor.check_fatigue(timestamp)
+
+        # Kiểm tra drowsy - CHỈ KHI miệng KHÔNG há rộng và KHÔNG mệt mỏi
+        # (Tránh nhầm: khi ngáp mắt nhắm là bình thường)
+        if not is_mouth_wide and not is_fatigued:
+            is_drowsy = self.processor.detect_drowsiness(ear, timestamp)
+        else:
+            self.processor.pause_drowsiness(timestamp)
+            is_drowsy = False
+
+        self.processor.detect_blink(ear, timestamp)
+
+        if self.scheduler is not None:
+            self.scheduler.observe(ear, self.config.thresholds.ear)
+
+        # Quyết định alert - Ưu tiên: Fatigue > Drowsy > Normal
+        if is_fatigued:
+            alert_level = AlertLevel.FATIGUE
+        elif is_drowsy:
+            alert_level = AlertLevel.DROWSY
+        else:
+            alert_level = AlertLevel.NONE
+
+        return {
+            "ear": ear,
+            "mar": mar,
+            "quality": quality,
+            "is_mouth_wide": is_mouth_wide,
+            "is_yawning": self.processor.is_yawning,
+            "is_fatigued": is_fatigued,
+            "is_drowsy": is_drowsy,
+            "alert_level": alert_level
+        }
+
+    def reset(self):
+        """Reset trạng thái metrics (giữ nguyên FaceDetector)"""
+        self.processor.reset()
+        self.predictor.reset()
+        self._last_results = None
+        if self.scheduler is not None:
+            self.scheduler.force_inference()
@@ -0,0 +1,175 @@
+"""
+Frame Ring Buffer - Bộ đệm vòng cấp phát trước giữa capture và processing
+Capture ghi liên tục, processing luôn lấy frame mới nhất (latest-frame-wins)
+"""
+import threading
+import numpy as np
+from typing import Callable, Optional, Tuple
+
+
+class FrameRingBuffer:
+    """
+    Bộ đệm vòng kích thước cố định cho frame camera
+
+    - Writer (capture thread) không bao giờ ghi đè slot đang được đọc
+      hoặc slot mới nhất, nên reader luôn nhận frame nguyên vẹn
+    - Reader chỉ lấy frame mới nhất, các frame cũ hơn bị bỏ qua và
+      được đếm vào frames_dropped
+    """
+
+    def __init__(self, capacity: int = 3):
+        """
+        Khởi tạo FrameRingBuffer
+
+        Args:
+            capacity: Số slot (>= 3: đang đọc, mới nhất, đang ghi)
+        """
+        if capacity < 3:
+            raise ValueError("FrameRingBuffer cần ít nhất 3 slot")
+
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._timestamps = [0.0] * capacity
+        self._seqs = [-1] * capacity
+
+        self._cond = threading.Condition()
+        self._next_seq = 0
+        self._latest_index = -1
+        self._held_index = -1
+        self._writing_index = -1
+        self._last_read_seq = -1
+        self._closed = False
+
+        # Gọi (ngoài lock) sau mỗi frame mới hoặc khi đóng - dùng để đánh thức
+        # InferencePool đang chờ nhiều buffer cùng lúc
+        self.on_commit: Optional[Callable[[], None]] = None
+
+        # Counters
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+
+    def allocate(self, shape: Tuple[int, ...], dtype=np.uint8):
+        """
+        Cấp phát trước toàn bộ slot
+
+        Args:
+            shape: Kích thước frame (height, width, channels)
+            dtype: Kiểu dữ liệu
+        """
+        with self._cond:
+            self._slots = [np.empty(shape, dtype=dtype) for _ in range(self.capacity)]
+
+    def begin_write(self) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Chọn slot để ghi frame tiếp theo
+
+        Returns:
+            (slot_index, slot_array) - slot_array có thể truyền thẳng vào
+            cv2.VideoCapture.read() để tránh cấp phát mới
+        """
+        with self._cond:
+            index = self._latest_index
+            for _ in range(self.capacity):
+                index = (index + 1) % self.capacity
+                if index != self._held_index and index != self._latest_index:
+                    break
+            self._writing_index = index
+            return index, self._slots[index]
+
+    def commit_write(self, index: int, frame: np.ndarray, timestamp: float):
+        """
+        Công bố frame vừa ghi là frame mới nhất
+
+        Args:
+            index: Slot lấy từ begin_write()
+            frame: Frame đã đọc (thường chính là slot_array)
+            timestamp: Thời điểm capture
+        """
+        slot = self._slots[index]
+        if frame is not slot:
+            if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+                # Kích thước camera thay đổi - cấp phát lại slot này
+                slot = np.empty_like(frame)
+            np.copyto(slot, frame)
+
+        with self._cond:
+            self._slots[index] = slot
+            self._timestamps[index] = timestamp
+            self._seqs[index] = self._next_seq
+            self._next_seq += 1
+            self._latest_index = index
+            self._writing_index = -1
+            self.frames_written += 1
+            self._cond.notify()
+
+        if self.on_commit is not None:
+            self.on_commit()
+
+    def put(self, frame: np.ndarray, timestamp: float):
+        """Sao chép frame vào buffer (tiện dụng khi không đọc trực tiếp vào slot)"""
+        index, _ = self.begin_write()
+        self.commit_write(index, frame, timestamp)
+
+    def get_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Lấy frame mới nhất, chờ nếu chưa có frame mới
+
+        Frame trả về thuộc về buffer và chỉ hợp lệ đến lần gọi tiếp theo
+
+        Args:
+            timeout: Thời gian chờ tối đa (giây), None = chờ vô hạn
+
+        Returns:
+            (frame, timestamp, seq) hoặc None nếu hết thời gian / buffer đã đóng
+        """
+        with self._cond:
+            # Trả lại slot đang giữ từ lần đọc trước
+            self._held_index = -1
+
+            has_new = self._cond.wait_for(
+                lambda: self._closed or self._next_seq - 1 > self._last_read_seq,
+                timeout)
+            if not has_new or self._next_seq - 1 <= self._last_read_seq:
+                return None
+
+            index = self._latest_index
+            seq = self._seqs[index]
+            self.frames_dropped += seq - self._last_read_seq - 1
+            self._last_read_seq = seq
+            self._held_index = index
+            self.frames_processed += 1
+
+            return self._slots[index], self._timestamps[index], seq
+
+    def has_new(self) -> bool:
+        """Có frame chưa đọc không (không chờ)"""
+        return self._next_seq - 1 > self._last_read_seq
+
+    def close(self):
+        """Đóng buffer, đánh thức reader đang chờ"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self.on_commit is not None:
+            self.on_commit()
+
+    def is_closed(self) -> bool:
+        """Kiểm tra buffer đã đóng chưa"""
+        return self._closed
+
+    def get_stats(self) -> dict:
+        """
+        Lấy thống kê buffer
+
+        Returns:
+            Dict chứa các counters
+        """
+        with self._cond:
+            return {
+                "frames_written": self.frames_written,
+                "frames_processed": self.frames_processed,
+                "frames_dropped": self.frames_dropped,
+                "capacity": self.capacity
+            }
@@ -0,0 +1,76 @@
+"""
+Frame Capture - Thread đọc camera độc lập với vòng xử lý
+Ghi frame vào FrameRingBuffer để processing luôn lấy frame mới nhất
+"""
+import threading
+import time
+import cv2
+from typing import Optional
+
+from .frame_buffer import FrameRingBuffer
+
+
+class FrameCapture(threading.Thread):
+    """Thread đọc frame từ cv2.VideoCapture vào ring buffer"""
+
+    def __init__(self, cap: cv2.VideoCapture, frame_buffer: FrameRingBuffer,
+                 max_failures: int = 10, retry_delay: float = 0.05):
+        """
+        Khởi tạo FrameCapture
+
+        Args:
+            cap: VideoCapture đã mở
+            frame_buffer: Ring buffer để ghi frame
+            max_failures: Số lần đọc lỗi liên tiếp trước khi dừng
+            retry_delay: Thời gian chờ giữa các lần đọc lỗi (giây)
+        """
+        super().__init__(name="FrameCapture", daemon=True)
+
+        self.cap = cap
+        self.frame_buffer = frame_buffer
+        self.max_failures = max_failures
+        self.retry_delay = retry_delay
+
+        # Lỗi cuối cùng (None nếu dừng bình thường)
+        self.error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Vòng đọc camera - chạy nhanh nhất camera cho phép"""
+        failures = 0
+
+        try:
+            while not self._stop_event.is_set():
+                index, slot = self.frame_buffer.begin_write()
+
+                # Đọc trực tiếp vào slot đã cấp phát (nếu đúng kích thước)
+                if slot is not None:
+                    ret, frame = self.cap.read(slot)
+                else:
+                    ret, frame = self.cap.read()
+
+                if not ret:
+                    failures += 1
+                    if failures >= self.max_failures:
+                        self.error = "Mất kết nối camera sau nhiều lần thử"
+                        break
+                    self._stop_event.wait(self.retry_delay)
+                    continue
+
+                failures = 0
+                self.frame_buffer.commit_write(index, frame, time.time())
+        except Exception as e:
+            self.error = f"Lỗi capture: {str(e)}"
+        finally:
+            self.frame_buffer.close()
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Dừng thread capture
+
+        Args:
+            timeout: Thời gian chờ thread kết thúc (giây)
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
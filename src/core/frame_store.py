@@ -0,0 +1,191 @@
+"""
+Display Frame Store - Double buffer frame hiển thị giữa worker và GUI
+Worker chuyển màu + scale sẵn, GUI chỉ bọc buffer thành QImage (không copy)
+Tần số hiển thị giới hạn riêng (display.max_fps), độc lập với tần số detection
+"""
+import threading
+import time
+import cv2
+import numpy as np
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+
+class DisplayFrameStore:
+    """
+    Double buffer RGB đã scale theo kích thước khung hiển thị
+
+    - Worker ghi vào back buffer (GUI không bao giờ đọc back buffer),
+      sau đó đổi front/back dưới lock
+    - GUI đọc front buffer dưới lock, nên worker không thể đổi buffer
+      trong lúc GUI đang dùng
+    - Worker hỏi wants_frame() trước khi vẽ overlay: frame không hiển thị
+      (quá giới hạn FPS hoặc cửa sổ đang ẩn) bỏ qua cả vẽ, scale và đổi màu
+    """
+
+    # Chất lượng scale: fast = nearest neighbour, smooth = area (thu nhỏ) / linear (phóng to)
+    SCALING = ("fast", "smooth")
+
+    def __init__(self, max_fps: float = 0.0, scaling: str = "smooth"):
+        """
+        Khởi tạo DisplayFrameStore
+
+        Args:
+            max_fps: Số frame hiển thị tối đa mỗi giây (<= 0 = không giới hạn)
+            scaling: Chất lượng scale ("fast", "smooth")
+        """
+        if scaling not in self.SCALING:
+            print(f"[FrameStore] Chế độ scale không hợp lệ: {scaling}, dùng 'smooth'")
+            scaling = "smooth"
+        self.scaling = scaling
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._next_publish = 0.0
+        # GUI đặt True khi cửa sổ thu nhỏ / bị ẩn
+        self.suspended = False
+
+        self._buffers = [None, None]
+        self._scaled: Optional[np.ndarray] = None
+        self._front = 0
+        self._lock = threading.Lock()
+
+        # Kích thước khung hiển thị (width, height), None = giữ nguyên
+        self._target_size: Optional[Tuple[int, int]] = None
+
+        self._consumed = True
+        self.fps = 0.0
+        self.frames_published = 0
+
+    @classmethod
+    def from_config(cls, config_manager) -> "DisplayFrameStore":
+        """
+        Tạo DisplayFrameStore theo display.max_fps và display.scaling
+
+        Args:
+            config_manager: ConfigManager instance
+
+        Returns:
+            DisplayFrameStore
+        """
+        return cls(max_fps=config_manager.get("display.max_fps", 0),
+                   scaling=config_manager.get("display.scaling", "smooth"))
+
+    def set_suspended(self, suspended: bool):
+        """
+        Tạm ngừng / tiếp tục hiển thị (gọi từ GUI thread)
+
+        Args:
+            suspended: True khi cửa sổ thu nhỏ hoặc bị ẩn
+        """
+        if suspended != self.suspended:
+            self.suspended = suspended
+            print(f"[FrameStore] Hiển thị: {'TẠM NGỪNG' if suspended else 'TIẾP TỤC'}")
+
+    def wants_frame(self) -> bool:
+        """
+        Frame hiện tại có được hiển thị không (worker thread, trước khi vẽ overlay)
+
+        Returns:
+            False nếu đang tạm ngừng hoặc chưa tới lượt theo max_fps
+        """
+        if self.suspended:
+            return False
+        if self.min_interval <= 0:
+            return True
+        # Cho phép sớm 1/4 chu kỳ: camera 30fps, max_fps 15 vẫn được đúng 15fps
+        # dù thời điểm frame dao động
+        return time.monotonic() >= self._next_publish - 0.25 * self.min_interval
+
+    def set_target_size(self, width: int, height: int):
+        """
+        Đặt kích thước khung hiển thị (gọi từ GUI thread)
+
+        Args:
+            width: Chiều rộng khung
+            height: Chiều cao khung
+        """
+        if width > 0 and height > 0:
+            self._target_size = (width, height)
+
+    def publish(self, frame: np.ndarray, fps: float,
+                draw: Optional[Callable[[np.ndarray, float], None]] = None) -> bool:
+        """
+        Scale + BGR->RGB frame vào back buffer rồi đổi buffer (worker thread)
+
+        Args:
+            frame: Frame BGR đã vẽ overlay
+            fps: FPS hiện tại
+            draw: Hàm vẽ thêm ở độ phân giải hiển thị, gọi draw(image_bgr, scale)
+                  sau khi scale, trước khi đổi màu
+
+        Returns:
+            True nếu GUI đã đọc frame trước đó (cần gửi thông báo mới),
+            False nếu GUI chưa đọc - thông báo cũ vẫn đang chờ
+        """
+        if self.min_interval > 0:
+            # Lịch cố định theo chu kỳ, không trôi theo độ trễ từng frame;
+            # frame đầu tiên hoặc sau khi bị trễ hơn một chu kỳ thì lập lịch lại
+            now = time.monotonic()
+            if now - self._next_publish > self.min_interval:
+                self._next_publish = now
+            self._next_publish += self.min_interval
+
+        h, w = frame.shape[:2]
+        size = self._fit_size(w, h)
+
+        back_index = 1 - self._front
+        back = self._buffers[back_index]
+        if back is None or back.shape[:2] != (size[1], size[0]):
+            back = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._buffers[back_index] = back
+
+        if size != (w, h):
+            if self._scaled is None or self._scaled.shape != back.shape:
+                self._scaled = np.empty_like(back)
+            if self.scaling == "fast":
+                interpolation = cv2.INTER_NEAREST
+            else:
+                interpolation = cv2.INTER_AREA if size[0] < w else cv2.INTER_LINEAR
+            cv2.resize(frame, size, dst=self._scaled, interpolation=interpolation)
+            if draw is not None:
+                draw(self._scaled, size[0] / w)
+            cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=back)
+        else:
+            if draw is not None:
+                draw(frame, 1.0)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=back)
+
+        with self._lock:
+            self._front = back_index
+            self.fps = fps
+            self.frames_published += 1
+            notify = self._consumed
+            self._consumed = False
+        return notify
+
+    @contextmanager
+    def read(self):
+        """
+        Đọc front buffer (GUI thread) - chỉ dùng buffer bên trong khối with
+
+        Yields:
+            (frame_rgb, fps) - frame_rgb là None nếu chưa có frame
+        """
+        with self._lock:
+            self._consumed = True
+            yield self._buffers[self._front], self.fps
+
+    def clear(self):
+        """Xóa frame đang lưu"""
+        with self._lock:
+            self._buffers = [None, None]
+            self._scaled = None
+            self._consumed = True
+        self._next_publish = 0.0
+
+    def _fit_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Kích thước giữ tỷ lệ khung hình, vừa khung hiển thị"""
+        target = self._target_size
+        if target is None:
+            return width, height
+        scale = min(target[0] / width, target[1] / height)
+        return max(1, int(width * scale)), max(1, int(height * scale))
@@ -0,0 +1,222 @@
+"""
+Inference Pool - Nhóm worker thread dùng chung cho nhiều camera
+Lập lịch round-robin giữa các stream, mỗi stream tối đa một frame đang xử lý
+"""
+import queue
+import threading
+import time
+import cv2
+from typing import List, Optional, Tuple
+
+from .frame_buffer import FrameRingBuffer
+from .stage_timer import StageTimer
+
+
+class InferenceStream:
+    """Một stream trong pool: ring buffer nguồn + analyzer + thống kê riêng"""
+
+    def __init__(self, name: str, frame_buffer: FrameRingBuffer, analyzer,
+                 stage_timer: Optional[StageTimer] = None, mirror: bool = True):
+        """
+        Khởi tạo InferenceStream
+
+        Args:
+            name: Tên stream
+            frame_buffer: Ring buffer do thread capture ghi vào
+            analyzer: FrameAnalyzer/MultiFaceAnalyzer riêng của stream
+                (giữ trạng thái tracking và metrics của camera này)
+            stage_timer: StageTimer của stream (None = tạo mới)
+            mirror: Lật ngang frame trước khi phân tích
+        """
+        self.name = name
+        self.frame_buffer = frame_buffer
+        self.analyzer = analyzer
+        self.stage_timer = stage_timer if stage_timer is not None else StageTimer()
+        self.mirror = mirror
+
+        # Trạng thái lập lịch (truy cập dưới lock của pool)
+        self.in_flight = False
+        self.closed = False
+        self._timestamp = 0.0
+        # Lỗi analyzer đã làm đóng stream (None nếu không có)
+        self.error: Optional[str] = None
+
+        self.frames_analyzed = 0
+
+
+class InferencePool:
+    """
+    Worker thread chạy analyzer.analyze() cho tất cả stream
+
+    - Worker chọn stream tiếp theo theo vòng tròn, bỏ qua stream đang có
+      frame xử lý dở hoặc chưa có frame mới -> không stream nào chiếm hết worker
+    - Kết quả trả về qua get_result(); stream chỉ được lập lịch lại sau
+      release(), nên frame trả về không bị ghi đè khi consumer còn dùng
+    - Analyzer của stream ném lỗi -> stream bị đóng và lỗi được trả ngay
+      qua get_result() (không thử lại mỗi frame)
+    """
+
+    def __init__(self, streams: List[InferenceStream], workers: int = 1):
+        """
+        Khởi tạo InferencePool
+
+        Args:
+            streams: Danh sách stream
+            workers: Số worker thread (tối đa bằng số stream)
+        """
+        self.streams = streams
+        self.worker_count = max(1, min(workers, len(streams)))
+
+        self._cond = threading.Condition()
+        self._next = 0
+        self._stopped = False
+        self._results: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+
+        for stream in streams:
+            stream.frame_buffer.on_commit = self._wake
+
+        # Lỗi cuối cùng của worker (None nếu không có)
+        self.error: Optional[str] = None
+
+    def start(self):
+        """Khởi động các worker thread"""
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self._worker, name=f"InferenceWorker-{i}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[Tuple]:
+        """
+        Lấy kết quả tiếp theo
+
+        Args:
+            timeout: Thời gian chờ tối đa (giây)
+
+        Returns:
+            (stream, frame, timestamp, (results, landmarks, analysis)) hoặc None
+            nếu hết thời gian. output (phần tử cuối) là None nếu analyzer của
+            stream lỗi - stream đã bị đóng, lỗi ở stream.error.
+            Gọi release(stream) khi dùng xong frame.
+        """
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, stream: InferenceStream):
+        """
+        Trả stream về pool để lập lịch frame tiếp theo
+
+        Args:
+            stream: Stream lấy từ get_result()
+        """
+        stream.stage_timer.record("total", max(0.0, time.time() - stream._timestamp))
+        with self._cond:
+            stream.in_flight = False
+            self._cond.notify()
+
+    def is_active(self) -> bool:
+        """Còn stream nào đang chạy không"""
+        return not self._stopped and not all(s.closed for s in self.streams)
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Dừng các worker thread
+
+        Args:
+            timeout: Thời gian chờ mỗi thread kết thúc (giây)
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout)
+        self._threads = []
+        for stream in self.streams:
+            stream.frame_buffer.on_commit = None
+
+    def get_stats(self) -> dict:
+        """
+        Thống kê theo stream
+
+        Returns:
+            Dict tên stream -> {frames_analyzed, capture (buffer stats), timings}
+        """
+        return {
+            stream.name: {
+                "frames_analyzed": stream.frames_analyzed,
+                "capture": stream.frame_buffer.get_stats(),
+                "timings": stream.stage_timer.snapshot()
+            }
+            for stream in self.streams
+        }
+
+    def _wake(self):
+        """Đánh thức worker (gọi từ thread capture khi có frame mới)"""
+        with self._cond:
+            self._cond.notify()
+
+    def _next_stream(self) -> Optional[InferenceStream]:
+        """Chờ và chọn stream tiếp theo theo vòng tròn (None khi dừng)"""
+        count = len(self.streams)
+        with self._cond:
+            while not self._stopped:
+                for offset in range(count):
+                    position = (self._next + offset) % count
+                    stream = self.streams[position]
+                    if stream.in_flight or stream.closed:
+                        continue
+                    if stream.frame_buffer.is_closed() and not stream.frame_buffer.has_new():
+                        stream.closed = True
+                        continue
+                    if stream.frame_buffer.has_new():
+                        stream.in_flight = True
+                        self._next = (position + 1) % count
+                        return stream
+                if all(s.closed for s in self.streams):
+                    # Đánh thức consumer đang chờ kết quả
+                    self._results.put(None)
+                    return None
+                self._cond.wait(0.5)
+            return None
+
+    def _worker(self):
+        """Vòng lặp worker: chọn stream -> lấy frame mới nhất -> phân tích"""
+        clock = time.perf_counter
+        while True:
+            stream = self._next_stream()
+            if stream is None:
+                return
+
+            item = stream.frame_buffer.get_latest(timeout=0)
+            if item is None:
+                with self._cond:
+                    stream.in_flight = False
+                continue
+
+            frame, timestamp, _ = item
+            timer = stream.stage_timer
+            t0 = clock()
+            timer.record("capture_wait", max(0.0, time.time() - timestamp))
+            try:
+                if stream.mirror:
+                    frame = cv2.flip(frame, 1)
+                timer.record("flip", clock() - t0)
+                output = stream.analyzer.analyze(frame, timestamp)
+            except Exception as e:
+                self.error = f"Lỗi inference ({stream.name}): {str(e)}"
+                print(f"[InferencePool] {self.error}, đóng stream")
+                with self._cond:
+                    stream.error = self.error
+                    stream.closed = True
+                # Báo ngay cho consumer thay vì lỗi lặp lại ở mỗi frame
+                stream._timestamp = timestamp
+                self._results.put((stream, frame, timestamp, None))
+                continue
+
+            stream.frames_analyzed += 1
+            stream._timestamp = timestamp
+            self._results.put((stream, frame, timestamp, output))
@@ -0,0 +1,197 @@
+"""
+Inference Scheduler - Bỏ qua FaceMesh ở một số frame và ngoại suy landmarks
+Khoảng cách giữa các lần inference thích ứng theo latency và tải CPU
+"""
+import math
+import os
+import time
+import numpy as np
+from typing import Optional
+
+
+class LandmarkPredictor:
+    """Ngoại suy tuyến tính landmarks từ 2 lần inference gần nhất"""
+
+    def __init__(self, max_extrapolation: float = 0.25):
+        """
+        Khởi tạo LandmarkPredictor
+
+        Args:
+            max_extrapolation: Thời gian ngoại suy tối đa kể từ lần inference cuối (giây)
+        """
+        self.max_extrapolation = max_extrapolation
+
+        self._prev: Optional[np.ndarray] = None
+        self._last: Optional[np.ndarray] = None
+        self._prev_time = 0.0
+        self._last_time = 0.0
+        self._output: Optional[np.ndarray] = None
+
+    def update(self, landmarks: np.ndarray, timestamp: float):
+        """
+        Ghi nhận landmarks vừa inference
+
+        Args:
+            landmarks: Landmarks pixel (bất kỳ shape (N, 2))
+            timestamp: Thời điểm capture của frame
+        """
+        if self._last is None or self._last.shape != landmarks.shape:
+            self._prev = np.empty_like(landmarks)
+            self._last = np.empty_like(landmarks)
+            self._output = np.empty_like(landmarks)
+            np.copyto(self._last, landmarks)
+            np.copyto(self._prev, landmarks)
+            self._prev_time = self._last_time = timestamp
+            return
+
+        # Đổi vai trò 2 buffer thay vì cấp phát mới
+        self._prev, self._last = self._last, self._prev
+        np.copyto(self._last, landmarks)
+        self._prev_time, self._last_time = self._last_time, timestamp
+
+    def predict(self, timestamp: float) -> Optional[np.ndarray]:
+        """
+        Dự đoán landmarks tại thời điểm timestamp
+
+        Args:
+            timestamp: Thời điểm capture của frame cần dự đoán
+
+        Returns:
+            Landmarks dự đoán (buffer nội bộ), None nếu không dự đoán được
+        """
+        if self._last is None:
+            return None
+
+        elapsed = timestamp - self._last_time
+        if elapsed < 0 or elapsed > self.max_extrapolation:
+            return None
+
+        span = self._last_time - self._prev_time
+        if span <= 0:
+            np.copyto(self._output, self._last)
+            return self._output
+
+        # output = last + (last - prev) * elapsed / span
+        np.subtract(self._last, self._prev, out=self._output)
+        self._output *= elapsed / span
+        self._output += self._last
+        return self._output
+
+    def reset(self):
+        """Xóa lịch sử (mất mặt / đổi nguồn)"""
+        self._prev = None
+        self._last = None
+        self._output = None
+
+
+class InferenceScheduler:
+    """
+    Quyết định frame nào chạy FaceMesh
+
+    - N (khoảng cách giữa các lần inference) = số chu kỳ camera mà một lần
+      inference chiếm, cộng thêm 1 khi CPU quá tải, tối đa max_interval
+    - N = 1 khi EAR gần hoặc dưới ngưỡng để giữ đúng thời gian blink/drowsy
+    """
+
+    def __init__(self, target_fps: float = 30.0, max_interval: int = 3,
+                 ear_margin: float = 0.04, smoothing: float = 0.2):
+        """
+        Khởi tạo InferenceScheduler
+
+        Args:
+            target_fps: FPS camera (ngân sách thời gian cho mỗi frame)
+            max_interval: N tối đa
+            ear_margin: Khoảng trên ngưỡng EAR vẫn bắt buộc inference mỗi frame
+            smoothing: Hệ số EWMA cho latency inference
+        """
+        self.frame_period = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.max_interval = max(1, max_interval)
+        self.ear_margin = ear_margin
+        self.smoothing = smoothing
+
+        self.interval = 1
+        self._frames_since_inference = 0
+        self._inference_latency = 0.0
+        self._near_threshold = True
+
+        # Tải CPU (đọc tối đa 1 lần/giây)
+        self._cpu_pressure = 0.0
+        self._last_load_check = 0.0
+
+        # Thống kê
+        self.inferences = 0
+        self.predictions = 0
+
+    def should_infer(self) -> bool:
+        """Frame này có cần chạy FaceMesh không"""
+        self._frames_since_inference += 1
+        return self._near_threshold or self._frames_since_inference >= self.interval
+
+    def record_prediction(self):
+        """Ghi nhận một frame dùng landmarks dự đoán"""
+        self.predictions += 1
+
+    def record_inference(self, latency: float):
+        """
+        Ghi nhận một lần inference
+
+        Args:
+            latency: Thời gian inference (giây)
+        """
+        self._frames_since_inference = 0
+        self.inferences += 1
+        self._inference_latency = self._ewma(self._inference_latency, latency)
+        self._update_interval()
+
+    def observe(self, ear: float, ear_threshold: float):
+        """
+        Cập nhật trạng thái EAR (gần ngưỡng thì ép N = 1)
+
+        Args:
+            ear: EAR của frame hiện tại (inference hoặc dự đoán)
+            ear_threshold: Ngưỡng EAR hiện tại
+        """
+        self._near_threshold = ear < ear_threshold + self.ear_margin
+
+    def force_inference(self):
+        """Bắt buộc inference ở frame tiếp theo (mất mặt, dự đoán thất bại)"""
+        self._near_threshold = True
+
+    def get_stats(self) -> dict:
+        """Lấy thống kê scheduler"""
+        return {
+            "interval": self.interval,
+            "inferences": self.inferences,
+            "predictions": self.predictions,
+            "inference_ms": self._inference_latency * 1000.0,
+            "cpu_pressure": self._cpu_pressure
+        }
+
+    def _update_interval(self):
+        """Tính lại N theo latency, chu kỳ frame và tải CPU"""
+        if self.frame_period <= 0:
+            self.interval = 1
+            return
+
+        interval = math.ceil(self._inference_latency / self.frame_period)
+        if self._read_cpu_pressure() > 1.0:
+            interval += 1
+        self.interval = max(1, min(self.max_interval, interval))
+
+    def _read_cpu_pressure(self) -> float:
+        """Load average / số CPU (0 nếu hệ điều hành không hỗ trợ)"""
+        now = time.monotonic()
+        if now - self._last_load_check >= 1.0:
+            self._last_load_check = now
+            try:
+                self._cpu_pressure = os.getloadavg()[0] / (os.cpu_count() or 1)
+            except (AttributeError, OSError):
+                # Windows không có getloadavg
+                self._cpu_pressure = 0.0
+        return self._cpu_pressure
+
+    def _ewma(self, current: float, value: float) -> float:
+        """Trung bình trượt mũ"""
+        if current <= 0:
+            return value
+        return current + self.smoothing * (value - current)
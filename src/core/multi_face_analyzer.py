@@ -0,0 +1,182 @@
+"""
+Multi-Face Analyzer - Phân tích nhiều khuôn mặt (tài xế + phụ xe) trong một frame
+Mỗi khuôn mặt có ID ổn định và MetricsProcessor/trạng thái cảnh báo riêng
+"""
+import time
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ..detection import FaceTracker, LandmarkLayout, MetricsProcessor
+from .frame_analyzer import FrameAnalyzer
+
+if TYPE_CHECKING:
+    from ..detection.face_detector import FaceDetector
+
+
+class MultiFaceAnalyzer:
+    """
+    Phân tích tất cả khuôn mặt, chọn một khuôn mặt làm tài xế
+
+    analyze() có cùng giá trị trả về với FrameAnalyzer.analyze() (của tài xế),
+    danh sách đầy đủ các khuôn mặt nằm trong self.faces
+    """
+
+    # Chính sách chọn tài xế
+    POLICIES = ("largest", "left", "right")
+
+    def __init__(self, config_manager, face_detector: Optional["FaceDetector"] = None,
+                 stage_timer=None):
+        """
+        Khởi tạo MultiFaceAnalyzer
+
+        Args:
+            config_manager: ConfigManager instance
+            face_detector: FaceDetector dùng chung (None = tạo mới khi cần)
+            stage_timer: StageTimer để đo từng stage (None = không đo)
+        """
+        self.config = config_manager
+        self.face_detector = face_detector
+        self.stage_timer = stage_timer
+
+        self.driver_policy = self.config.get("detection.driver_policy", "largest")
+        if self.driver_policy not in self.POLICIES:
+            print(f"[MultiFace] Chính sách tài xế không hợp lệ: {self.driver_policy}, "
+                  f"dùng 'largest'")
+            self.driver_policy = "largest"
+
+        self.tracker = FaceTracker(
+            max_missed=self.config.get("detection.max_missed_frames", 15))
+        # face_id -> FrameAnalyzer (MetricsProcessor + quyết định cảnh báo riêng)
+        self._analyzers: Dict[int, FrameAnalyzer] = {}
+        self._idle_processor = MetricsProcessor(self.config)
+        self.driver_id: Optional[int] = None
+
+        # Kết quả của frame gần nhất: list dict {id, index, is_driver, landmarks, analysis}
+        self.faces: List[dict] = []
+
+    @property
+    def processor(self) -> MetricsProcessor:
+        """MetricsProcessor của tài xế hiện tại"""
+        analyzer = self._analyzers.get(self.driver_id)
+        return analyzer.processor if analyzer is not None else self._idle_processor
+
+    def analyze(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """
+        Phát hiện và phân tích tất cả khuôn mặt trong frame BGR
+
+        Args:
+            frame: Frame BGR
+            timestamp: Thời điểm capture của frame (giây)
+
+        Returns:
+            (results, landmarks, analysis) của tài xế - landmarks/analysis là None
+            nếu không thấy tài xế ở frame này
+        """
+        if self.face_detector is None:
+            from ..detection.face_detector import FaceDetector
+            self.face_detector = FaceDetector.from_config(self.config)
+
+        timer = self.stage_timer
+        clock = time.perf_counter
+        if timestamp is None:
+            timestamp = time.time()
+
+        t0 = clock()
+        rgb_frame = self.face_detector.to_rgb(frame)
+        t1 = clock()
+        results = self.face_detector.process_rgb(rgb_frame, frame)
+        t2 = clock()
+        if timer is not None:
+            timer.record("bgr_to_rgb", t1 - t0)
+            timer.record("inference", t2 - t1)
+
+        self.faces = []
+        batch = None
+        if results and results.multi_face_landmarks:
+            # Trích xuất 20 điểm của tất cả khuôn mặt trong một lần
+            batch = self.face_detector.get_all_landmarks(results, frame.shape[:2])
+        t3 = clock()
+        if timer is not None:
+            timer.record("landmarks", t3 - t2)
+
+        if batch is None:
+            batch = np.empty((0, len(LandmarkLayout.KEY_INDICES), 2), dtype=np.float32)
+        ids, removed = self.tracker.update(batch)
+        for face_id in removed:
+            self._analyzers.pop(face_id, None)
+            if face_id == self.driver_id:
+                print(f"[MultiFace] Mất tài xế (ID {face_id})")
+                self.driver_id = None
+
+        # Khuôn mặt còn track nhưng không thấy ở frame này
+        for face_id, analyzer in self._analyzers.items():
+            if face_id not in ids:
+                analyzer.processor.mark_face_lost(timestamp)
+
+        if len(ids) == 0:
+            return results, None, None
+
+        driver_index = self._select_driver(ids, batch)
+
+        # EAR/MAR của tất cả khuôn mặt trong một lần tính vector
+        ears, mars = MetricsProcessor.calculate_batch(*LandmarkLayout.split_landmarks_batch(batch))
+        ears = ears.tolist()
+        mars = mars.tolist()
+
+        for index, face_id in enumerate(ids):
+            analyzer = self._analyzers.get(face_id)
+            if analyzer is None:
+                analyzer = FrameAnalyzer(self.config, self.face_detector)
+                self._analyzers[face_id] = analyzer
+            analysis = analyzer.analyze_landmarks(batch[index], timestamp,
+                                                  (ears[index], mars[index]))
+            analysis["predicted"] = False
+            analysis["face_id"] = face_id
+            analysis["is_driver"] = index == driver_index
+            self.faces.append({
+                "id": face_id,
+                "index": index,
+                "is_driver": index == driver_index,
+                "landmarks": batch[index],
+                "analysis": analysis
+            })
+        if timer is not None:
+            timer.record("metrics", clock() - t3)
+
+        if driver_index is None:
+            return results, None, None
+        driver = self.faces[driver_index]
+        return results, driver["landmarks"], driver["analysis"]
+
+    def _select_driver(self, ids: List[int], batch: np.ndarray) -> Optional[int]:
+        """
+        Chọn vị trí (trong ids) của tài xế
+
+        Tài xế giữ nguyên ID cho đến khi track bị bỏ; khi tạm mất mặt thì frame
+        đó không có tài xế (không chuyển sang phụ xe)
+        """
+        if self.driver_id is not None:
+            if self.driver_id in ids:
+                return ids.index(self.driver_id)
+            if self.tracker.is_tracked(self.driver_id):
+                return None
+
+        centers, sizes = FaceTracker.measure(batch)
+        if self.driver_policy == "left":
+            index = int(np.argmin(centers[:, 0]))
+        elif self.driver_policy == "right":
+            index = int(np.argmax(centers[:, 0]))
+        else:
+            index = int(np.argmax(sizes))
+
+        self.driver_id = ids[index]
+        print(f"[MultiFace] Chọn tài xế: ID {self.driver_id} ({self.driver_policy})")
+        return index
+
+    def reset(self):
+        """Reset tất cả track và trạng thái metrics (giữ nguyên FaceDetector)"""
+        self.tracker.reset()
+        self._analyzers.clear()
+        self._idle_processor.reset()
+        self.driver_id = None
+        self.faces = []
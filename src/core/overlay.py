@@ -0,0 +1,180 @@
+"""
+Overlay - Vẽ khung cảnh báo và FPS lên frame (khung cảnh báo có thể qua OverlayCache)
+Tách khỏi DetectionEngine để dùng được khi không có Qt (benchmark, headless)
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+from ..alert.alert_level import AlertLevel
+
+
+# Kiểu khung cảnh báo theo mức: (màu viền/banner, text, độ dày viền)
+ALERT_STYLES = {
+    AlertLevel.DROWSY: ((0, 0, 255), "WARNING: DROWSY!", 10),  # Đỏ
+    AlertLevel.FATIGUE: ((0, 255, 255), "Warning: Fatigue", 5),  # Vàng
+}
+
+
+def draw_alert_box(frame: np.ndarray, alert_level: AlertLevel):
+    """
+    Vẽ khung cảnh báo lên frame
+
+    Args:
+        frame: Frame để vẽ
+        alert_level: Mức độ cảnh báo
+    """
+    style = ALERT_STYLES.get(alert_level)
+    if style is None:
+        return
+    _draw_alert_shapes(frame, *style)
+
+
+def _draw_alert_shapes(image: np.ndarray, color, text: str, thickness: int,
+                       text_color=(255, 255, 255)):
+    """Vẽ viền + banner + text (dùng chung cho vẽ trực tiếp và render sprite)"""
+    h, w = image.shape[:2]
+
+    # Vẽ viền
+    cv2.rectangle(image, (thickness, thickness),
+                  (w - thickness, h - thickness), color, thickness)
+
+    # Vẽ text
+    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
+    text_x = (w - text_size[0]) // 2
+    text_y = 80
+
+    cv2.rectangle(image, (text_x - 10, text_y - text_size[1] - 10),
+                  (text_x + text_size[0] + 10, text_y + 10), color, -1)
+
+    cv2.putText(image, text, (text_x, text_y),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.5, text_color, 3)
+
+
+def draw_fps(frame: np.ndarray, fps: float):
+    """
+    Vẽ FPS góc trên trái
+
+    Args:
+        frame: Frame để vẽ
+        fps: FPS hiện tại
+    """
+    cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+
+def draw_face_label(frame: np.ndarray, landmarks: np.ndarray, face_id: int,
+                    is_driver: bool, alert_level: AlertLevel):
+    """
+    Vẽ ID khuôn mặt phía trên mắt (chế độ nhiều mặt)
+
+    Args:
+        frame: Frame để vẽ
+        landmarks: Key landmarks (20, 2) của khuôn mặt
+        face_id: ID ổn định của khuôn mặt
+        is_driver: Khuôn mặt đang được chọn làm tài xế
+        alert_level: Mức cảnh báo riêng của khuôn mặt
+    """
+    if alert_level == AlertLevel.DROWSY:
+        color = (0, 0, 255)
+    elif alert_level == AlertLevel.FATIGUE:
+        color = (0, 255, 255)
+    else:
+        color = (0, 255, 0)
+
+    text = f"#{face_id} DRIVER" if is_driver else f"#{face_id}"
+    x = int(landmarks[:, 0].min())
+    y = max(20, int(landmarks[:, 1].min()) - 30)
+    cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+
+class OverlayCache:
+    """
+    Sprite render sẵn cho khung cảnh báo, mỗi mức một sprite
+    Chỉ render khi gặp mức mới hoặc đổi kích thước frame; mỗi frame chỉ
+    còn gán vài khối pixel liền (viền + banner) thay vì rasterize lại text
+    """
+
+    def __init__(self):
+        """Khởi tạo cache rỗng"""
+        # Kích thước frame của các sprite hiện có
+        self._frame_key = None
+        # Mức cảnh báo -> [(slice dòng, slice cột, khối pixel)]
+        self._alert_blocks = {}
+
+        # Số lần render sprite (thống kê)
+        self.renders = 0
+
+    def draw_alert_box(self, frame: np.ndarray, alert_level: AlertLevel):
+        """
+        Vẽ khung cảnh báo từ sprite (cùng kết quả với draw_alert_box)
+
+        Args:
+            frame: Frame BGR để vẽ
+            alert_level: Mức độ cảnh báo
+        """
+        style = ALERT_STYLES.get(alert_level)
+        if style is None:
+            return
+
+        frame_key = (frame.shape, frame.dtype)
+        if frame_key != self._frame_key:
+            # Đổi kích thước -> sprite cũ không dùng được nữa
+            self._alert_blocks.clear()
+            self._frame_key = frame_key
+
+        blocks = self._alert_blocks.get(alert_level)
+        if blocks is None:
+            blocks = self._render_alert(frame.shape, frame.dtype, style)
+            self._alert_blocks[alert_level] = blocks
+
+        for rows, cols, block in blocks:
+            frame[rows, cols] = block
+
+    def invalidate(self):
+        """Bỏ các sprite (render lại ở lần vẽ sau)"""
+        self._frame_key = None
+        self._alert_blocks.clear()
+
+    def _render_alert(self, shape, dtype, style) -> list:
+        """Render khung cảnh báo lên canvas đen, tách phần phủ thành các khối chữ nhật"""
+        canvas = np.zeros(shape, dtype=dtype)
+        _draw_alert_shapes(canvas, *style)
+        mask = np.zeros(shape[:2], dtype=np.uint8)
+        _draw_alert_shapes(mask, 255, style[1], style[2], text_color=255)
+
+        self.renders += 1
+        return [
+            (slice(y0, y1), slice(x0, x1), canvas[y0:y1, x0:x1].copy())
+            for y0, y1, x0, x1 in _mask_rects(mask)
+        ]
+
+
+def _mask_rects(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Phủ mask bằng các hình chữ nhật (gộp các dòng liền nhau có cùng đoạn phủ)
+
+    Args:
+        mask: Mask 2D (khác 0 = được phủ)
+
+    Returns:
+        Danh sách (y0, y1, x0, x1)
+    """
+    h, w = mask.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask > 0
+    edges = np.diff(padded, axis=1)
+
+    rects = []
+    y0 = 0
+    prev = None
+    for y in range(h + 1):
+        row = None
+        if y < h:
+            row = (tuple(np.flatnonzero(edges[y] == 1)), tuple(np.flatnonzero(edges[y] == -1)))
+        if row != prev:
+            if prev is not None:
+                rects.extend((y0, y, int(x0), int(x1)) for x0, x1 in zip(*prev))
+            y0 = y
+            prev = row
+    return rects
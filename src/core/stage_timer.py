@@ -0,0 +1,127 @@
+"""
+Stage Timer - Đo thời gian từng stage của vòng xử lý với chi phí thấp
+Mỗi stage giữ một histogram kích thước cố định (bins logarit)
+"""
+import bisect
+import threading
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+
+class LatencyHistogram:
+    """Histogram latency (ms) với bins logarit cố định, ghi O(log bins)"""
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 2000.0, bins: int = 80):
+        """
+        Khởi tạo LatencyHistogram
+
+        Args:
+            min_ms: Biên dưới của bin đầu tiên
+            max_ms: Biên trên của bin cuối cùng
+            bins: Số bins giữa min_ms và max_ms
+        """
+        self.edges = [float(e) for e in np.geomspace(min_ms, max_ms, bins + 1)]
+        # counts[0] = dưới min_ms, counts[-1] = trên max_ms
+        self.counts = [0] * (bins + 2)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float):
+        """Ghi một mẫu latency (ms)"""
+        self.counts[bisect.bisect_right(self.edges, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> float:
+        """
+        Ước lượng percentile từ histogram (biên trên của bin chứa percentile)
+
+        Args:
+            q: Percentile 0-100
+
+        Returns:
+            Latency (ms), 0 nếu chưa có mẫu
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = self.count * q / 100.0
+        cumulative = 0
+        for index, bin_count in enumerate(self.counts):
+            cumulative += bin_count
+            if cumulative >= target and bin_count > 0:
+                if index == 0:
+                    return self.edges[0]
+                if index > len(self.edges) - 1:
+                    return self.max_ms
+                return min(self.edges[index], self.max_ms)
+        return self.max_ms
+
+    def reset(self):
+        """Xóa toàn bộ mẫu"""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class StageTimer:
+    """Gom histogram latency theo tên stage, an toàn giữa các thread"""
+
+    # Các stage của DetectionEngine._process_frame theo thứ tự
+    STAGES = ("capture_wait", "flip", "bgr_to_rgb", "inference", "landmarks",
+              "metrics", "predict", "alert", "emit_state", "drawing", "emit_frame", "total")
+
+    def __init__(self, stages: Optional[Iterable[str]] = None):
+        """
+        Khởi tạo StageTimer
+
+        Args:
+            stages: Danh sách stage (mặc định STAGES)
+        """
+        self.stages = tuple(stages) if stages is not None else self.STAGES
+        self._histograms: Dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in self.stages
+        }
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        """
+        Ghi thời gian của một stage
+
+        Args:
+            stage: Tên stage
+            seconds: Thời gian (giây, từ time.perf_counter)
+        """
+        with self._lock:
+            self._histograms[stage].record(seconds * 1000.0)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Lấy thống kê hiện tại của tất cả stage
+
+        Returns:
+            Dict stage -> {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}
+        """
+        with self._lock:
+            result = {}
+            for name, histogram in self._histograms.items():
+                count = histogram.count
+                result[name] = {
+                    "count": count,
+                    "mean_ms": histogram.total_ms / count if count else 0.0,
+                    "p50_ms": histogram.percentile(50),
+                    "p95_ms": histogram.percentile(95),
+                    "p99_ms": histogram.percentile(99),
+                    "max_ms": histogram.max_ms
+                }
+            return result
+
+    def reset(self):
+        """Xóa thống kê của tất cả stage"""
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
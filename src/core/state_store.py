@@ -0,0 +1,94 @@
+"""
+State Store - Trạng thái engine dùng chung giữa worker và GUI
+Trạng thái rời rạc chỉ emit khi đổi, metrics liên tục được gộp theo tần số UI
+"""
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class StateChangeFilter:
+    """Nhớ giá trị đã emit gần nhất của từng trạng thái (worker thread)"""
+
+    def __init__(self):
+        """Khởi tạo StateChangeFilter"""
+        self._last: Dict[str, Hashable] = {}
+
+    def changed(self, key: str, value: Hashable) -> bool:
+        """
+        Ghi nhận giá trị mới của một trạng thái
+
+        Args:
+            key: Tên trạng thái (vd. "face", "status", "alert")
+            value: Giá trị ở frame hiện tại
+
+        Returns:
+            True nếu khác giá trị đã emit trước đó (cần emit)
+        """
+        if key in self._last and self._last[key] == value:
+            return False
+        self._last[key] = value
+        return True
+
+    def reset(self):
+        """Quên các giá trị đã emit (phiên mới emit lại từ đầu)"""
+        self._last.clear()
+
+
+class MetricsSnapshot:
+    """
+    Snapshot metrics mới nhất, worker ghi tối đa `rate` lần/giây,
+    GUI đọc bằng QTimer thay cho một signal mỗi frame
+    """
+
+    def __init__(self, rate: float = 5.0):
+        """
+        Khởi tạo MetricsSnapshot
+
+        Args:
+            rate: Tần số cập nhật tối đa (Hz), <= 0 = mọi frame
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._metrics: Optional[dict] = None
+        self._next_publish = 0.0
+        self.version = 0
+
+    def due(self) -> bool:
+        """
+        Đã tới lúc ghi snapshot mới chưa (worker gọi trước khi tạo dict metrics)
+
+        Returns:
+            True nếu nên gọi publish() ở frame này
+        """
+        return time.monotonic() >= self._next_publish
+
+    def publish(self, metrics: dict):
+        """
+        Ghi snapshot mới (worker thread)
+
+        Args:
+            metrics: Dict metrics - không sửa sau khi publish
+        """
+        self._next_publish = time.monotonic() + self.interval
+        with self._lock:
+            self._metrics = metrics
+            self.version += 1
+
+    def read(self) -> Tuple[Optional[dict], int]:
+        """
+        Đọc snapshot mới nhất (GUI thread)
+
+        Returns:
+            (metrics, version) - metrics là None nếu chưa có,
+            version tăng mỗi lần publish
+        """
+        with self._lock:
+            return self._metrics, self.version
+
+    def clear(self):
+        """Xóa snapshot (kết thúc phiên)"""
+        with self._lock:
+            self._metrics = None
+            self.version += 1
+        self._next_publish = 0.0
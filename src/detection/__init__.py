@@ -1,5 +1,20 @@
 """Detection module"""
-from .face_detector import FaceDetector
+from .landmark_layout import LandmarkLayout
 from .metrics_processor import MetricsProcessor
+from .event_window import SlidingWindowCounter
+from .face_tracker import FaceTracker
 
-__all__ = ['FaceDetector', 'MetricsProcessor']
+__all__ = ['FaceDetector', 'LandmarkLayout', 'MetricsProcessor', 'SlidingWindowCounter',
+           'FaceTracker', 'MeshRenderer']
+
+
+def __getattr__(name):
+    # FaceDetector cần mediapipe, MeshRenderer cần cv2 (import chậm) - chỉ import khi
+    # dùng, replay offline chỉ cần LandmarkLayout + MetricsProcessor
+    if name == 'FaceDetector':
+        from .face_detector import FaceDetector
+        return FaceDetector
+    if name == 'MeshRenderer':
+        from .mesh_renderer import MeshRenderer
+        return MeshRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,93 @@
+"""
+Event Window - Đếm sự kiện (blink, ngáp) trong các cửa sổ thời gian trượt
+Mỗi sự kiện vào/ra mỗi cửa sổ đúng một lần, nên thêm và đếm đều O(1) khấu hao
+"""
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+
+class SlidingWindowCounter:
+    """
+    Đếm số sự kiện trong N giây gần nhất cho nhiều độ dài cửa sổ cùng lúc
+
+    - Mỗi cửa sổ giữ deque timestamp riêng, sự kiện hết hạn bị loại ở đầu
+      deque khi thêm hoặc đếm
+    - Không giới hạn số phần tử: deque chỉ chứa sự kiện còn trong cửa sổ,
+      nên không đếm thiếu khi tần suất sự kiện cao
+    """
+
+    def __init__(self, windows: Iterable[float] = (10, 60, 300)):
+        """
+        Khởi tạo SlidingWindowCounter
+
+        Args:
+            windows: Các độ dài cửa sổ (giây)
+        """
+        self.windows = tuple(sorted(set(windows)))
+        if not self.windows or self.windows[0] <= 0:
+            raise ValueError(f"Cửa sổ không hợp lệ: {windows}")
+
+        self._events: Dict[float, deque] = {w: deque() for w in self.windows}
+        self.total = 0
+        self.last_time: Optional[float] = None
+
+    def add(self, timestamp: float):
+        """
+        Ghi nhận một sự kiện
+
+        Args:
+            timestamp: Thời điểm xảy ra sự kiện (giây, tăng dần)
+        """
+        for events in self._events.values():
+            events.append(timestamp)
+        self.total += 1
+        self.last_time = timestamp
+        self._evict(timestamp)
+
+    def count(self, window: float, now: float) -> int:
+        """
+        Số sự kiện trong cửa sổ (now - window, now]
+
+        Args:
+            window: Độ dài cửa sổ (phải nằm trong windows)
+            now: Thời điểm hiện tại
+
+        Returns:
+            Số sự kiện
+        """
+        events = self._events[window]
+        cutoff = now - window
+        while events and events[0] <= cutoff:
+            events.popleft()
+        return len(events)
+
+    def counts(self, now: float) -> Dict[float, int]:
+        """
+        Số sự kiện của tất cả cửa sổ
+
+        Args:
+            now: Thời điểm hiện tại
+
+        Returns:
+            Dict window -> số sự kiện
+        """
+        self._evict(now)
+        return {w: len(events) for w, events in self._events.items()}
+
+    def clear(self):
+        """Xóa toàn bộ sự kiện"""
+        for events in self._events.values():
+            events.clear()
+        self.total = 0
+        self.last_time = None
+
+    def _evict(self, now: float):
+        """Loại sự kiện hết hạn khỏi tất cả cửa sổ"""
+        for window, events in self._events.items():
+            cutoff = now - window
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def __len__(self) -> int:
+        """Số sự kiện trong cửa sổ dài nhất (tính tới lần cập nhật cuối)"""
+        return len(self._events[self.windows[-1]])
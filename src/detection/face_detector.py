@@ -1,25 +1,38 @@
 """
 Face Detector sử dụng MediaPipe
 """
+import time
 import cv2
 import mediapipe as mp
 import numpy as np
 from typing import Optional, Tuple
 
+from .landmark_layout import LandmarkLayout
+from .mesh_renderer import MeshRenderer
 
-class FaceDetector:
-    """Phát hiện khuôn mặt và landmark bằng MediaPipe"""
+
+class FaceDetector(LandmarkLayout):
+    """
+    Phát hiện khuôn mặt và landmark bằng MediaPipe
+    (chỉ số mắt/miệng và các hàm tách landmarks kế thừa từ LandmarkLayout)
+    """
+    
+    # Viền mặt (FACEMESH_FACE_OVAL) - dùng tính bounding box cho ROI
+    FACE_OVAL = [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+                 397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
+                 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109]
     
-    # Chỉ số landmark cho mắt và miệng
-    LEFT_EYE = [362, 385, 387, 263, 373, 380]
-    RIGHT_EYE = [33, 160, 158, 133, 153, 144]
-    # Outer lip cho MAR: góc trái (61), góc phải (291), trên (0), dưới (17), cạnh
-    MOUTH = [61, 291, 0, 17, 39, 84, 269, 314]
+    # ROI nhỏ hơn kích thước này (pixel) coi như mất tracking
+    MIN_ROI_SIZE = 48
     
     def __init__(self, 
                  max_num_faces: int = 1,
                  min_detection_confidence: float = 0.5,
-                 min_tracking_confidence: float = 0.5):
+                 min_tracking_confidence: float = 0.5,
+                 roi_tracking: bool = False,
+                 roi_margin: float = 0.3,
+                 roi_max_size: int = 320,
+                 mesh_level: str = "full"):
         """
         Khởi tạo FaceDetector
         
@@ -27,16 +40,59 @@ class FaceDetector:
             max_num_faces: Số khuôn mặt tối đa
             min_detection_confidence: Độ tin cậy phát hiện tối thiểu
             min_tracking_confidence: Độ tin cậy tracking tối thiểu
+            roi_tracking: Chỉ đưa vùng quanh mặt (theo frame trước) vào FaceMesh
+            roi_margin: Lề thêm quanh bounding box mặt (tỷ lệ kích thước mặt)
+            roi_max_size: Cạnh dài tối đa của ROI sau khi thu nhỏ (pixel)
+            mesh_level: Mức chi tiết lưới khi vẽ ("full", "lite", "off")
         """
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
+        # Giữ tham số để reset() tạo lại graph giống hệt
+        self._face_mesh_options = dict(
             max_num_faces=max_num_faces,
             refine_landmarks=True,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.face_mesh = self.mp_face_mesh.FaceMesh(**self._face_mesh_options)
+        # Vẽ lưới bằng mảng cạnh tính sẵn
+        self.mesh_renderer = MeshRenderer(mesh_level)
+        
+        # Buffer dùng lại giữa các frame (tránh cấp phát mỗi frame)
+        self._landmark_buffer = np.empty((self.NUM_LANDMARKS, 2), dtype=np.float32)
+        self._key_buffer = np.empty((len(self.KEY_INDICES), 2), dtype=np.float32)
+        self._mesh_buffer: Optional[np.ndarray] = None
+        self._batch_buffer: Optional[np.ndarray] = None
+        self._rgb_buffer: Optional[np.ndarray] = None
+        
+        # ROI tracking (chỉ theo được một mặt)
+        self.max_num_faces = max_num_faces
+        if roi_tracking and max_num_faces > 1:
+            print("[FaceDetector] Tắt ROI tracking vì đang phát hiện nhiều mặt")
+            roi_tracking = False
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.roi_max_size = roi_max_size
+        # ROI cho frame tiếp theo (x0, y0, x1, y1) trong tọa độ full frame
+        self._roi: Optional[Tuple[int, int, int, int]] = None
+        # Phép biến đổi của input hiện tại: pixel = (ox, oy) + normalized * (sx, sy)
+        # None = input là full frame
+        self._roi_transform: Optional[Tuple[float, float, float, float]] = None
+    
+    @classmethod
+    def from_config(cls, config_manager) -> "FaceDetector":
+        """
+        Tạo FaceDetector theo section "detection" của config
+        
+        Args:
+            config_manager: ConfigManager instance
+        """
+        return cls(
+            max_num_faces=config_manager.get("detection.max_num_faces", 1),
+            roi_tracking=config_manager.get("detection.roi_tracking", False),
+            roi_margin=config_manager.get("detection.roi_margin", 0.3),
+            roi_max_size=config_manager.get("detection.roi_max_size", 320),
+            mesh_level=config_manager.get("display.mesh_level", "full")
+        )
     
     def process(self, frame: np.ndarray):
         """
@@ -48,49 +104,278 @@ class FaceDetector:
         Returns:
             MediaPipe results object
         """
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self.process_rgb(self.to_rgb(frame), frame)
+    
+    def to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Chuyển BGR -> RGB vào buffer dùng lại
+        
+        Khi bật ROI tracking và đang có ROI, chỉ cắt + thu nhỏ vùng quanh mặt
+        
+        Args:
+            frame: Frame BGR
+            
+        Returns:
+            Frame RGB (buffer nội bộ, bị ghi đè ở frame sau)
+        """
+        self._roi_transform = None
+        
+        if self.roi_tracking and self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            crop = frame[y0:y1, x0:x1]
+            crop_h, crop_w = crop.shape[:2]
+            scale = min(1.0, self.roi_max_size / max(crop_w, crop_h))
+            if scale < 1.0:
+                size = (max(1, int(crop_w * scale)), max(1, int(crop_h * scale)))
+                crop = cv2.resize(crop, size, interpolation=cv2.INTER_LINEAR)
+            # Tọa độ chuẩn hóa không đổi khi resize, chỉ cần offset + kích thước crop
+            self._roi_transform = (float(x0), float(y0), float(crop_w), float(crop_h))
+            return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        
+        if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+            self._rgb_buffer = np.empty_like(frame)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+    
+    def process_rgb(self, rgb_frame: np.ndarray, frame: Optional[np.ndarray] = None):
+        """
+        Chạy FaceMesh trên frame RGB (hoặc ROI từ to_rgb)
+        
+        Args:
+            rgb_frame: Frame RGB từ to_rgb()
+            frame: Frame BGR gốc - cần cho ROI tracking (fallback + cập nhật ROI)
+            
+        Returns:
+            MediaPipe results object
+        """
         rgb_frame.flags.writeable = False
         results = self.face_mesh.process(rgb_frame)
         rgb_frame.flags.writeable = True
+        
+        if not self.roi_tracking or frame is None:
+            return results
+        
+        if not results.multi_face_landmarks and self._roi_transform is not None:
+            # Mất tracking trong ROI -> phát hiện lại trên full frame
+            self._roi = None
+            rgb_frame = self.to_rgb(frame)
+            rgb_frame.flags.writeable = False
+            results = self.face_mesh.process(rgb_frame)
+            rgb_frame.flags.writeable = True
+        
+        self._update_roi(results, frame.shape[:2])
         return results
     
-    def get_landmarks(self, results, frame_shape: Tuple[int, int]) -> Optional[np.ndarray]:
+    def warm_up(self, frame_shape: Tuple[int, int] = (480, 640)) -> float:
         """
-        Trích xuất tọa độ landmarks
+        Chạy FaceMesh một lần trên frame đen để nạp model / khởi tạo graph,
+        frame thật đầu tiên không phải chịu độ trễ này
+        
+        Args:
+            frame_shape: (height, width) của frame camera
+        
+        Returns:
+            Thời gian warm-up (giây)
+        """
+        start_time = time.perf_counter()
+        dummy = np.zeros((frame_shape[0], frame_shape[1], 3), dtype=np.uint8)
+        dummy.flags.writeable = False
+        self.face_mesh.process(dummy)
+        # Frame đen không có mặt - không để lại ROI
+        self.reset_roi()
+        return time.perf_counter() - start_time
+    
+    def _update_roi(self, results, frame_shape: Tuple[int, int]):
+        """Tính ROI cho frame sau từ bounding box viền mặt của frame này"""
+        if not results.multi_face_landmarks:
+            self._roi = None
+            return
+        
+        h, w = frame_shape
+        points = results.multi_face_landmarks[0].landmark
+        coords = np.fromiter(
+            (c for i in self.FACE_OVAL for c in (points[i].x, points[i].y)),
+            dtype=np.float32, count=2 * len(self.FACE_OVAL)).reshape(-1, 2)
+        coords = self._to_pixels(coords, (h, w))
+        
+        (fx0, fy0), (fx1, fy1) = coords.min(axis=0), coords.max(axis=0)
+        face_size = max(fx1 - fx0, fy1 - fy0)
+        
+        # Giữ ROI cũ nếu mặt vẫn nằm gọn bên trong (ổn định input cho FaceMesh)
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            inner = 0.5 * self.roi_margin * face_size
+            roi_size = max(x1 - x0, y1 - y0)
+            if (fx0 - inner >= x0 and fy0 - inner >= y0 and
+                    fx1 + inner <= x1 and fy1 + inner <= y1 and
+                    roi_size <= face_size * (1 + 4 * self.roi_margin)):
+                return
+        
+        # ROI vuông quanh tâm mặt, cộng lề
+        half = 0.5 * face_size * (1 + 2 * self.roi_margin)
+        cx, cy = 0.5 * (fx0 + fx1), 0.5 * (fy0 + fy1)
+        x0 = int(max(0, cx - half))
+        y0 = int(max(0, cy - half))
+        x1 = int(min(w, cx + half))
+        y1 = int(min(h, cy + half))
+        
+        if x1 - x0 < self.MIN_ROI_SIZE or y1 - y0 < self.MIN_ROI_SIZE:
+            self._roi = None
+        else:
+            self._roi = (x0, y0, x1, y1)
+    
+    def _to_pixels(self, coords: np.ndarray, frame_shape: Tuple[int, int],
+                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Chuyển tọa độ chuẩn hóa của input hiện tại sang pixel full frame"""
+        if self._roi_transform is None:
+            h, w = frame_shape
+            return np.multiply(coords, (w, h), out=out)
+        ox, oy, sx, sy = self._roi_transform
+        result = np.multiply(coords, (sx, sy), out=out)
+        result += (ox, oy)
+        return result
+    
+    def reset_roi(self):
+        """Bỏ ROI hiện tại, frame sau phát hiện trên full frame"""
+        self._roi = None
+        self._roi_transform = None
+    
+    def reset(self):
+        """
+        Tạo lại graph FaceMesh và bỏ ROI
+        
+        FaceMesh (video mode) tracking theo landmarks của frame trước; khi
+        chuyển sang nguồn khác (video mới) phải bắt đầu lại từ bước detect.
+        """
+        if self.face_mesh:
+            self.face_mesh.close()
+        self.face_mesh = self.mp_face_mesh.FaceMesh(**self._face_mesh_options)
+        self.reset_roi()
+    
+    def get_landmarks(self, results, frame_shape: Tuple[int, int],
+                      key_only: bool = False, face_index: int = 0) -> Optional[np.ndarray]:
+        """
+        Trích xuất tọa độ landmarks (pixel) vào buffer dùng lại
+        
+        Lưu ý: array trả về là buffer nội bộ, bị ghi đè ở lần gọi tiếp theo.
+        Copy nếu cần giữ lại lâu hơn một frame.
         
         Args:
             results: MediaPipe results
             frame_shape: Kích thước frame (height, width)
+            key_only: Chỉ lấy 20 điểm mắt + miệng (theo KEY_INDICES)
+            face_index: Vị trí khuôn mặt trong multi_face_landmarks
             
         Returns:
-            Array landmarks hoặc None
+            Array float32 (478, 2) hoặc (20, 2), None nếu không có mặt
         """
-        if not results.multi_face_landmarks:
+        faces = results.multi_face_landmarks
+        if not faces or face_index >= len(faces):
             return None
         
         h, w = frame_shape
-        face_landmarks = results.multi_face_landmarks[0]
+        points = faces[face_index].landmark
         
-        landmarks = []
-        for landmark in face_landmarks.landmark:
-            x = int(landmark.x * w)
-            y = int(landmark.y * h)
-            landmarks.append([x, y])
+        if key_only:
+            buffer = self._key_buffer
+            coords = np.fromiter(
+                (c for i in self.KEY_INDICES for c in (points[i].x, points[i].y)),
+                dtype=np.float32, count=2 * len(self.KEY_INDICES))
+        else:
+            n = len(points)
+            if self._landmark_buffer.shape[0] != n:
+                # refine_landmarks=False chỉ có 468 điểm
+                self._landmark_buffer = np.empty((n, 2), dtype=np.float32)
+            buffer = self._landmark_buffer
+            coords = np.fromiter(
+                (c for p in points for c in (p.x, p.y)),
+                dtype=np.float32, count=2 * n)
         
-        return np.array(landmarks)
+        # Chuẩn hóa -> pixel (full frame, kể cả khi input là ROI), ghi thẳng vào buffer
+        self._to_pixels(coords.reshape(-1, 2), (h, w), out=buffer)
+        return buffer
     
-    def get_eye_landmarks(self, landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Lấy landmarks mắt trái và phải"""
-        return landmarks[self.LEFT_EYE], landmarks[self.RIGHT_EYE]
+    def get_mesh_points(self, results, frame_shape: Tuple[int, int],
+                        face_index: int = 0) -> Optional[np.ndarray]:
+        """
+        Trích xuất các điểm mà mesh_renderer cần vẽ (theo point_indices)
+        
+        Lưu ý: array trả về là buffer nội bộ, bị ghi đè ở lần gọi tiếp theo.
+        
+        Args:
+            results: MediaPipe results
+            frame_shape: Kích thước frame (height, width)
+            face_index: Vị trí khuôn mặt trong multi_face_landmarks
+            
+        Returns:
+            Array float32 (N, 2) theo mesh_renderer.point_indices, None nếu
+            không có mặt hoặc mức lưới là "off"
+        """
+        indices = self.mesh_renderer.point_indices
+        if len(indices) == 0:
+            return None
+        if len(indices) >= self.NUM_LANDMARKS:
+            # Mức full dùng mọi điểm - lấy thẳng toàn bộ mesh
+            return self.get_landmarks(results, frame_shape, face_index=face_index)
+        
+        faces = results.multi_face_landmarks
+        if not faces or face_index >= len(faces):
+            return None
+        
+        points = faces[face_index].landmark
+        # refine_landmarks=False: bỏ các điểm mống mắt không có (nằm cuối point_indices)
+        n = int(np.searchsorted(indices, len(points)))
+        if self._mesh_buffer is None or self._mesh_buffer.shape[0] != n:
+            self._mesh_buffer = np.empty((n, 2), dtype=np.float32)
+        coords = np.fromiter(
+            (c for i in indices[:n].tolist() for c in (points[i].x, points[i].y)),
+            dtype=np.float32, count=2 * n)
+        self._to_pixels(coords.reshape(-1, 2), frame_shape, out=self._mesh_buffer)
+        return self._mesh_buffer
     
-    def get_mouth_landmarks(self, landmarks: np.ndarray) -> np.ndarray:
-        """Lấy landmarks miệng"""
-        return landmarks[self.MOUTH]
+    def get_all_landmarks(self, results, frame_shape: Tuple[int, int],
+                          key_only: bool = True) -> Optional[np.ndarray]:
+        """
+        Trích xuất landmarks (pixel) của tất cả khuôn mặt trong một lần
+        
+        Lưu ý: array trả về là buffer nội bộ, bị ghi đè ở lần gọi tiếp theo.
+        
+        Args:
+            results: MediaPipe results
+            frame_shape: Kích thước frame (height, width)
+            key_only: Chỉ lấy 20 điểm mắt + miệng (theo KEY_INDICES)
+            
+        Returns:
+            Array float32 (F, 20, 2) hoặc (F, 478, 2) theo thứ tự
+            multi_face_landmarks, None nếu không có mặt
+        """
+        faces = results.multi_face_landmarks
+        if not faces:
+            return None
+        
+        face_points = [face.landmark for face in faces]
+        if key_only:
+            n = len(self.KEY_INDICES)
+            values = (c for points in face_points
+                      for i in self.KEY_INDICES for c in (points[i].x, points[i].y))
+        else:
+            n = len(face_points[0])
+            values = (c for points in face_points for p in points for c in (p.x, p.y))
+        
+        shape = (len(faces), n, 2)
+        if self._batch_buffer is None or self._batch_buffer.shape != shape:
+            self._batch_buffer = np.empty(shape, dtype=np.float32)
+        
+        # Một lần fromiter + một phép nhân cho cả batch
+        coords = np.fromiter(values, dtype=np.float32, count=len(faces) * n * 2)
+        self._to_pixels(coords.reshape(shape), frame_shape, out=self._batch_buffer)
+        return self._batch_buffer
     
     def draw_landmarks(self, frame: np.ndarray, results, 
                       draw_eyes: bool = True,
                       draw_mouth: bool = True,
-                      draw_full_mesh: bool = False):
+                      draw_full_mesh: bool = False,
+                      landmarks: Optional[np.ndarray] = None,
+                      face_index: int = 0):
         """
         Vẽ landmarks lên frame
         
@@ -100,59 +385,29 @@ class FaceDetector:
             draw_eyes: Vẽ mắt
             draw_mouth: Vẽ miệng
             draw_full_mesh: Vẽ toàn bộ lưới
+            landmarks: Landmarks đã trích xuất ở frame này (tránh tính lại)
+            face_index: Vị trí khuôn mặt trong multi_face_landmarks
         """
-        if not results.multi_face_landmarks:
+        if not results.multi_face_landmarks or face_index >= len(results.multi_face_landmarks):
             return
         
-        face_landmarks = results.multi_face_landmarks[0]
         h, w = frame.shape[:2]
         
         if draw_full_mesh:
-            # Vẽ tesselation (lưới mesh) - màu xám
-            self.mp_drawing.draw_landmarks(
-                image=frame,
-                landmark_list=face_landmarks,
-                connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                    color=(100, 100, 100), thickness=1, circle_radius=0)
-            )
-            
-            # Vẽ contours (đường viền) - màu xám đậm
-            self.mp_drawing.draw_landmarks(
-                image=frame,
-                landmark_list=face_landmarks,
-                connections=self.mp_face_mesh.FACEMESH_CONTOURS,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                    color=(150, 150, 150), thickness=1, circle_radius=0)
-            )
-            
-            # Vẽ irises (mắt)
-            self.mp_drawing.draw_landmarks(
-                image=frame,
-                landmark_list=face_landmarks,
-                connections=self.mp_face_mesh.FACEMESH_IRISES,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                    color=(255, 117, 66), thickness=1, circle_radius=1)
-            )
-        
-        landmarks = self.get_landmarks(results, (h, w))
+            # Lưới mesh theo mức chi tiết (tesselation, contours, irises)
+            points = self.get_mesh_points(results, (h, w), face_index=face_index)
+            if points is not None:
+                self.mesh_renderer.draw(frame, points)
+        
+        if landmarks is None:
+            landmarks = self.get_landmarks(results, (h, w), key_only=True,
+                                           face_index=face_index)
         
         if landmarks is not None:
             if draw_eyes:
-                # Vẽ mắt trái với đường nối
-                left_eye_pts = [landmarks[idx] for idx in self.LEFT_EYE]
-                cv2.polylines(frame, [np.array(left_eye_pts)], True, (0, 255, 0), 2)
-                for idx in self.LEFT_EYE:
-                    cv2.circle(frame, tuple(landmarks[idx]), 3, (0, 255, 0), -1)
-                
-                # Vẽ mắt phải với đường nối
-                right_eye_pts = [landmarks[idx] for idx in self.RIGHT_EYE]
-                cv2.polylines(frame, [np.array(right_eye_pts)], True, (0, 255, 0), 2)
-                for idx in self.RIGHT_EYE:
-                    cv2.circle(frame, tuple(landmarks[idx]), 3, (0, 255, 0), -1)
+                # Vẽ mắt với đường nối
+                left_eye, right_eye = self.get_eye_landmarks(landmarks)
+                MeshRenderer.draw_eyes(frame, left_eye, right_eye)
             
             # Đã bỏ vẽ miệng màu đỏ để gọn gàng hơn
             # if draw_mouth:
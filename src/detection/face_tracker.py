@@ -0,0 +1,121 @@
+"""
+Face Tracker - Gán ID ổn định cho nhiều khuôn mặt giữa các frame
+Ghép tâm khuôn mặt với track gần nhất (khoảng cách chuẩn hóa theo kích thước mặt)
+"""
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class FaceTracker:
+    """
+    Theo dõi nhiều khuôn mặt qua các frame
+
+    Đầu vào là key landmarks (F, 20, 2) theo thứ tự FaceDetector.KEY_INDICES.
+    Tâm mặt = trung bình 20 điểm, kích thước mặt = khoảng cách hai khóe mắt ngoài.
+    """
+
+    # Vị trí khóe mắt ngoài trong KEY_INDICES (263 của mắt trái, 33 của mắt phải)
+    OUTER_EYE_CORNERS = (3, 6)
+
+    def __init__(self, max_distance: float = 0.6, max_missed: int = 15):
+        """
+        Khởi tạo FaceTracker
+
+        Args:
+            max_distance: Khoảng cách tâm tối đa để ghép, tính theo kích thước mặt
+            max_missed: Số frame liên tiếp không thấy mặt trước khi bỏ track
+        """
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+
+        # id -> {"center": (2,), "size": float, "missed": int}
+        self._tracks: Dict[int, dict] = {}
+        self._next_id = 1
+
+    @classmethod
+    def measure(cls, landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tâm và kích thước của từng khuôn mặt
+
+        Args:
+            landmarks: Key landmarks (F, 20, 2)
+
+        Returns:
+            (centers (F, 2), sizes (F,))
+        """
+        left, right = cls.OUTER_EYE_CORNERS
+        centers = landmarks.mean(axis=1)
+        sizes = np.linalg.norm(landmarks[:, left] - landmarks[:, right], axis=1)
+        return centers, sizes
+
+    def update(self, landmarks: np.ndarray) -> Tuple[List[int], List[int]]:
+        """
+        Ghép các khuôn mặt của frame này với track hiện có
+
+        Args:
+            landmarks: Key landmarks (F, 20, 2), F có thể bằng 0
+
+        Returns:
+            (ids theo thứ tự khuôn mặt đầu vào, ids của track vừa bị bỏ)
+        """
+        num_faces = len(landmarks)
+        ids: List[int] = [0] * num_faces
+
+        if num_faces:
+            centers, sizes = self.measure(landmarks)
+
+            if self._tracks:
+                track_ids = list(self._tracks)
+                track_centers = np.array([self._tracks[t]["center"] for t in track_ids])
+                track_sizes = np.array([self._tracks[t]["size"] for t in track_ids])
+
+                # Khoảng cách (T, F) chuẩn hóa theo kích thước track
+                distances = np.linalg.norm(
+                    track_centers[:, None, :] - centers[None, :, :], axis=2)
+                distances /= np.maximum(track_sizes, 1.0)[:, None]
+
+                # Ghép tham lam theo khoảng cách tăng dần (T, F đều nhỏ)
+                matched_tracks = set()
+                matched_faces = set()
+                for flat in np.argsort(distances, axis=None):
+                    t, f = divmod(int(flat), num_faces)
+                    if distances[t, f] > self.max_distance:
+                        break
+                    if t in matched_tracks or f in matched_faces:
+                        continue
+                    matched_tracks.add(t)
+                    matched_faces.add(f)
+                    ids[f] = track_ids[t]
+
+            for f in range(num_faces):
+                if ids[f] == 0:
+                    ids[f] = self._next_id
+                    self._next_id += 1
+                self._tracks[ids[f]] = {
+                    "center": centers[f].copy(),
+                    "size": float(sizes[f]),
+                    "missed": 0
+                }
+
+        # Track không thấy ở frame này
+        removed = []
+        seen = set(ids)
+        for track_id in list(self._tracks):
+            if track_id in seen:
+                continue
+            track = self._tracks[track_id]
+            track["missed"] += 1
+            if track["missed"] > self.max_missed:
+                del self._tracks[track_id]
+                removed.append(track_id)
+
+        return ids, removed
+
+    def is_tracked(self, track_id: int) -> bool:
+        """Track còn tồn tại không (kể cả khi tạm mất mặt)"""
+        return track_id in self._tracks
+
+    def reset(self):
+        """Xóa tất cả track"""
+        self._tracks.clear()
+        self._next_id = 1
@@ -0,0 +1,55 @@
+"""
+Landmark Layout - Chỉ số landmark mắt/miệng của FaceMesh
+Chỉ cần numpy (không import mediapipe), dùng chung cho FaceDetector và replay offline
+"""
+import numpy as np
+from typing import Tuple
+
+
+class LandmarkLayout:
+    """Vị trí các điểm mắt, miệng trong full mesh và trong key subset (20 điểm)"""
+
+    # Chỉ số landmark cho mắt và miệng
+    LEFT_EYE = [362, 385, 387, 263, 373, 380]
+    RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+    # Outer lip cho MAR: góc trái (61), góc phải (291), trên (0), dưới (17), cạnh
+    MOUTH = [61, 291, 0, 17, 39, 84, 269, 314]
+
+    # Số landmark khi bật refine_landmarks (468 mesh + 10 iris)
+    NUM_LANDMARKS = 478
+    # 20 điểm mắt + miệng, theo thứ tự LEFT_EYE, RIGHT_EYE, MOUTH
+    KEY_INDICES = LEFT_EYE + RIGHT_EYE + MOUTH
+    LEFT_EYE_SLICE = slice(0, 6)
+    RIGHT_EYE_SLICE = slice(6, 12)
+    MOUTH_SLICE = slice(12, 20)
+
+    @classmethod
+    def get_eye_landmarks(cls, landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lấy landmarks mắt trái và phải (nhận cả full mesh lẫn key subset)"""
+        if len(landmarks) == len(cls.KEY_INDICES):
+            return landmarks[cls.LEFT_EYE_SLICE], landmarks[cls.RIGHT_EYE_SLICE]
+        return landmarks[cls.LEFT_EYE], landmarks[cls.RIGHT_EYE]
+
+    @classmethod
+    def get_mouth_landmarks(cls, landmarks: np.ndarray) -> np.ndarray:
+        """Lấy landmarks miệng (nhận cả full mesh lẫn key subset)"""
+        if len(landmarks) == len(cls.KEY_INDICES):
+            return landmarks[cls.MOUTH_SLICE]
+        return landmarks[cls.MOUTH]
+
+    @classmethod
+    def split_landmarks_batch(cls, landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Tách mắt trái, mắt phải, miệng cho N frame/khuôn mặt
+
+        Args:
+            landmarks: Array (N, 478, 2) full mesh hoặc (N, 20, 2) key subset
+
+        Returns:
+            (left_eyes (N, 6, 2), right_eyes (N, 6, 2), mouths (N, 8, 2))
+        """
+        if landmarks.shape[1] == len(cls.KEY_INDICES):
+            # Key subset: slice là view, không copy
+            return (landmarks[:, cls.LEFT_EYE_SLICE], landmarks[:, cls.RIGHT_EYE_SLICE],
+                    landmarks[:, cls.MOUTH_SLICE])
+        return landmarks[:, cls.LEFT_EYE], landmarks[:, cls.RIGHT_EYE], landmarks[:, cls.MOUTH]
@@ -0,0 +1,133 @@
+"""
+Mesh Renderer - Vẽ lưới FaceMesh từ mảng cạnh tính sẵn
+Mỗi tập cạnh (tesselation, contours, irises) chỉ một lần cv2.polylines,
+thay cho hàng nghìn lần cv2.line của mp.solutions.drawing_utils
+"""
+import cv2
+import numpy as np
+from typing import Dict, Optional
+
+
+class MeshRenderer:
+    """Vẽ lưới mặt theo mức chi tiết, ở độ phân giải bất kỳ (qua scale)"""
+
+    # Mức chi tiết: full = toàn bộ lưới, lite = chỉ viền + mống mắt, off = không vẽ lưới
+    LEVELS = ("full", "lite", "off")
+
+    # (tập cạnh, màu BGR) theo thứ tự vẽ
+    LAYERS = (
+        ("tesselation", (100, 100, 100)),  # Lưới mesh - xám
+        ("contours", (150, 150, 150)),  # Đường viền - xám đậm
+        ("irises", (255, 117, 66)),  # Mống mắt
+    )
+    LEVEL_LAYERS = {
+        "full": ("tesselation", "contours", "irises"),
+        "lite": ("contours", "irises"),
+        "off": (),
+    }
+
+    EYE_COLOR = (0, 255, 0)
+
+    # Mảng cạnh (E, 2) dùng chung cho mọi instance, tạo ở lần dùng đầu
+    _edge_sets: Optional[Dict[str, np.ndarray]] = None
+
+    def __init__(self, level: str = "full"):
+        """
+        Khởi tạo MeshRenderer
+
+        Args:
+            level: Mức chi tiết ("full", "lite", "off")
+        """
+        if level not in self.LEVELS:
+            print(f"[MeshRenderer] Mức lưới không hợp lệ: {level}, dùng 'full'")
+            level = "full"
+        self.level = level
+
+        edge_sets = self.edge_sets() if self.LEVEL_LAYERS[level] else {}
+        layers = [(edge_sets[name], color)
+                  for name, color in self.LAYERS if name in self.LEVEL_LAYERS[level]]
+        # Chỉ số landmark mà các lớp cần, tăng dần (điểm mống mắt 468+ nằm cuối)
+        if layers:
+            indices = np.unique(np.concatenate([edges.ravel() for edges, _ in layers]))
+        else:
+            indices = np.empty(0)
+        self.point_indices = indices.astype(np.int32)
+        # (cạnh theo vị trí trong point_indices, màu, vị trí điểm lớn nhất) của các lớp cần vẽ
+        self._layers = []
+        for edges, color in layers:
+            local = np.searchsorted(self.point_indices, edges).astype(np.int32)
+            self._layers.append((local, color, int(local.max())))
+
+    @classmethod
+    def from_config(cls, config_manager) -> "MeshRenderer":
+        """
+        Tạo MeshRenderer theo display.mesh_level
+
+        Args:
+            config_manager: ConfigManager instance
+
+        Returns:
+            MeshRenderer
+        """
+        return cls(config_manager.get("display.mesh_level", "full"))
+
+    @classmethod
+    def edge_sets(cls) -> Dict[str, np.ndarray]:
+        """
+        Mảng chỉ số cạnh của các tập kết nối FaceMesh
+
+        Returns:
+            Dict tên tập -> array int32 (E, 2)
+        """
+        if cls._edge_sets is None:
+            from mediapipe.python.solutions import face_mesh_connections as connections
+
+            sources = {
+                "tesselation": connections.FACEMESH_TESSELATION,
+                "contours": connections.FACEMESH_CONTOURS,
+                "irises": connections.FACEMESH_IRISES,
+            }
+            # Sắp xếp để thứ tự vẽ cố định giữa các lần chạy
+            cls._edge_sets = {
+                name: np.array(sorted(edges), dtype=np.int32).reshape(-1, 2)
+                for name, edges in sources.items()
+            }
+        return cls._edge_sets
+
+    def draw(self, image: np.ndarray, points: np.ndarray, scale: float = 1.0):
+        """
+        Vẽ lưới mặt
+
+        Args:
+            image: Ảnh BGR để vẽ
+            points: Landmarks theo point_indices (pixel, theo frame capture) (N, 2),
+                    có thể thiếu các điểm cuối (refine_landmarks=False)
+            scale: Tỷ lệ từ frame capture sang image
+        """
+        if not self._layers:
+            return
+
+        pixels = (points * scale).astype(np.int32)
+        for edges, color, max_index in self._layers:
+            if max_index >= len(pixels):
+                # refine_landmarks=False: không có điểm mống mắt
+                continue
+            # (E, 2, 2): mỗi cạnh là một polyline 2 điểm
+            cv2.polylines(image, pixels[edges], False, color, 1)
+
+    @classmethod
+    def draw_eyes(cls, image: np.ndarray, left_eye: np.ndarray, right_eye: np.ndarray,
+                  scale: float = 1.0):
+        """
+        Vẽ viền và điểm của 2 mắt
+
+        Args:
+            image: Ảnh BGR để vẽ
+            left_eye: 6 điểm mắt trái (pixel, theo frame capture)
+            right_eye: 6 điểm mắt phải
+            scale: Tỷ lệ từ frame capture sang image
+        """
+        eyes = (np.stack((left_eye, right_eye)) * scale).astype(np.int32)
+        cv2.polylines(image, eyes, True, cls.EYE_COLOR, 2)
+        for x, y in eyes.reshape(-1, 2):
+            cv2.circle(image, (int(x), int(y)), 3, cls.EYE_COLOR, -1)
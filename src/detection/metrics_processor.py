@@ -3,13 +3,22 @@ Metrics Processor - Tính toán EAR, MAR, blink, yawn
 """
 import numpy as np
 import time
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 from collections import deque
 
+from .event_window import SlidingWindowCounter
+
 
 class MetricsProcessor:
     """Xử lý các metrics phát hiện buồn ngủ"""
     
+    # Cửa sổ (giây) dùng cho blink rate, số lần ngáp và điều kiện fatigue
+    RATE_WINDOW = 60
+    # Mất mặt lâu hơn khoảng này (giây) thì đếm lại thời gian mắt nhắm / miệng há.
+    # Mất mặt ngắn hơn, hoặc đoạn không kiểm tra buồn ngủ (pause_drowsiness, vd. đang
+    # ngáp) chỉ tạm dừng: khoảng đó không được tính vào thời gian mắt nhắm / miệng há
+    MAX_GAP = 1.0
+    
     def __init__(self, config_manager):
         """
         Khởi tạo MetricsProcessor
@@ -30,9 +39,19 @@ class MetricsProcessor:
         self.is_blinking = False
         self.prev_ear = None
         
-        # Time tracking
-        self.blink_times = deque(maxlen=100)
-        self.yawn_times = deque(maxlen=100)
+        # Thời điểm bắt đầu mắt nhắm / miệng há liên tục
+        self.eyes_closed_since: Optional[float] = None
+        self.mouth_open_since: Optional[float] = None
+        # Thời điểm bắt đầu mất mặt (caller báo qua mark_face_lost)
+        self._face_lost_since: Optional[float] = None
+        # Thời điểm bắt đầu bỏ qua kiểm tra buồn ngủ (caller báo qua pause_drowsiness)
+        self._drowsiness_paused_since: Optional[float] = None
+        
+        # Time tracking - đếm sự kiện theo nhiều cửa sổ thời gian
+        windows = set(self.config.get("fatigue_detection.windows", [10, 60, 300]))
+        windows.add(self.RATE_WINDOW)
+        self.blink_events = SlidingWindowCounter(windows)
+        self.yawn_events = SlidingWindowCounter(windows)
         
         # Fatigue cooldown
         self.last_fatigue_alert = 0
@@ -90,6 +109,63 @@ class MetricsProcessor:
         mar = (v1 + v2 + v3) / (3.0 * h)
         return mar
     
+    @staticmethod
+    def calculate_ear_batch(eye_landmarks: np.ndarray) -> np.ndarray:
+        """
+        Tính EAR cho N mắt trong một lần (N frame hoặc N khuôn mặt)
+        
+        Args:
+            eye_landmarks: Array (N, 6, 2), cùng thứ tự điểm với calculate_ear
+            
+        Returns:
+            Array EAR (N,) - 0 nếu chiều ngang bằng 0
+        """
+        eyes = np.asarray(eye_landmarks)
+        # 3 cặp điểm: 2 dọc (1-5, 2-4) và 1 ngang (0-3)
+        diff = eyes[:, [1, 2, 0]] - eyes[:, [5, 4, 3]]
+        dist = np.sqrt(np.einsum("nij,nij->ni", diff, diff))
+        
+        h = 2.0 * dist[:, 2]
+        return np.divide(dist[:, 0] + dist[:, 1], h,
+                         out=np.zeros_like(h), where=h > 0)
+    
+    @staticmethod
+    def calculate_mar_batch(mouth_landmarks: np.ndarray) -> np.ndarray:
+        """
+        Tính MAR cho N miệng trong một lần
+        
+        Args:
+            mouth_landmarks: Array (N, 8, 2), cùng thứ tự điểm với calculate_mar
+            
+        Returns:
+            Array MAR (N,) - 0 nếu chiều rộng bằng 0
+        """
+        mouths = np.asarray(mouth_landmarks)
+        # 3 cặp dọc (0-17, 39-84, 269-314) và 1 cặp ngang (61-291)
+        diff = mouths[:, [2, 4, 6, 0]] - mouths[:, [3, 5, 7, 1]]
+        dist = np.sqrt(np.einsum("nij,nij->ni", diff, diff))
+        
+        h = 3.0 * dist[:, 3]
+        return np.divide(dist[:, 0] + dist[:, 1] + dist[:, 2], h,
+                         out=np.zeros_like(h), where=h > 0)
+    
+    @classmethod
+    def calculate_batch(cls, left_eyes: np.ndarray, right_eyes: np.ndarray,
+                        mouths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tính EAR trung bình 2 mắt và MAR cho N frame/khuôn mặt (chưa smoothing)
+        
+        Args:
+            left_eyes: Landmarks mắt trái (N, 6, 2)
+            right_eyes: Landmarks mắt phải (N, 6, 2)
+            mouths: Landmarks miệng (N, 8, 2)
+            
+        Returns:
+            (ears, mars) - mỗi array (N,)
+        """
+        ears = (cls.calculate_ear_batch(left_eyes) + cls.calculate_ear_batch(right_eyes)) / 2.0
+        return ears, cls.calculate_mar_batch(mouths)
+    
     def process_metrics(self, left_eye: np.ndarray, right_eye: np.ndarray,
                        mouth: np.ndarray) -> Tuple[float, float]:
         """
@@ -111,8 +187,20 @@ class MetricsProcessor:
         # Tính MAR
         mar = self.calculate_mar(mouth)
         
-        # Smoothing
-        self.ear_history.append(avg_ear)
+        return self.smooth_metrics(avg_ear, mar)
+    
+    def smooth_metrics(self, ear: float, mar: float) -> Tuple[float, float]:
+        """
+        Smoothing EAR/MAR đã tính sẵn (vd. từ calculate_batch)
+        
+        Args:
+            ear: EAR trung bình 2 mắt
+            mar: MAR
+            
+        Returns:
+            (smoothed_ear, smoothed_mar)
+        """
+        self.ear_history.append(ear)
         self.mar_history.append(mar)
         
         smoothed_ear = sum(self.ear_history) / len(self.ear_history)
@@ -120,23 +208,81 @@ class MetricsProcessor:
         
         return smoothed_ear, smoothed_mar
     
-    def detect_drowsiness(self, ear: float) -> bool:
+    def mark_face_lost(self, now: Optional[float] = None):
+        """
+        Báo frame không thấy khuôn mặt (caller gọi, thay cho detect_*)
+        
+        Args:
+            now: Timestamp capture của frame (mặc định time.time())
+        """
+        if self._face_lost_since is None:
+            self._face_lost_since = time.time() if now is None else now
+    
+    def mark_face_found(self, now: Optional[float] = None):
+        """
+        Báo đã thấy lại khuôn mặt - mất mặt quá MAX_GAP giây thì đếm lại
+        thời gian mắt nhắm / miệng há
+        
+        Args:
+            now: Timestamp capture của frame (mặc định time.time())
+        """
+        if self._face_lost_since is None:
+            return
+        current_time = time.time() if now is None else now
+        lost = current_time - self._face_lost_since
+        if lost > self.MAX_GAP:
+            self.ear_counter = 0
+            self.mar_counter = 0
+            self.eyes_closed_since = None
+            self.mouth_open_since = None
+            self._drowsiness_paused_since = None
+        else:
+            # Tạm dừng: dời điểm bắt đầu đi đúng khoảng mất mặt
+            if self.eyes_closed_since is not None and self._drowsiness_paused_since is None:
+                # (đang pause thì khoảng này được trừ khi detect_drowsiness chạy lại)
+                self.eyes_closed_since += lost
+            if self.mouth_open_since is not None:
+                self.mouth_open_since += lost
+        self._face_lost_since = None
+    
+    def pause_drowsiness(self, now: Optional[float] = None):
         """
-        Phát hiện buồn ngủ
+        Báo frame có mặt nhưng không kiểm tra buồn ngủ (đang ngáp / mệt mỏi) -
+        cửa sổ mắt nhắm tạm dừng tới lần detect_drowsiness tiếp theo
+        
+        Args:
+            now: Timestamp capture của frame (mặc định time.time())
+        """
+        if self._drowsiness_paused_since is None:
+            self._drowsiness_paused_since = time.time() if now is None else now
+    
+    def detect_drowsiness(self, ear: float, now: Optional[float] = None) -> bool:
+        """
+        Phát hiện buồn ngủ - mắt nhắm liên tục đủ durations.drowsiness giây
         
         Args:
             ear: Giá trị EAR
+            now: Timestamp capture của frame (mặc định time.time())
             
         Returns:
             True nếu phát hiện ngủ
         """
-        ear_threshold = self.config.get("thresholds.ear", 0.25)
-        ear_consec_frames = self.config.get("consecutive_frames.drowsiness", 20)
+        thresholds = self.config.thresholds
+        current_time = time.time() if now is None else now
+        
+        if self._drowsiness_paused_since is not None:
+            # Khoảng không kiểm tra không tính là mắt nhắm
+            if self.eyes_closed_since is not None:
+                self.eyes_closed_since += current_time - self._drowsiness_paused_since
+            self._drowsiness_paused_since = None
         
-        if ear < ear_threshold:
+        if ear < thresholds.ear:
             self.ear_counter += 1
             
-            if self.ear_counter >= ear_consec_frames:
+            if self.eyes_closed_since is None:
+                self.eyes_closed_since = current_time
+            
+            if current_time - self.eyes_closed_since >= thresholds.drowsiness_seconds:
                 if not self.is_drowsy:
                     self.is_drowsy = True
                 return True
@@ -144,20 +290,22 @@ class MetricsProcessor:
             if self.is_drowsy:
                 self.is_drowsy = False
             self.ear_counter = 0
+            self.eyes_closed_since = None
         
         return False
     
-    def detect_blink(self, ear: float) -> bool:
+    def detect_blink(self, ear: float, now: Optional[float] = None) -> bool:
         """
         Phát hiện nhấp mắt
         
         Args:
             ear: Giá trị EAR
+            now: Timestamp của frame (mặc định time.time())
             
         Returns:
             True nếu phát hiện blink hoàn chỉnh
         """
-        blink_threshold = self.config.get("thresholds.blink", 0.25)
+        blink_threshold = self.config.thresholds.blink
         
         if self.prev_ear is not None:
             # Phát hiện mắt đóng
@@ -167,38 +315,43 @@ class MetricsProcessor:
             elif ear >= blink_threshold and self.is_blinking:
                 self.is_blinking = False
                 self.blink_counter += 1
-                self.blink_times.append(time.time())
+                self.blink_events.add(time.time() if now is None else now)
                 self.prev_ear = ear
                 return True
         
         self.prev_ear = ear
         return False
     
-    def detect_yawn(self, mar: float) -> bool:
+    def detect_yawn(self, mar: float, now: Optional[float] = None) -> bool:
         """
-        Phát hiện ngáp - Chỉ cần há miệng rộng (cho phép mắt nhắm)
+        Phát hiện ngáp - Chỉ cần há miệng rộng đủ durations.yawn giây (cho phép mắt nhắm)
         
         Args:
             mar: Giá trị MAR
+            now: Timestamp capture của frame (mặc định time.time())
             
         Returns:
             True nếu đang ngáp
         """
-        mar_threshold = self.config.get("thresholds.yawn", 0.65)
-        yawn_consec_frames = self.config.get("consecutive_frames.yawn", 20)
+        thresholds = self.config.thresholds
+        current_time = time.time() if now is None else now
         
         # Kiểm tra há miệng rộng - không quan tâm mắt
-        if mar > mar_threshold:
+        if mar > thresholds.yawn:
             self.mar_counter += 1
             
-            if self.mar_counter >= yawn_consec_frames:
+            if self.mouth_open_since is None:
+                self.mouth_open_since = current_time
+            
+            if current_time - self.mouth_open_since >= thresholds.yawn_seconds:
                 if not self.is_yawning:
                     self.is_yawning = True
-                    self.yawn_times.append(time.time())
+                    self.yawn_events.add(current_time)
                 return True
         else:
             self.mar_counter = 0
             self.is_yawning = False
+            self.mouth_open_since = None
         
         return False
     
@@ -212,24 +365,26 @@ class MetricsProcessor:
         Returns:
             True nếu miệng há rộng
         """
-        mar_threshold = self.config.get("thresholds.yawn", 0.65)
-        return mar > mar_threshold
+        return mar > self.config.thresholds.yawn
     
-    def check_fatigue(self) -> bool:
+    def check_fatigue(self, now: Optional[float] = None) -> bool:
         """
         Kiểm tra mệt mỏi - CHỈ BÁO SAU KHI ĐỦ 60 GIÂY:
         - Đếm ngáp và blink trong 60 giây
         - Sau 60 giây, nếu ngáp >= 2 VÀ blink bất thường → Báo fatigue
         - Báo liên tục cho đến khi chỉ số giảm
         
+        Args:
+            now: Timestamp của frame (mặc định time.time())
+        
         Returns:
             True nếu phát hiện mệt mỏi (sau 60 giây theo dõi)
         """
-        current_time = time.time()
+        current_time = time.time() if now is None else now
         
         # Đếm trong 60 giây gần nhất
-        recent_blinks = sum(1 for t in self.blink_times if current_time - t < 60)
-        recent_yawns = sum(1 for t in self.yawn_times if current_time - t < 60)
+        recent_blinks = self.blink_events.count(self.RATE_WINDOW, current_time)
+        recent_yawns = self.yawn_events.count(self.RATE_WINDOW, current_time)
         
         # Điều kiện phát hiện mệt mỏi
         has_multiple_yawns = recent_yawns >= 2
@@ -264,15 +419,31 @@ class MetricsProcessor:
         
         return False
     
-    def get_blink_rate(self) -> int:
+    def get_blink_rate(self, now: Optional[float] = None) -> int:
         """Lấy số lần blink/phút"""
-        current_time = time.time()
-        return sum(1 for t in self.blink_times if current_time - t < 60)
+        current_time = time.time() if now is None else now
+        return self.blink_events.count(self.RATE_WINDOW, current_time)
     
-    def get_yawn_count(self) -> int:
+    def get_yawn_count(self, now: Optional[float] = None) -> int:
         """Lấy số lần ngáp/phút"""
-        current_time = time.time()
-        return sum(1 for t in self.yawn_times if current_time - t < 60)
+        current_time = time.time() if now is None else now
+        return self.yawn_events.count(self.RATE_WINDOW, current_time)
+    
+    def get_event_counts(self, now: Optional[float] = None) -> Dict[str, Dict[float, int]]:
+        """
+        Lấy số lần blink/ngáp trong tất cả cửa sổ thời gian
+        
+        Args:
+            now: Timestamp của frame (mặc định time.time())
+            
+        Returns:
+            {"blinks": {window: count}, "yawns": {window: count}}
+        """
+        current_time = time.time() if now is None else now
+        return {
+            "blinks": self.blink_events.counts(current_time),
+            "yawns": self.yawn_events.counts(current_time)
+        }
     
     def reset(self):
         """Reset tất cả counters"""
@@ -283,8 +454,12 @@ class MetricsProcessor:
         self.is_yawning = False
         self.is_blinking = False
         self.prev_ear = None
-        self.blink_times.clear()
-        self.yawn_times.clear()
+        self.eyes_closed_since = None
+        self.mouth_open_since = None
+        self._face_lost_since = None
+        self._drowsiness_paused_since = None
+        self.blink_events.clear()
+        self.yawn_events.clear()
         self.ear_history.clear()
         self.mar_history.clear()
         self.last_fatigue_alert = 0
@@ -0,0 +1,27 @@
+"""
+Engine Loader - Import các module nặng (cv2, mediapipe, pygame) trong thread riêng
+Cửa sổ hiện ra ngay, DetectionEngine được tạo khi import xong
+"""
+import importlib
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class EngineLoader(QThread):
+    """Import module DetectionEngine ở background, báo thời gian import"""
+
+    loaded = pyqtSignal(object, float)  # (class DetectionEngine, thời gian import ms)
+    failed = pyqtSignal(str)  # error message
+
+    def run(self):
+        """Import module engine (kéo theo cv2, mediapipe, pygame)"""
+        start_time = time.perf_counter()
+        try:
+            module = importlib.import_module("..core.detection_engine", __package__)
+        except Exception as e:
+            print(f"[EngineLoader] Lỗi khi import engine: {e}")
+            self.failed.emit(f"Không load được detection engine: {str(e)}")
+            return
+        elapsed = (time.perf_counter() - start_time) * 1000.0
+        print(f"[EngineLoader] Import engine (cv2, mediapipe, pygame): {elapsed:.0f}ms")
+        self.loaded.emit(module.DetectionEngine, elapsed)
@@ -2,21 +2,21 @@
 Main Window - Giao diện chính của ứng dụng
 Nhận signals từ DetectionEngine và cập nhật UI
 """
-import cv2
-import numpy as np
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QFrame, QMessageBox)
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtCore import Qt, QEvent, QTimer, pyqtSlot
 from PyQt5.QtGui import QImage, QPixmap, QFont
 
 from ..config import ConfigManager
-from ..core import DetectionEngine
 from ..alert import AlertLevel
+from .engine_loader import EngineLoader
 
 
 class MainWindow(QMainWindow):
     """Cửa sổ chính của ứng dụng"""
     
+    IDLE_STATUS_STYLE = "padding: 20px; background-color: lightgray; border-radius: 5px;"
+    
     def __init__(self, config_manager: ConfigManager):
         """
         Khởi tạo MainWindow
@@ -27,11 +27,24 @@ class MainWindow(QMainWindow):
         super().__init__()
         
         self.config = config_manager
-        self.engine: DetectionEngine = None
+        # DetectionEngine - tạo sau khi EngineLoader import xong module nặng
+        self.engine = None
+        self.import_ms = 0.0
+        self._closing = False
+        
+        # Metrics đọc từ snapshot của engine theo display.ui_rate (Hz, <= 0 = theo FPS camera)
+        ui_rate = self.config.get("display.ui_rate", 5.0)
+        if ui_rate <= 0:
+            ui_rate = self.config.get("camera.fps", 30)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(max(1, int(1000 / ui_rate)))
+        self.metrics_timer.timeout.connect(self._poll_metrics)
+        self._metrics_version = -1
+        # Trạng thái đang hiển thị - chỉ set lại stylesheet khi đổi
+        self._status_shown = (None, None)
         
         self._init_ui()
-        self._create_engine()
-        self._connect_signals()
+        self._load_engine()
     
     def _init_ui(self):
         """Khởi tạo giao diện"""
@@ -98,10 +111,10 @@ class MainWindow(QMainWindow):
         status_title.setFont(QFont("Arial", 12, QFont.Bold))
         status_layout.addWidget(status_title)
         
-        self.status_label = QLabel("Not Started")
+        self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignCenter)
         self.status_label.setFont(QFont("Arial", 14))
-        self.status_label.setStyleSheet("padding: 20px; background-color: lightgray; border-radius: 5px;")
+        self._set_status("Not Started", self.IDLE_STATUS_STYLE)
         status_layout.addWidget(self.status_label)
         
         control_layout.addWidget(status_group)
@@ -184,48 +197,137 @@ class MainWindow(QMainWindow):
         
         parent_layout.addWidget(control_frame, 1)
     
-    def _create_engine(self):
-        """Tạo detection engine"""
-        self.engine = DetectionEngine(self.config)
+    def _load_engine(self):
+        """Import engine ở background, nút START bật khi engine đã được tạo"""
+        self.start_stop_btn.setEnabled(False)
+        self.start_stop_btn.setText("LOADING...")
+        self.statusBar().showMessage("Loading detection engine...")
+        
+        self.loader = EngineLoader()
+        self.loader.loaded.connect(self._create_engine)
+        self.loader.failed.connect(self._on_engine_load_failed)
+        self.loader.start()
+    
+    @pyqtSlot(str)
+    def _on_engine_load_failed(self, error: str):
+        """
+        Import engine lỗi: báo lỗi và cho bấm RETRY để import lại
+        
+        Args:
+            error: Thông báo lỗi từ EngineLoader
+        """
+        if self._closing:
+            return
+        self.start_stop_btn.setText("RETRY")
+        self.start_stop_btn.setEnabled(True)
+        self.statusBar().showMessage("Detection engine failed to load")
+        self._on_error_occurred(error)
+    
+    @pyqtSlot(object, float)
+    def _create_engine(self, engine_class, import_ms: float):
+        """
+        Tạo detection engine (GUI thread) và bắt đầu warm-up FaceMesh
+        
+        Args:
+            engine_class: Class DetectionEngine đã import
+            import_ms: Thời gian import module engine (ms)
+        """
+        if self._closing:
+            # Signal tới sau khi cửa sổ đã đóng
+            return
+        self.import_ms = import_ms
+        self.engine = engine_class(self.config)
+        self._connect_signals()
+        # Engine thread khởi tạo FaceMesh + âm thanh rồi chờ START
+        self.engine.preload()
         print("[MainWindow] Đã tạo DetectionEngine")
+        
+        # START trước khi warm-up xong: phiên bắt đầu ngay khi khởi tạo xong
+        self.start_stop_btn.setText("START")
+        self.start_stop_btn.setEnabled(True)
+        self.statusBar().showMessage(
+            f"Engine imported in {import_ms:.0f} ms, warming up FaceMesh...")
     
     def _connect_signals(self):
         """Kết nối signals từ engine đến UI"""
-        self.engine.frame_processed.connect(self._on_frame_processed)
+        self.engine.frame_ready.connect(self._on_frame_ready)
+        self._update_display_size()
+        self._update_display_visibility()
         self.engine.face_detected.connect(self._on_face_detected)
-        self.engine.metrics_updated.connect(self._on_metrics_updated)
         self.engine.alert_changed.connect(self._on_alert_changed)
         self.engine.status_changed.connect(self._on_status_changed)
-        self.engine.learning_progress.connect(self._on_learning_progress)
         self.engine.error_occurred.connect(self._on_error_occurred)
+        self.engine.running_changed.connect(self._on_running_changed)
+        self.engine.start_latency.connect(self._on_start_latency)
+        self.engine.initialized.connect(self._on_engine_initialized)
     
-    @pyqtSlot(np.ndarray, float)
-    def _on_frame_processed(self, frame: np.ndarray, fps: float):
+    @pyqtSlot(float)
+    def _on_frame_ready(self, fps: float):
         """
-        Xử lý khi nhận frame mới từ engine
+        Hiển thị frame mới từ frame store của engine
+        
+        Frame đã được đổi sang RGB và scale trong worker, ở đây chỉ bọc
+        buffer thành QImage (không copy)
         
         Args:
-            frame: Frame đã xử lý
             fps: FPS hiện tại
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        
-        # Scale và hiển thị
-        scaled_pixmap = QPixmap.fromImage(qt_image).scaled(
-            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        
-        self.video_label.setPixmap(scaled_pixmap)
+        with self.engine.frame_store.read() as (rgb_frame, _):
+            if rgb_frame is None:
+                return
+            h, w = rgb_frame.shape[:2]
+            qt_image = QImage(rgb_frame.data, w, h, rgb_frame.strides[0], QImage.Format_RGB888)
+            self.video_label.setPixmap(QPixmap.fromImage(qt_image))
+    
+    def _update_display_size(self):
+        """Báo kích thước khung video cho engine để scale trong worker"""
+        if self.engine is not None:
+            self.engine.frame_store.set_target_size(
+                self.video_label.width(), self.video_label.height())
+    
+    def resizeEvent(self, event):
+        """Cập nhật kích thước scale khi cửa sổ đổi kích thước"""
+        super().resizeEvent(event)
+        self._update_display_size()
+    
+    def _update_display_visibility(self):
+        """Tạm ngừng hiển thị khi cửa sổ thu nhỏ/bị ẩn (detection và cảnh báo vẫn chạy)"""
+        if self.engine is not None:
+            self.engine.frame_store.set_suspended(self.isMinimized() or not self.isVisible())
+    
+    def changeEvent(self, event):
+        """Thu nhỏ / khôi phục cửa sổ"""
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._update_display_visibility()
+    
+    def showEvent(self, event):
+        """Cửa sổ hiện lại"""
+        super().showEvent(event)
+        self._update_display_visibility()
+    
+    def hideEvent(self, event):
+        """Cửa sổ bị ẩn"""
+        super().hideEvent(event)
+        self._update_display_visibility()
     
     @pyqtSlot(bool)
     def _on_face_detected(self, detected: bool):
         """Xử lý khi phát hiện/mất khuôn mặt"""
         pass  # Có thể thêm xử lý nếu cần
     
-    @pyqtSlot(dict)
+    def _poll_metrics(self):
+        """Đọc snapshot metrics của engine (QTimer, display.ui_rate) và cập nhật nếu mới"""
+        metrics, version = self.engine.metrics_snapshot.read()
+        if version == self._metrics_version:
+            return
+        self._metrics_version = version
+        if metrics is None:
+            return
+        self._on_metrics_updated(metrics)
+        if metrics["learning_progress"] is not None:
+            self._on_learning_progress(metrics["learning_progress"])
+    
     def _on_metrics_updated(self, metrics: dict):
         """
         Cập nhật hiển thị metrics
@@ -259,12 +361,26 @@ Yawns/min: {metrics['yawn_count']}
             status: Text trạng thái
             color: Màu nền
         """
-        self.status_label.setText(status)
-        self.status_label.setStyleSheet(
-            f"padding: 20px; background-color: {color}; color: white; "
-            f"border-radius: 5px; font-weight: bold;")
+        self._set_status(status,
+                         f"padding: 20px; background-color: {color}; color: white; "
+                         f"border-radius: 5px; font-weight: bold;")
+    
+    def _set_status(self, text: str, style: str):
+        """
+        Đặt text + stylesheet của status_label, bỏ qua nếu không đổi
+        (setStyleSheet parse lại stylesheet và restyle widget)
+        
+        Args:
+            text: Text trạng thái
+            style: Stylesheet
+        """
+        shown_text, shown_style = self._status_shown
+        if text != shown_text:
+            self.status_label.setText(text)
+        if style != shown_style:
+            self.status_label.setStyleSheet(style)
+        self._status_shown = (text, style)
     
-    @pyqtSlot(float)
     def _on_learning_progress(self, progress: float):
         """
         Cập nhật tiến độ học
@@ -288,32 +404,39 @@ Yawns/min: {metrics['yawn_count']}
             error: Thông báo lỗi
         """
         QMessageBox.critical(self, "Error", error)
-        self.status_label.setText("Error: " + error)
-        self.status_label.setStyleSheet(
-            "padding: 20px; background-color: #f44336; color: white; border-radius: 5px;")
+        self._set_status("Error: " + error,
+                         "padding: 20px; background-color: #f44336; color: white; border-radius: 5px;")
     
     def _toggle_detection(self):
-        """Bật/tắt detection"""
-        if not self.engine.is_running:
-            # Bắt đầu - tạo engine mới
-            if self.engine is not None:
-                # Disconnect signals cũ
-                try:
-                    self.engine.frame_processed.disconnect()
-                    self.engine.face_detected.disconnect()
-                    self.engine.metrics_updated.disconnect()
-                    self.engine.alert_changed.disconnect()
-                    self.engine.status_changed.disconnect()
-                    self.engine.learning_progress.disconnect()
-                    self.engine.error_occurred.disconnect()
-                except:
-                    pass
-            
-            # Tạo engine mới
-            self.engine = DetectionEngine(self.config)
-            self._connect_signals()
-            self.engine.start()
-            
+        """
+        Bật/tắt detection
+        
+        Engine sống suốt vòng đời cửa sổ: START/STOP chỉ resume/pause nên
+        không tạo lại FaceMesh, âm thanh và (nếu keep_warm) camera.
+        Nút được cập nhật khi engine báo running_changed.
+        """
+        if self.engine is None:
+            # Import engine lỗi trước đó: nút đang là RETRY
+            if not self.loader.isRunning():
+                self._load_engine()
+            return
+        if self.engine.is_active:
+            self.engine.pause()
+        else:
+            self.engine.resume()
+        # Chờ engine xác nhận, tránh bấm lặp khi camera đang mở
+        self.start_stop_btn.setEnabled(False)
+    
+    @pyqtSlot(bool)
+    def _on_running_changed(self, running: bool):
+        """
+        Cập nhật nút điều khiển khi engine bắt đầu/kết thúc một phiên
+        
+        Args:
+            running: True nếu engine đang xử lý frame
+        """
+        self.start_stop_btn.setEnabled(True)
+        if running:
             self.start_stop_btn.setText("STOP")
             self.start_stop_btn.setStyleSheet("""
                 QPushButton {
@@ -327,10 +450,9 @@ Yawns/min: {metrics['yawn_count']}
             """)
             self.learn_btn.setEnabled(True)
             self.landmarks_btn.setEnabled(True)
+            self.metrics_timer.start()
         else:
-            # Dừng
-            self.engine.stop()
-            
+            self.metrics_timer.stop()
             self.start_stop_btn.setText("START")
             self.start_stop_btn.setStyleSheet("""
                 QPushButton {
@@ -347,8 +469,30 @@ Yawns/min: {metrics['yawn_count']}
             
             self.video_label.clear()
             self.video_label.setStyleSheet("background-color: black;")
-            self.status_label.setText("Stopped")
-            self.status_label.setStyleSheet("padding: 20px; background-color: lightgray; border-radius: 5px;")
+            self._set_status("Stopped", self.IDLE_STATUS_STYLE)
+    
+    @pyqtSlot(float)
+    def _on_start_latency(self, latency_ms: float):
+        """
+        Hiển thị độ trễ từ lúc bấm START tới frame đầu tiên
+        
+        Args:
+            latency_ms: Độ trễ (ms)
+        """
+        self.statusBar().showMessage(f"First frame {latency_ms:.0f} ms after START")
+    
+    @pyqtSlot(dict)
+    def _on_engine_initialized(self, timings: dict):
+        """
+        Hiển thị thời gian import và khởi tạo engine
+        
+        Args:
+            timings: {"face_mesh_ms", "warm_up_ms", "audio_ms", "total_ms"}
+        """
+        self.statusBar().showMessage(
+            f"Ready - import {self.import_ms:.0f} ms, FaceMesh {timings['face_mesh_ms']:.0f} ms, "
+            f"warm-up {timings['warm_up_ms']:.0f} ms, audio {timings['audio_ms']:.0f} ms")
+    
     #
     def _reset_learning(self):
         """Reset và học lại từ đầu"""
@@ -378,9 +522,15 @@ Yawns/min: {metrics['yawn_count']}
     
     def closeEvent(self, event):
         """Xử lý khi đóng cửa sổ"""
-        if self.engine and self.engine.is_running:
+        # Đợi import engine xong (không huỷ QThread đang chạy)
+        self._closing = True
+        self.loader.wait()
+        if self.engine:
             print("[MainWindow] Đang dừng engine...")
             self.engine.stop()
         
+        # Ghi các thay đổi cấu hình còn chờ và dừng writer thread
+        self.config.close()
+        
         print("[MainWindow] Đã đóng ứng dụng")
         event.accept()
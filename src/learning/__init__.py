@@ -2,5 +2,6 @@
 Learning Module - Học và điều chỉnh ngưỡng tự động
 """
 from .learning_engine import LearningEngine
+from .running_stats import P2Quantile, RollingStats
 
-__all__ = ['LearningEngine']
+__all__ = ['LearningEngine', 'RollingStats', 'P2Quantile']
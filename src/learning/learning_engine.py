@@ -1,13 +1,17 @@
 """
 Learning Engine - Tự động học và điều chỉnh ngưỡng
 """
-import numpy as np
 from typing import Optional
 
+from .running_stats import P2Quantile, RollingStats
+
 
 class LearningEngine:
     """Quản lý việc học và cập nhật ngưỡng tự động"""
     
+    # Số mẫu gần nhất dùng để tính ngưỡng mới
+    WINDOW_SIZE = 100
+    
     def __init__(self, config_manager, learning_samples: int = 100, weight: float = 0.3):
         """
         Khởi tạo LearningEngine
@@ -23,10 +27,15 @@ class LearningEngine:
         
         # State
         self.continuous_learning = True  # Luôn học liên tục
-        self.ear_samples = []
-        self.mar_samples = []
         self.learning_counter = 0
         
+        # Thống kê streaming, bộ nhớ cố định bất kể chạy bao lâu
+        self.ear_stats = RollingStats(self.WINDOW_SIZE)
+        self.mar_stats = RollingStats(self.WINDOW_SIZE)
+        # Quantile toàn phiên (EAR thấp / MAR cao)
+        self.ear_quantiles = {q: P2Quantile(q) for q in (0.05, 0.5)}
+        self.mar_quantiles = {q: P2Quantile(q) for q in (0.5, 0.95)}
+        
         print("[Learning] Đã khởi tạo Learning Engine")
     
     def add_sample(self, ear: float, mar: float, quality: float = 1.0) -> bool:
@@ -44,8 +53,12 @@ class LearningEngine:
         if not self.continuous_learning or quality < 0.75:
             return False
         
-        self.ear_samples.append(ear)
-        self.mar_samples.append(mar)
+        self.ear_stats.add(ear)
+        self.mar_stats.add(mar)
+        for estimator in self.ear_quantiles.values():
+            estimator.add(ear)
+        for estimator in self.mar_quantiles.values():
+            estimator.add(mar)
         self.learning_counter += 1
         
         # Tự động cập nhật ngưỡng sau mỗi 50 samples
@@ -63,18 +76,14 @@ class LearningEngine:
         Returns:
             (new_ear, new_mar) nếu cập nhật thành công, None nếu không đủ samples
         """
-        if len(self.ear_samples) < 10:
+        if self.ear_stats.count < 10:
             print("[Learning] Chưa đủ samples để cập nhật ngưỡng")
             return None
         
-        # Lấy 100 samples gần nhất
-        recent_ear = self.ear_samples[-100:]
-        recent_mar = self.mar_samples[-100:]
-        
-        # Tính statistics
-        ear_mean = np.mean(recent_ear)
-        mar_mean = np.mean(recent_mar)
-        ear_std = np.std(recent_ear)
+        # Statistics của 100 samples gần nhất (cập nhật dần khi thêm mẫu)
+        ear_mean = self.ear_stats.mean
+        mar_mean = self.mar_stats.mean
+        ear_std = self.ear_stats.std
         
         # Ngưỡng mới = mean - 1.5*std (bảo thủ vừa phải)
         new_ear_threshold = ear_mean - 1.5 * ear_std
@@ -92,20 +101,24 @@ class LearningEngine:
         updated_ear = max(0.17, min(0.30, updated_ear))
         updated_mar = max(0.5, min(0.8, updated_mar))
         
-        # Lưu vào config
-        self.config.set("thresholds.ear", updated_ear)
-        self.config.set("thresholds.mar", updated_mar)
-        self.config.save()
+        # Lưu vào config (ghi file ở background, không chặn frame thread)
+        self.config.set_many({
+            "thresholds.ear": updated_ear,
+            "thresholds.mar": updated_mar
+        })
+        self.config.request_save()
         
         print(f"[Learning] Auto-updated thresholds: EAR={updated_ear:.3f}, MAR={updated_mar:.3f}")
-        print(f"[Learning] Stats: EAR mean={ear_mean:.3f}, std={ear_std:.3f}, samples={len(recent_ear)}")
+        print(f"[Learning] Stats: EAR mean={ear_mean:.3f}, std={ear_std:.3f}, samples={self.ear_stats.count}")
         
         return (updated_ear, updated_mar)
     
     def reset(self):
         """Reset và học lại từ đầu"""
-        self.ear_samples = []
-        self.mar_samples = []
+        self.ear_stats.reset()
+        self.mar_stats.reset()
+        for estimator in (*self.ear_quantiles.values(), *self.mar_quantiles.values()):
+            estimator.reset()
         self.learning_counter = 0
         self.continuous_learning = True
         print("[Learning] Reset complete, starting fresh learning")
@@ -124,7 +137,7 @@ class LearningEngine:
     
     def get_total_samples(self) -> int:
         """Lấy tổng số mẫu đã học"""
-        return len(self.ear_samples)
+        return self.ear_stats.total
     
     def get_stats(self) -> dict:
         """
@@ -133,7 +146,7 @@ class LearningEngine:
         Returns:
             Dict chứa các thông tin thống kê
         """
-        if len(self.ear_samples) == 0:
+        if self.ear_stats.count == 0:
             return {
                 "total_samples": 0,
                 "progress": 0.0,
@@ -142,15 +155,16 @@ class LearningEngine:
                 "mar_mean": 0.0
             }
         
-        recent_ear = self.ear_samples[-100:]
-        recent_mar = self.mar_samples[-100:]
-        
         return {
-            "total_samples": len(self.ear_samples),
+            "total_samples": self.ear_stats.total,
             "progress": self.get_progress(),
-            "ear_mean": float(np.mean(recent_ear)),
-            "ear_std": float(np.std(recent_ear)),
-            "mar_mean": float(np.mean(recent_mar)),
+            "ear_mean": self.ear_stats.mean,
+            "ear_std": self.ear_stats.std,
+            "mar_mean": self.mar_stats.mean,
+            "ear_p05": self.ear_quantiles[0.05].value,
+            "ear_p50": self.ear_quantiles[0.5].value,
+            "mar_p50": self.mar_quantiles[0.5].value,
+            "mar_p95": self.mar_quantiles[0.95].value,
             "current_counter": self.learning_counter
         }
     
@@ -0,0 +1,191 @@
+"""
+Running Stats - Thống kê streaming với bộ nhớ cố định
+- RollingStats: mean/std của N mẫu gần nhất (ring buffer + Welford trượt)
+- P2Quantile: ước lượng quantile toàn phiên bằng thuật toán P² (5 marker)
+"""
+import numpy as np
+
+
+class RollingStats:
+    """Mean/variance của cửa sổ N mẫu gần nhất, cập nhật O(1)"""
+
+    # Tính lại chính xác từ buffer sau chừng này mẫu để tránh sai số tích lũy
+    RESYNC_INTERVAL = 4096
+
+    def __init__(self, capacity: int = 100):
+        """
+        Khởi tạo RollingStats
+
+        Args:
+            capacity: Số mẫu tối đa trong cửa sổ
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity phải >= 1, nhận {capacity}")
+
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.float64)
+        self._index = 0
+        self.count = 0  # Số mẫu trong cửa sổ
+        self.total = 0  # Tổng số mẫu đã thêm
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._since_resync = 0
+
+    def add(self, value: float):
+        """
+        Thêm một mẫu (mẫu cũ nhất bị loại khi cửa sổ đầy)
+
+        Args:
+            value: Giá trị mẫu
+        """
+        value = float(value)
+        if self.count < self.capacity:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (value - self.mean)
+        else:
+            # Welford trượt: thay mẫu cũ nhất bằng mẫu mới
+            old = self._buffer[self._index]
+            old_mean = self.mean
+            self.mean += (value - old) / self.count
+            self._m2 += (value - old) * (value - self.mean + old - old_mean)
+
+        self._buffer[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        self.total += 1
+
+        self._since_resync += 1
+        if self._since_resync >= self.RESYNC_INTERVAL:
+            self._resync()
+
+    @property
+    def variance(self) -> float:
+        """Phương sai (population, giống np.var) của cửa sổ"""
+        if self.count == 0:
+            return 0.0
+        return max(self._m2, 0.0) / self.count
+
+    @property
+    def std(self) -> float:
+        """Độ lệch chuẩn (population, giống np.std) của cửa sổ"""
+        return self.variance ** 0.5
+
+    def reset(self):
+        """Xóa toàn bộ mẫu"""
+        self._index = 0
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._since_resync = 0
+
+    def _resync(self):
+        """Tính lại mean/M2 chính xác từ các mẫu trong buffer"""
+        window = self._buffer[:self.count]
+        self.mean = float(window.mean())
+        self._m2 = float(((window - self.mean) ** 2).sum())
+        self._since_resync = 0
+
+
+class P2Quantile:
+    """
+    Ước lượng quantile streaming bằng thuật toán P² (Jain & Chlamtac, 1985)
+    Chỉ giữ 5 marker, không lưu mẫu
+    """
+
+    def __init__(self, q: float):
+        """
+        Khởi tạo P2Quantile
+
+        Args:
+            q: Quantile cần ước lượng (0-1)
+        """
+        if not 0.0 < q < 1.0:
+            raise ValueError(f"q phải nằm trong (0, 1), nhận {q}")
+
+        self.q = q
+        self.count = 0
+        self._initial = []
+        self._heights = None
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1.0 + 2.0 * q, 1.0 + 4.0 * q, 3.0 + 2.0 * q, 5.0]
+        self._increments = [0.0, q / 2.0, q, (1.0 + q) / 2.0, 1.0]
+
+    def add(self, value: float):
+        """
+        Thêm một mẫu
+
+        Args:
+            value: Giá trị mẫu
+        """
+        value = float(value)
+        self.count += 1
+
+        if self._heights is None:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                self._heights = sorted(self._initial)
+                self._initial = []
+            return
+
+        heights = self._heights
+        positions = self._positions
+
+        # Tìm ô chứa mẫu mới, mở rộng marker ngoài cùng nếu cần
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Điều chỉnh 3 marker giữa về vị trí mong muốn
+        for i in range(1, 4):
+            offset = self._desired[i] - positions[i]
+            if ((offset >= 1 and positions[i + 1] - positions[i] > 1) or
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    @property
+    def value(self) -> float:
+        """Ước lượng quantile hiện tại (0 nếu chưa có mẫu)"""
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return 0.0
+        samples = sorted(self._initial)
+        return samples[int(round(self.q * (len(samples) - 1)))]
+
+    def reset(self):
+        """Xóa toàn bộ mẫu"""
+        self.__init__(self.q)
+
+    def _parabolic(self, i: int, step: int) -> float:
+        """Nội suy parabol (P²) cho marker i"""
+        h = self._heights
+        n = self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        """Nội suy tuyến tính cho marker i"""
+        h = self._heights
+        n = self._positions
+        return h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
@@ -0,0 +1,21 @@
+"""
+Offline Module - Chấm điểm video đã ghi, không cần GUI/âm thanh
+"""
+from .result_writer import ResultWriter
+from .landmark_log import LandmarkLog, LandmarkRecorder
+from .landmark_replay import LandmarkReplay
+
+__all__ = ['VideoScorer', 'ResultWriter', 'ParallelScorer',
+           'LandmarkLog', 'LandmarkRecorder', 'LandmarkReplay']
+
+
+def __getattr__(name):
+    # VideoScorer/ParallelScorer cần cv2 + mediapipe - chỉ import khi dùng,
+    # replay landmarks không cần camera lẫn FaceMesh
+    if name == 'VideoScorer':
+        from .video_scorer import VideoScorer
+        return VideoScorer
+    if name == 'ParallelScorer':
+        from .parallel_scorer import ParallelScorer
+        return ParallelScorer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,226 @@
+"""
+Landmark Log - File nhị phân append-only chứa landmarks + timestamp từng frame
+Ghi tuần tự khi chạy camera (thread nền), đọc lại bằng np.memmap để replay không cần FaceMesh
+"""
+import os
+import struct
+import threading
+import numpy as np
+from typing import List, Optional
+
+# Header: magic, version, số điểm landmark, dự phòng
+MAGIC = b"DDLM"
+# 2: bỏ cột "predicted" (frame ngoại suy không được ghi)
+VERSION = 2
+_HEADER = struct.Struct("<4sHHQ")
+HEADER_SIZE = _HEADER.size
+
+
+def record_dtype(num_points: int) -> np.dtype:
+    """
+    Kiểu bản ghi cố định cho một frame
+
+    Args:
+        num_points: Số điểm landmark mỗi frame (20 = KEY_INDICES)
+
+    Returns:
+        Structured dtype (timestamp, face, landmarks)
+    """
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("face", "u1"),
+        ("landmarks", "<f4", (num_points, 2))
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Ghi landmarks từng frame vào cuối file (mở lại file cũ thì ghi tiếp)
+
+    - write() chỉ chép bản ghi vào block trong RAM, không chạm tới ổ đĩa
+      (gọi được từ frame thread)
+    - Thread nền ghi các block đầy, và block dở dang sau mỗi flush_interval giây
+    """
+
+    # Số frame mỗi block chuyển cho writer thread
+    BLOCK_SIZE = 256
+
+    def __init__(self, path: str, num_points: int = 20, flush_interval: float = 1.0):
+        """
+        Khởi tạo LandmarkRecorder
+
+        Args:
+            path: Đường dẫn file log
+            num_points: Số điểm landmark mỗi frame
+            flush_interval: Chu kỳ tối đa (giây) giữ bản ghi trong RAM trước khi ghi
+
+        Raises:
+            ValueError: Nếu file đã tồn tại với định dạng khác
+        """
+        self.path = path
+        self.num_points = num_points
+        self.dtype = record_dtype(num_points)
+        self.flush_interval = flush_interval
+        self.frames_written = 0
+        self.error: Optional[str] = None
+
+        # Block đang điền (frame thread) + các block đầy chờ ghi (writer thread)
+        self._block = np.zeros(self.BLOCK_SIZE, dtype=self.dtype)
+        self._count = 0
+        self._pending: List[bytes] = []
+        self._condition = threading.Condition()
+        self._stopped = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        exists = size >= HEADER_SIZE
+        if exists:
+            # Kiểm tra header trước khi ghi tiếp
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER_SIZE), num_points, path)
+
+        self._file = open(path, "ab")
+        if not exists:
+            if size:
+                # Lần ghi trước bị ngắt giữa header - không có bản ghi nào để giữ
+                print(f"[Record] Header dở dang ({size} byte), ghi lại từ đầu: {path}")
+                self._file.truncate(0)
+            self._file.write(_HEADER.pack(MAGIC, VERSION, num_points, 0))
+        else:
+            # Bỏ bản ghi dở dang ở cuối (lần ghi trước bị ngắt giữa chừng)
+            complete = HEADER_SIZE + (size - HEADER_SIZE) // self.dtype.itemsize * self.dtype.itemsize
+            if complete != size:
+                self._file.truncate(complete)
+
+        self._thread = threading.Thread(target=self._run, name="LandmarkRecorder",
+                                        daemon=True)
+        self._thread.start()
+
+    def write(self, timestamp: float, landmarks: Optional[np.ndarray]):
+        """
+        Đưa một frame vào hàng đợi ghi (không chặn vì I/O)
+
+        Chỉ ghi landmarks đo bằng FaceMesh - frame ngoại suy (adaptive skip)
+        không được ghi, nên log có thể có khoảng trống giữa các timestamp
+
+        Args:
+            timestamp: Thời điểm capture của frame
+            landmarks: Landmarks (num_points, 2), None nếu không có mặt
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            record = self._block[self._count]
+            record["timestamp"] = timestamp
+            if landmarks is None:
+                record["face"] = 0
+                record["landmarks"] = 0.0
+            else:
+                record["face"] = 1
+                record["landmarks"] = landmarks
+            self._count += 1
+            self.frames_written += 1
+            if self._count == self.BLOCK_SIZE:
+                self._pending.append(self._block.tobytes())
+                self._count = 0
+                self._condition.notify()
+
+    def _run(self):
+        """Writer thread: ghi block đầy ngay, block dở dang theo flush_interval"""
+        while True:
+            with self._condition:
+                if not self._pending and not self._stopped:
+                    self._condition.wait(self.flush_interval)
+                chunks = self._pending
+                self._pending = []
+                if self._count:
+                    chunks.append(self._block[:self._count].tobytes())
+                    self._count = 0
+                stopped = self._stopped
+
+            if chunks and self.error is None:
+                try:
+                    for chunk in chunks:
+                        self._file.write(chunk)
+                    self._file.flush()
+                except OSError as e:
+                    # Ổ đĩa lỗi/đầy: dừng ghi, detection vẫn chạy bình thường
+                    self.error = str(e)
+                    print(f"[Record] Lỗi khi ghi landmark log, dừng ghi: {e}")
+            if stopped:
+                return
+
+    def close(self):
+        """Ghi nốt các frame đang chờ và đóng file"""
+        if self._file is None:
+            return
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+        self._file = None
+        print(f"[Record] Đã ghi {self.frames_written} frame: {self.path}")
+
+
+class LandmarkLog:
+    """Đọc file log qua np.memmap (không nạp toàn bộ vào RAM)"""
+
+    def __init__(self, path: str):
+        """
+        Mở file log
+
+        Args:
+            path: Đường dẫn file log
+
+        Raises:
+            IOError: Nếu không đọc được file
+            ValueError: Nếu sai định dạng
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"File log quá ngắn: {path}")
+        self.num_points = _check_header(header, None, path)
+        self.dtype = record_dtype(self.num_points)
+
+        # Bỏ qua bản ghi dở dang nếu file đang được ghi
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r",
+                                     offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        """Số frame trong log"""
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Timestamp từng frame (view trên memmap)"""
+        return self.records["timestamp"]
+
+    @property
+    def faces(self) -> np.ndarray:
+        """Cờ có mặt từng frame"""
+        return self.records["face"].astype(bool)
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """Landmarks (N, num_points, 2) (view trên memmap)"""
+        return self.records["landmarks"]
+
+
+def _check_header(header: bytes, num_points: Optional[int], path: str) -> int:
+    """Kiểm tra header, trả về số điểm landmark của file"""
+    magic, version, file_points, _ = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Không phải file landmark log (v{VERSION}): {path}")
+    if num_points is not None and file_points != num_points:
+        raise ValueError(f"File {path} chứa {file_points} điểm/frame, cần {num_points}")
+    return file_points
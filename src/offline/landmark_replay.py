@@ -0,0 +1,123 @@
+"""
+Landmark Replay - Chạy lại MetricsProcessor + logic cảnh báo trên landmark log
+Không cần camera và FaceMesh, nên chỉnh ngưỡng trên dữ liệu nhiều ngày trong vài giây
+"""
+import time
+import numpy as np
+from typing import Dict
+
+from ..core.frame_analyzer import FrameAnalyzer
+from ..detection import LandmarkLayout, MetricsProcessor
+from .landmark_log import LandmarkLog
+from .result_writer import SCORE_COLUMNS
+
+
+class LandmarkReplay:
+    """Đưa landmarks đã ghi vào FrameAnalyzer.analyze_landmarks theo đúng timestamp"""
+
+    # Cùng cột với VideoScorer để dùng chung ResultWriter
+    COLUMNS = SCORE_COLUMNS
+    # Số frame tính EAR/MAR mỗi batch (giới hạn RAM khi log rất dài)
+    BATCH_SIZE = 65536
+
+    def __init__(self, config_manager):
+        """
+        Khởi tạo LandmarkReplay
+
+        Args:
+            config_manager: ConfigManager instance (ngưỡng có thể đã override)
+        """
+        self.config = config_manager
+
+    def replay(self, log: LandmarkLog, speed: float = 0.0) -> Dict[str, np.ndarray]:
+        """
+        Replay toàn bộ log
+
+        Args:
+            log: LandmarkLog đã mở
+            speed: Hệ số tốc độ so với thời gian thực (0 = nhanh nhất có thể)
+
+        Returns:
+            Dict cột -> array (xem COLUMNS), kèm "stats" là dict thống kê
+        """
+        # Trạng thái metrics mới cho mỗi lần replay
+        analyzer = FrameAnalyzer(self.config)
+
+        num_frames = len(log)
+        timestamps = np.asarray(log.timestamps, dtype=np.float64)
+        faces = log.faces
+        landmarks = log.landmarks
+
+        ears = np.full(num_frames, np.nan, dtype=np.float32)
+        mars = np.full(num_frames, np.nan, dtype=np.float32)
+        alerts = np.full(num_frames, -1, dtype=np.int8)
+
+        start_time = time.perf_counter()
+        raw_ears, raw_mars = self._raw_metrics(landmarks, faces)
+        first_timestamp = timestamps[0] if num_frames else 0.0
+
+        for index in range(num_frames):
+            timestamp = float(timestamps[index])
+            if speed > 0:
+                # Giữ nhịp theo timestamp gốc, chia cho hệ số tốc độ
+                delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - start_time)
+                if delay > 0:
+                    time.sleep(delay)
+
+            if not faces[index]:
+                analyzer.processor.mark_face_lost(timestamp)
+                continue
+
+            analysis = analyzer.analyze_landmarks(
+                landmarks[index], timestamp,
+                (float(raw_ears[index]), float(raw_mars[index])))
+            ears[index] = analysis["ear"]
+            mars[index] = analysis["mar"]
+            alerts[index] = analysis["alert_level"].value
+
+        elapsed = time.perf_counter() - start_time
+
+        return {
+            "video": np.full(num_frames, log.path),
+            "frame": np.arange(num_frames, dtype=np.int32),
+            "timestamp": timestamps,
+            "face": faces,
+            "ear": ears,
+            "mar": mars,
+            "alert": alerts,
+            "stats": {
+                "video": log.path,
+                "frames": num_frames,
+                "seconds": elapsed,
+                "fps": num_frames / elapsed if elapsed > 0 else 0.0
+            }
+        }
+
+    @classmethod
+    def _raw_metrics(cls, landmarks: np.ndarray, faces: np.ndarray):
+        """
+        Tính EAR/MAR thô cho mọi frame có mặt theo batch
+
+        Args:
+            landmarks: Landmarks (N, num_points, 2) trên memmap
+            faces: Cờ có mặt (N,)
+
+        Returns:
+            (ears, mars) - mỗi array (N,), NaN ở frame không có mặt
+        """
+        num_frames = len(landmarks)
+        ears = np.full(num_frames, np.nan, dtype=np.float64)
+        mars = np.full(num_frames, np.nan, dtype=np.float64)
+
+        for start in range(0, num_frames, cls.BATCH_SIZE):
+            stop = min(start + cls.BATCH_SIZE, num_frames)
+            mask = faces[start:stop]
+            if not mask.any():
+                continue
+            chunk = np.asarray(landmarks[start:stop][mask], dtype=np.float32)
+            chunk_ears, chunk_mars = MetricsProcessor.calculate_batch(
+                *LandmarkLayout.split_landmarks_batch(chunk))
+            ears[start:stop][mask] = chunk_ears
+            mars[start:stop][mask] = chunk_mars
+
+        return ears, mars
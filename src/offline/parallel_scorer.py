@@ -0,0 +1,99 @@
+"""
+Parallel Scorer - Chia video cho nhiều process để chấm điểm song song
+Mỗi worker giữ một FaceDetector suốt vòng đời process (graph FaceMesh reset giữa các video)
+"""
+import multiprocessing
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from ..config import ConfigManager
+from .video_scorer import VideoScorer
+
+
+# VideoScorer của process worker hiện tại (khởi tạo một lần trong _init_worker)
+_worker_scorer: Optional[VideoScorer] = None
+
+
+def _init_worker(config_path: str):
+    """Khởi tạo worker: load config và tạo FaceDetector một lần"""
+    global _worker_scorer
+    _worker_scorer = VideoScorer(ConfigManager(config_path))
+
+
+def _score_clip(video_path: str) -> dict:
+    """Chấm điểm một video trong worker, trả lỗi thay vì raise"""
+    try:
+        result = _worker_scorer.score(video_path)
+    except Exception as e:
+        return {"error": str(e), "stats": {"video": video_path, "worker": os.getpid()}}
+
+    result["stats"]["worker"] = os.getpid()
+    return result
+
+
+class ParallelScorer:
+    """Process pool chấm điểm nhiều video, gom kết quả về một nơi"""
+
+    def __init__(self, config_path: str, workers: Optional[int] = None, chunksize: int = 1):
+        """
+        Khởi tạo ParallelScorer
+
+        Args:
+            config_path: Đường dẫn config (mỗi worker tự load)
+            workers: Số process (None = số CPU)
+            chunksize: Số video giao cho worker mỗi lần
+        """
+        self.config_path = config_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+
+        # Thống kê theo worker: pid -> {clips, frames, seconds, fps}
+        self.worker_stats: Dict[int, dict] = {}
+        self.errors = []
+
+    def run(self, video_paths: Iterable[str],
+            on_result: Callable[[dict], None]) -> Dict[int, dict]:
+        """
+        Chấm điểm tất cả video, gọi on_result ngay khi mỗi video xong
+
+        Args:
+            video_paths: Danh sách video
+            on_result: Callback nhận kết quả của một video (chạy ở process chính)
+
+        Returns:
+            Thống kê throughput theo worker
+        """
+        self.worker_stats = {}
+        self.errors = []
+
+        # spawn: không fork trạng thái MediaPipe/OpenCV của process cha
+        ctx = multiprocessing.get_context("spawn")
+        start_time = time.perf_counter()
+
+        with ctx.Pool(self.workers, initializer=_init_worker,
+                      initargs=(self.config_path,)) as pool:
+            for result in pool.imap_unordered(_score_clip, video_paths, self.chunksize):
+                stats = result["stats"]
+
+                if "error" in result:
+                    print(f"[Parallel] Lỗi {stats['video']}: {result['error']}")
+                    self.errors.append(stats["video"])
+                    continue
+
+                worker = self.worker_stats.setdefault(
+                    stats["worker"], {"clips": 0, "frames": 0, "seconds": 0.0, "fps": 0.0})
+                worker["clips"] += 1
+                worker["frames"] += stats["frames"]
+                worker["seconds"] += stats["seconds"]
+                if worker["seconds"] > 0:
+                    worker["fps"] = worker["frames"] / worker["seconds"]
+
+                on_result(result)
+
+        elapsed = time.perf_counter() - start_time
+        total_frames = sum(w["frames"] for w in self.worker_stats.values())
+        print(f"[Parallel] {self.workers} workers: {total_frames} frames trong {elapsed:.1f}s "
+              f"({total_frames / elapsed if elapsed > 0 else 0:.1f} fps tổng)")
+
+        return self.worker_stats
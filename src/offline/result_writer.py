@@ -0,0 +1,177 @@
+"""
+Result Writer - Ghi kết quả chấm điểm theo cột
+.npz: mỗi cột một array (nén), .csv: ghi dần từng dòng
+"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from numpy.lib import format as npy_format
+from typing import BinaryIO, Dict, Sequence
+
+# Cột kết quả chấm điểm dùng chung cho VideoScorer và LandmarkReplay
+SCORE_COLUMNS = ("video", "frame", "timestamp", "face", "ear", "mar", "alert")
+
+# Hậu tố của bảng giá trị cho cột chuỗi trong .npz
+VALUES_SUFFIX = "_values"
+
+
+class ResultWriter:
+    """
+    Ghi các cột kết quả ra file .npz (columnar) hoặc .csv
+
+    .npz được ghi dần: mỗi cột đệm ra một file tạm trên đĩa, close() chép
+    thẳng vào file nén nên bộ nhớ không tăng theo số video. Cột chuỗi (vd.
+    "video") lưu dạng mã int32 cộng bảng "<cột>_values" - mỗi đường dẫn chỉ
+    lưu một lần: data["video_values"][data["video"]] cho lại tên video.
+    """
+
+    def __init__(self, output_path: str, columns: Sequence[str]):
+        """
+        Khởi tạo ResultWriter
+
+        Args:
+            output_path: File đích (.npz hoặc .csv)
+            columns: Tên các cột theo thứ tự
+        """
+        self.output_path = output_path
+        self.columns = list(columns)
+        self.format = os.path.splitext(output_path)[1].lower()
+        if self.format not in (".npz", ".csv"):
+            raise ValueError(f"Định dạng không hỗ trợ: {self.format} (dùng .npz hoặc .csv)")
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        self.rows_written = 0
+        self._closed = False
+        self._csv_file = None
+        self._csv_writer = None
+
+        # .npz: file tạm + dtype của từng cột (dtype lấy theo khối đầu tiên)
+        self._spools: Dict[str, BinaryIO] = {}
+        self._dtypes: Dict[str, np.dtype] = {}
+        # Cột chuỗi: giá trị -> mã, theo thứ tự xuất hiện
+        self._values: Dict[str, Dict[str, int]] = {}
+
+        if self.format == ".csv":
+            self._csv_file = open(output_path, "w", newline="", encoding="utf-8")
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(self.columns)
+        else:
+            for name in self.columns:
+                self._spools[name] = tempfile.TemporaryFile(
+                    prefix=f"{name}-", suffix=".col", dir=output_dir or None)
+
+    def write(self, result: Dict[str, np.ndarray]):
+        """
+        Thêm một khối kết quả (các cột cùng độ dài)
+
+        Args:
+            result: Dict cột -> array
+        """
+        data = [np.asarray(result[name]) for name in self.columns]
+
+        if self._csv_writer is not None:
+            self._csv_writer.writerows(zip(*(column.tolist() for column in data)))
+        else:
+            for name, column in zip(self.columns, data):
+                self._spool(name, column)
+
+        self.rows_written += len(data[0]) if data else 0
+
+    def _spool(self, name: str, column: np.ndarray):
+        """
+        Nối một khối của cột vào file tạm
+
+        Args:
+            name: Tên cột
+            column: Array 1 chiều
+        """
+        if column.dtype.kind in "USO" or name in self._values:
+            column = self._encode(name, column)
+
+        dtype = self._dtypes.setdefault(name, column.dtype)
+        self._spools[name].write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+
+    def _encode(self, name: str, column: np.ndarray) -> np.ndarray:
+        """
+        Đổi cột chuỗi sang mã int32 theo bảng giá trị của cột
+
+        Args:
+            name: Tên cột
+            column: Array chuỗi
+
+        Returns:
+            Array mã int32 cùng độ dài
+        """
+        table = self._values.setdefault(name, {})
+        uniques, inverse = np.unique(column.astype(str), return_inverse=True)
+        codes = np.array([table.setdefault(value, len(table)) for value in uniques.tolist()],
+                         dtype=np.int32)
+        return codes[inverse.reshape(-1)]
+
+    def _finish_npz(self):
+        """Chép các cột đã đệm vào file .npz"""
+        with zipfile.ZipFile(self.output_path, "w", compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            for name in self.columns:
+                spool = self._spools[name]
+                dtype = self._dtypes.get(name, np.dtype(np.float64))
+                length = spool.tell() // dtype.itemsize
+                spool.seek(0)
+                self._write_member(archive, name, dtype, length, spool)
+
+            for name, table in self._values.items():
+                values = np.array(list(table), dtype=str)
+                self._write_member(archive, name + VALUES_SUFFIX, values.dtype, len(values),
+                                   io.BytesIO(values.tobytes()))
+
+    @staticmethod
+    def _write_member(archive: zipfile.ZipFile, name: str, dtype: np.dtype, length: int,
+                      source: BinaryIO):
+        """
+        Ghi một array .npy vào file nén mà không nạp cả cột vào bộ nhớ
+
+        Args:
+            archive: File .npz đang mở
+            name: Tên array
+            dtype: Kiểu dữ liệu
+            length: Số phần tử
+            source: Dữ liệu thô (C order), đọc từ vị trí hiện tại
+        """
+        header = {"descr": npy_format.dtype_to_descr(dtype),
+                  "fortran_order": False, "shape": (length,)}
+        with archive.open(name + ".npy", "w", force_zip64=True) as member:
+            npy_format.write_array_header_1_0(member, header)
+            shutil.copyfileobj(source, member)
+
+    def close(self):
+        """Hoàn tất file kết quả"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv_writer = None
+        elif self.format == ".npz":
+            try:
+                self._finish_npz()
+            finally:
+                for spool in self._spools.values():
+                    spool.close()
+                self._spools = {}
+
+        print(f"[Offline] Đã ghi {self.rows_written} dòng: {self.output_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
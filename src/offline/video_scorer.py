@@ -0,0 +1,110 @@
+"""
+Video Scorer - Chạy pipeline detection trên file video (headless)
+Xử lý nhanh nhất CPU cho phép, timestamp lấy theo frame index của video
+"""
+import cv2
+import time
+import numpy as np
+from typing import Dict, Optional
+
+from ..detection import FaceDetector
+from ..core.frame_analyzer import FrameAnalyzer
+from .result_writer import SCORE_COLUMNS
+
+
+class VideoScorer:
+    """Chấm EAR/MAR/alert cho từng frame của video"""
+
+    # Các cột kết quả theo thứ tự ghi ra file
+    COLUMNS = SCORE_COLUMNS
+
+    def __init__(self, config_manager, face_detector: Optional[FaceDetector] = None):
+        """
+        Khởi tạo VideoScorer
+
+        Args:
+            config_manager: ConfigManager instance (chỉ đọc ngưỡng)
+            face_detector: FaceDetector dùng lại giữa các video (None = tạo mới)
+        """
+        self.config = config_manager
+        self.face_detector = face_detector or FaceDetector.from_config(config_manager)
+
+    def score(self, video_path: str) -> Dict[str, np.ndarray]:
+        """
+        Chấm điểm toàn bộ frame của một video
+
+        Args:
+            video_path: Đường dẫn file video
+
+        Returns:
+            Dict cột -> array (xem COLUMNS), kèm "stats" là dict thống kê
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Không mở được video: {video_path}")
+
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # Tracking (ROI + landmarks trong graph FaceMesh) của video trước
+        # không còn ý nghĩa: frame đầu phải detect lại từ đầu
+        self.face_detector.reset()
+
+        # MetricsProcessor mới cho mỗi video, FaceDetector dùng chung
+        analyzer = FrameAnalyzer(self.config, self.face_detector)
+
+        timestamps = []
+        faces = []
+        ears = []
+        mars = []
+        alerts = []
+
+        start_time = time.perf_counter()
+        try:
+            frame_index = 0
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                # Timestamp theo video, không theo đồng hồ thực
+                timestamp = frame_index / video_fps
+                _, _, analysis = analyzer.analyze(frame, timestamp)
+
+                timestamps.append(timestamp)
+                if analysis is not None:
+                    faces.append(True)
+                    ears.append(analysis["ear"])
+                    mars.append(analysis["mar"])
+                    alerts.append(analysis["alert_level"].value)
+                else:
+                    faces.append(False)
+                    ears.append(np.nan)
+                    mars.append(np.nan)
+                    alerts.append(-1)
+
+                frame_index += 1
+        finally:
+            cap.release()
+
+        elapsed = time.perf_counter() - start_time
+        num_frames = len(timestamps)
+
+        return {
+            "video": np.full(num_frames, video_path),
+            "frame": np.arange(num_frames, dtype=np.int32),
+            "timestamp": np.asarray(timestamps, dtype=np.float64),
+            "face": np.asarray(faces, dtype=bool),
+            "ear": np.asarray(ears, dtype=np.float32),
+            "mar": np.asarray(mars, dtype=np.float32),
+            "alert": np.asarray(alerts, dtype=np.int8),
+            "stats": {
+                "video": video_path,
+                "frames": num_frames,
+                "seconds": elapsed,
+                "fps": num_frames / elapsed if elapsed > 0 else 0.0
+            }
+        }
+
+    def release(self):
+        """Giải phóng FaceDetector"""
+        if self.face_detector:
+            self.face_detector.release()
@@ -0,0 +1,85 @@
+"""
+Cấu hình pytest - cho phép import package src khi chạy `pytest` từ thư mục gốc
+"""
+import json
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config_manager import ConfigManager  # noqa: E402
+
+
+@pytest.fixture
+def settings() -> dict:
+    """Nội dung settings.json cho config_manager (module test override khi cần)"""
+    return {
+        "thresholds": {"ear": 0.25, "mar": 0.6, "blink": 0.25, "yawn": 0.65},
+        "consecutive_frames": {"drowsiness": 20, "yawn": 20, "blink": 3},
+        "durations": {"drowsiness": None, "yawn": None},
+        "camera": {"fps": 30},
+    }
+
+
+@pytest.fixture
+def config_manager(tmp_path, settings):
+    """ConfigManager đọc settings từ file tạm, đóng writer thread sau test"""
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps(settings), encoding="utf-8")
+    manager = ConfigManager(str(path))
+    yield manager
+    manager.close()
+
+
+def face_results(*faces: np.ndarray):
+    """
+    Kết quả giống MediaPipe từ tọa độ chuẩn hóa
+
+    Args:
+        faces: Mỗi mặt một array (N, 2) tọa độ chuẩn hóa
+
+    Returns:
+        Object có multi_face_landmarks (None nếu không có mặt)
+    """
+    landmarks = [
+        types.SimpleNamespace(landmark=[
+            types.SimpleNamespace(x=float(x), y=float(y), z=0.0) for x, y in face])
+        for face in faces
+    ]
+    return types.SimpleNamespace(multi_face_landmarks=landmarks or None)
+
+
+class FakeFaceMesh:
+    """FaceMesh giả: kết quả do respond(rgb_frame) quyết định, ghi lại input"""
+
+    created = []
+    respond = staticmethod(lambda rgb_frame: face_results())
+
+    def __init__(self, **options):
+        self.options = options
+        self.inputs = []
+        self.closed = False
+        FakeFaceMesh.created.append(self)
+
+    def process(self, rgb_frame):
+        self.inputs.append(rgb_frame.shape)
+        return FakeFaceMesh.respond(rgb_frame)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_face_mesh(monkeypatch):
+    """Thay mp.solutions.face_mesh.FaceMesh bằng FakeFaceMesh (cần mediapipe)"""
+    pytest.importorskip("mediapipe")
+    from src.detection import face_detector
+
+    monkeypatch.setattr(FakeFaceMesh, "created", [])
+    monkeypatch.setattr(FakeFaceMesh, "respond", staticmethod(lambda rgb_frame: face_results()))
+    monkeypatch.setattr(face_detector.mp.solutions.face_mesh, "FaceMesh", FakeFaceMesh)
+    return FakeFaceMesh
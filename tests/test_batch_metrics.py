@@ -0,0 +1,66 @@
+"""
+Test API tính EAR/MAR theo lô - phải khớp hàm tính từng frame
+"""
+import numpy as np
+import pytest
+
+from src.detection.landmark_layout import LandmarkLayout
+from src.detection.metrics_processor import MetricsProcessor
+
+
+def random_faces(count: int, num_points: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 640, (count, num_points, 2)).astype(np.float32)
+
+
+@pytest.fixture
+def processor(config_manager):
+    return MetricsProcessor(config_manager)
+
+
+@pytest.mark.parametrize("num_points", [20, LandmarkLayout.NUM_LANDMARKS])
+def test_batch_matches_scalar(processor, num_points):
+    faces = random_faces(50, num_points)
+    left, right, mouths = LandmarkLayout.split_landmarks_batch(faces)
+    ears, mars = MetricsProcessor.calculate_batch(left, right, mouths)
+
+    for i, face in enumerate(faces):
+        left_eye, right_eye = LandmarkLayout.get_eye_landmarks(face)
+        mouth = LandmarkLayout.get_mouth_landmarks(face)
+        expected_ear = (processor.calculate_ear(left_eye) + processor.calculate_ear(right_eye)) / 2
+        assert ears[i] == pytest.approx(expected_ear, rel=1e-5)
+        assert mars[i] == pytest.approx(processor.calculate_mar(mouth), rel=1e-5)
+
+
+def test_zero_width_gives_zero():
+    eyes = np.zeros((2, 6, 2), dtype=np.float32)
+    eyes[1, [1, 2], 1] = 5.0  # Có chiều cao nhưng chiều ngang bằng 0
+    mouths = np.zeros((2, 8, 2), dtype=np.float32)
+
+    np.testing.assert_array_equal(MetricsProcessor.calculate_ear_batch(eyes), [0.0, 0.0])
+    np.testing.assert_array_equal(MetricsProcessor.calculate_mar_batch(mouths), [0.0, 0.0])
+
+
+def test_empty_batch():
+    ears, mars = MetricsProcessor.calculate_batch(
+        np.empty((0, 6, 2)), np.empty((0, 6, 2)), np.empty((0, 8, 2)))
+    assert ears.shape == (0,) and mars.shape == (0,)
+
+
+def test_key_subset_split_is_a_view():
+    faces = random_faces(3)
+    left, right, mouths = LandmarkLayout.split_landmarks_batch(faces)
+    assert left.shape == (3, 6, 2) and mouths.shape == (3, 8, 2)
+    assert np.shares_memory(left, faces) and np.shares_memory(mouths, faces)
+
+
+def test_batch_then_smoothing_matches_process_metrics(config_manager):
+    faces = random_faces(12, seed=3)
+    left, right, mouths = LandmarkLayout.split_landmarks_batch(faces)
+    ears, mars = MetricsProcessor.calculate_batch(left, right, mouths)
+
+    batched = MetricsProcessor(config_manager)
+    per_frame = MetricsProcessor(config_manager)
+    for i in range(len(faces)):
+        expected = per_frame.process_metrics(left[i], right[i], mouths[i])
+        assert batched.smooth_metrics(ears[i], mars[i]) == pytest.approx(expected, rel=1e-5)
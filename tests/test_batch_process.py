@@ -0,0 +1,72 @@
+"""
+Test batch_process - chấm điểm tuần tự, video lỗi không dừng cả batch
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+import batch_process
+
+
+class FakeScorer:
+    """VideoScorer giả: số frame theo tên file, "bad" thì lỗi"""
+
+    COLUMNS = batch_process.VideoScorer.COLUMNS
+    released = False
+
+    def __init__(self, config_manager):
+        self.config = config_manager
+
+    def score(self, video_path: str) -> dict:
+        if "bad" in video_path:
+            raise IOError(f"Không mở được video: {video_path}")
+        num_frames = len(video_path)
+        return {
+            "video": np.full(num_frames, video_path),
+            "frame": np.arange(num_frames, dtype=np.int32),
+            "timestamp": np.arange(num_frames, dtype=np.float64) / 30.0,
+            "face": np.ones(num_frames, dtype=bool),
+            "ear": np.full(num_frames, 0.3, dtype=np.float32),
+            "mar": np.full(num_frames, 0.1, dtype=np.float32),
+            "alert": np.zeros(num_frames, dtype=np.int8),
+            "stats": {"video": video_path, "frames": num_frames, "seconds": 1.0,
+                      "fps": float(num_frames)},
+        }
+
+    def release(self):
+        FakeScorer.released = True
+
+
+@pytest.fixture
+def fake_scorer(monkeypatch):
+    monkeypatch.setattr(FakeScorer, "released", False)
+    monkeypatch.setattr(batch_process, "VideoScorer", FakeScorer)
+    return FakeScorer
+
+
+def test_sequential_batch_skips_failed_video(tmp_path, config_manager, fake_scorer):
+    output = tmp_path / "scores.npz"
+    code = batch_process.main(["a.mp4", "bad.mp4", "clip.mp4", "-o", str(output),
+                               "-c", config_manager.config_path])
+
+    assert code == 1
+    assert fake_scorer.released
+    data = np.load(str(output))
+    assert data["video_values"].tolist() == ["a.mp4", "clip.mp4"]
+    assert len(data["frame"]) == len("a.mp4") + len("clip.mp4")
+
+
+def test_sequential_batch_csv(tmp_path, config_manager, fake_scorer):
+    output = tmp_path / "scores.csv"
+    code = batch_process.main(["a.mp4", "-o", str(output), "-c", config_manager.config_path])
+
+    assert code == 0
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(FakeScorer.COLUMNS)
+    assert len(lines) == 1 + len("a.mp4")
+
+
+def test_negative_workers_rejected():
+    with pytest.raises(SystemExit):
+        batch_process.parse_args(["a.mp4", "--workers", "-1"])
@@ -0,0 +1,61 @@
+"""
+Test benchmark - percentile, và đánh dấu kết quả không hợp lệ khi không thấy mặt
+"""
+import types
+
+import numpy as np
+import pytest
+
+from conftest import face_results
+
+pytest.importorskip("mediapipe")
+
+import benchmark
+from src.detection.face_detector import FaceDetector
+
+
+@pytest.fixture
+def detector(fake_face_mesh):
+    detector = FaceDetector(mesh_level="lite")
+    yield detector
+    detector.release()
+
+
+def run(detector, config_manager):
+    args = types.SimpleNamespace(warmup=2, iterations=5)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (240, 320, 3), dtype=np.uint8) for _ in range(2)]
+    return benchmark.run_resolution((320, 240), frames, detector, config_manager,
+                                    benchmark.make_synthetic_results(rng), args)
+
+
+def test_summarize_percentiles():
+    summary = benchmark.summarize(list(range(1, 101)))
+    assert summary["n"] == 100
+    assert summary["mean_ms"] == pytest.approx(50.5)
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert benchmark.summarize([]) == {"n": 0}
+
+
+def test_no_face_marks_model_stages_invalid(detector, config_manager, capsys):
+    result = run(detector, config_manager)
+
+    assert result["face_found_ratio"] == 0.0
+    assert result["end_to_end"]["valid"] is False
+    assert result["stages"]["process"]["valid"] is False
+    assert "không hợp lệ" in capsys.readouterr().out
+    # Các stage sau detection vẫn đo trên landmarks tổng hợp
+    assert result["stages"]["process_metrics"]["n"] == 5
+    assert result["end_to_end"]["n"] == 5
+
+
+def test_found_face_is_valid(detector, config_manager, fake_face_mesh):
+    face = np.random.default_rng(1).uniform(0.3, 0.7, (FaceDetector.NUM_LANDMARKS, 2))
+    fake_face_mesh.respond = staticmethod(lambda rgb_frame: face_results(face))
+
+    result = run(detector, config_manager)
+
+    assert result["face_found_ratio"] == 1.0
+    assert result["end_to_end"]["valid"] is True
+    assert result["stages"]["process"]["valid"] is True
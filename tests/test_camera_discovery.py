@@ -0,0 +1,156 @@
+"""
+Test CameraDiscovery - thử song song theo thứ tự ưu tiên, cache camera tốt gần nhất
+"""
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.core import camera_discovery
+from src.core.camera_discovery import CameraDiscovery, CameraInfo
+
+MODE = (640, 480, 30.0)
+
+
+class FakeCapture:
+    """
+    cv2.VideoCapture giả: cameras[index] = {"mode": (w, h, fps)} cùng
+    "frames": False (mở được nhưng không đọc được), "delay": giây treo khi mở
+    """
+
+    cameras = {}
+    opened = []
+    released = []
+    lock = threading.Lock()
+
+    def __init__(self, index, api=None):
+        self.index = index
+        self.spec = FakeCapture.cameras.get(index)
+        with FakeCapture.lock:
+            FakeCapture.opened.append(index)
+        if self.spec and self.spec.get("delay"):
+            time.sleep(self.spec["delay"])
+
+    def isOpened(self):
+        return self.spec is not None
+
+    def set(self, prop, value):
+        # Camera tự chọn mode gần nhất, không nhất thiết là mode yêu cầu
+        return True
+
+    def read(self):
+        if not self.spec.get("frames", True):
+            return False, None
+        width, height, _ = self.spec["mode"]
+        return True, np.zeros((height, width, 3), dtype=np.uint8)
+
+    def get(self, prop):
+        return self.spec["mode"][2]
+
+    def getBackendName(self):
+        return "FAKE"
+
+    def release(self):
+        with FakeCapture.lock:
+            FakeCapture.released.append(self.index)
+
+
+@pytest.fixture
+def cameras(monkeypatch):
+    monkeypatch.setattr(FakeCapture, "cameras", {})
+    monkeypatch.setattr(FakeCapture, "opened", [])
+    monkeypatch.setattr(FakeCapture, "released", [])
+    monkeypatch.setattr(camera_discovery.cv2, "VideoCapture", FakeCapture)
+    return FakeCapture
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "camera_cache.json")
+
+
+def test_configured_camera_is_chosen_and_cached(cameras, cache_path):
+    cameras.cameras = {0: {"mode": (1280, 720, 30.0)}, 1: {"mode": MODE}}
+    cap, frame, info = CameraDiscovery(cache_path, candidates=[0, 1]).open(0, *MODE)
+
+    assert info == CameraInfo(0, "FAKE", 1280, 720, 30.0)
+    assert frame.shape == (720, 1280, 3)
+    assert cameras.released == [1]
+
+    with open(cache_path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["version"] == CameraDiscovery.CACHE_VERSION
+    assert data["requested"] == 0
+    assert data["requested_mode"] == list(MODE)
+    assert data["camera"]["width"] == 1280
+
+
+def test_fallback_prefers_lower_position(cameras, cache_path):
+    cameras.cameras = {1: {"mode": MODE}, 2: {"mode": MODE}, 3: {"mode": MODE, "frames": False}}
+    _, _, info = CameraDiscovery(cache_path, candidates=[3, 1, 2]).open(0, *MODE)
+
+    # 0 không có, 3 không đọc được frame -> 1 (trước 2 trong danh sách)
+    assert info.index == 1
+    # Mọi capture khác (kể cả không mở được) đều được release
+    assert sorted(cameras.released) == [0, 2, 3]
+
+
+def test_cached_camera_opened_alone(cameras, cache_path):
+    cameras.cameras = {2: {"mode": MODE}}
+    CameraDiscovery(cache_path, candidates=[0, 1, 2]).open(0, *MODE)
+
+    cameras.opened.clear()
+    _, _, info = CameraDiscovery(cache_path, candidates=[0, 1, 2]).open(0, *MODE)
+    assert info.index == 2
+    assert cameras.opened == [2]
+
+
+def test_cache_ignores_old_mode_when_request_changes(cameras, cache_path):
+    discovery = CameraDiscovery(cache_path)
+    discovery.save_cache(0, CameraInfo(2, "FAKE", 1280, 720, 30.0), MODE)
+
+    assert discovery.load_cache(0, MODE).width == 1280
+    changed = discovery.load_cache(0, (320, 240, 15.0))
+    assert (changed.index, changed.width, changed.height, changed.fps) == (2, 320, 240, 15.0)
+    # Cache của index cấu hình khác
+    assert discovery.load_cache(1, MODE) is None
+
+
+def test_unusable_cache_falls_back_to_probe(cameras, cache_path):
+    discovery = CameraDiscovery(cache_path, candidates=[0, 1, 2])
+    discovery.save_cache(0, CameraInfo(2, "FAKE", *MODE), MODE)
+    cameras.cameras = {1: {"mode": MODE}}
+
+    _, _, info = discovery.open(0, *MODE)
+    assert info.index == 1
+    # Camera đã cache chỉ thử một lần
+    assert cameras.opened.count(2) == 1
+    assert discovery.load_cache(0, MODE).index == 1
+
+
+@pytest.mark.parametrize("content", ["not json", json.dumps({"version": 1, "requested": 0})])
+def test_invalid_cache_ignored(cameras, cache_path, content):
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    assert CameraDiscovery(cache_path).load_cache(0, MODE) is None
+
+
+def test_hanging_probe_does_not_block(cameras, cache_path):
+    cameras.cameras = {0: {"mode": MODE, "delay": 0.5}, 1: {"mode": MODE}}
+    start = time.perf_counter()
+    _, _, info = CameraDiscovery(cache_path, candidates=[1], timeout=0.1).open(0, *MODE)
+
+    assert time.perf_counter() - start < 0.4
+    assert info.index == 1
+    # Camera 0 mở xong muộn -> tự release
+    deadline = time.monotonic() + 2.0
+    while 0 not in cameras.released and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 0 in cameras.released
+
+
+def test_no_camera_raises(cameras, cache_path):
+    with pytest.raises(IOError):
+        CameraDiscovery(cache_path, candidates=[1, 2]).open(0, *MODE)
@@ -0,0 +1,53 @@
+"""
+Test ConfigManager - set() không được sửa DEFAULT_CONFIG dùng chung
+"""
+import copy
+import json
+
+import pytest
+
+from src.config.config_manager import ConfigManager
+
+
+@pytest.fixture
+def defaults():
+    """Bản sao DEFAULT_CONFIG trước test để so sánh"""
+    return copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+
+
+def test_set_on_missing_file_leaves_defaults(tmp_path, defaults):
+    manager = ConfigManager(str(tmp_path / "settings.json"))
+    manager.set_many({"thresholds.ear": 0.1, "camera.index": 3})
+    manager.close()
+
+    assert ConfigManager.DEFAULT_CONFIG == defaults
+
+
+def test_set_on_loaded_file_leaves_defaults(tmp_path, defaults):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"camera": {"index": 1}}), encoding="utf-8")
+    manager = ConfigManager(str(path))
+    # Section không có trong file -> lấy từ mặc định
+    manager.set("thresholds.mar", 0.9)
+    manager.close()
+
+    assert ConfigManager.DEFAULT_CONFIG == defaults
+
+
+def test_reset_to_defaults_gives_independent_copy(tmp_path, defaults):
+    manager = ConfigManager(str(tmp_path / "settings.json"))
+    manager.reset_to_defaults()
+    manager.set("thresholds.ear", 0.1)
+
+    other = ConfigManager(str(tmp_path / "other.json"))
+    assert other.get("thresholds.ear") == defaults["thresholds"]["ear"]
+    assert ConfigManager.DEFAULT_CONFIG == defaults
+    manager.close()
+    other.close()
+
+
+def test_get_all_is_a_copy(tmp_path):
+    manager = ConfigManager(str(tmp_path / "settings.json"))
+    manager.get_all()["thresholds"]["ear"] = 0.01
+    assert manager.get("thresholds.ear") != 0.01
+    manager.close()
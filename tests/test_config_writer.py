@@ -0,0 +1,116 @@
+"""
+Test write_json_atomic và ConfigWriter - ghi nguyên tử, debounce, ghi lại sau lỗi
+"""
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from src.config import config_writer
+from src.config.config_writer import ConfigWriter, write_json_atomic
+
+
+def leftovers(directory) -> list:
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_atomic_write_content_and_no_temp_files(tmp_path):
+    path = tmp_path / "settings.json"
+    write_json_atomic(str(path), {"thresholds": {"ear": 0.2}, "name": "tài xế"})
+    assert json.loads(path.read_text(encoding="utf-8")) == {
+        "thresholds": {"ear": 0.2}, "name": "tài xế"}
+    assert leftovers(tmp_path) == []
+
+
+def test_atomic_write_keeps_existing_mode(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+    write_json_atomic(str(path), {"a": 1})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_new_file_follows_umask(tmp_path):
+    path = tmp_path / "settings.json"
+    write_json_atomic(str(path), {"a": 1})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~config_writer._UMASK
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / "settings.json"
+    write_json_atomic(str(path), {"a": 1})
+    with pytest.raises(TypeError):
+        write_json_atomic(str(path), {"a": object()})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert leftovers(tmp_path) == []
+
+
+def test_requests_are_coalesced(tmp_path):
+    path = tmp_path / "settings.json"
+    state = {"count": 0}
+    writer = ConfigWriter(str(path), lambda: dict(state), delay=0.1)
+    writer.start()
+    for i in range(50):
+        state["count"] = i
+        writer.request()
+
+    assert wait_for(lambda: writer.writes == 1)
+    time.sleep(0.2)
+    assert writer.writes == 1
+    assert writer.requests == 50
+    assert json.loads(path.read_text(encoding="utf-8")) == {"count": 49}
+    writer.stop()
+
+
+def test_flush_and_stop_write_immediately(tmp_path):
+    path = tmp_path / "settings.json"
+    state = {"value": 1}
+    writer = ConfigWriter(str(path), lambda: dict(state), delay=60.0)
+    writer.start()
+
+    writer.request()
+    assert writer.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"value": 1}
+    # Không có yêu cầu mới -> không ghi lại
+    assert writer.flush()
+    assert writer.writes == 1
+
+    state["value"] = 2
+    writer.request()
+    writer.stop()
+    assert not writer.is_alive()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"value": 2}
+
+
+def test_failed_write_is_retried(tmp_path):
+    directory = tmp_path / "config"
+    writer = ConfigWriter(str(directory / "settings.json"), lambda: {"a": 1}, delay=60.0)
+    writer.request()
+
+    assert not writer.flush()  # Thư mục chưa tồn tại
+    assert writer.error is not None
+
+    directory.mkdir()
+    assert writer.flush()
+    assert writer.error is None
+    assert writer.writes == 1
+
+
+def test_config_manager_request_save(config_manager):
+    config_manager.set("thresholds.ear", 0.18)
+    config_manager.request_save()
+    config_manager.close()
+
+    with open(config_manager.config_path, encoding="utf-8") as f:
+        assert json.load(f)["thresholds"]["ear"] == 0.18
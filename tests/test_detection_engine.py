@@ -0,0 +1,128 @@
+"""
+Test vòng đời phiên của DetectionEngine (không mở camera, không FaceMesh)
+"""
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("mediapipe")
+pytest.importorskip("pygame")
+
+from src.core.detection_engine import DetectionEngine
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def engine(config_manager, monkeypatch):
+    """
+    Engine với _initialize/_close_cameras đếm số lần gọi; mỗi phiên chạy
+    session_body() rồi tự pause() (trừ khi pause_after=False - phiên "lỗi")
+    """
+    engine = DetectionEngine(config_manager)
+    engine.session_done = threading.Event()
+    engine.session_body = lambda: None
+    engine.pause_after = True
+    engine.calls = {"initialize": 0, "close_cameras": 0}
+
+    def fake_initialize():
+        engine.calls["initialize"] += 1
+        engine.analyzer = FakeAnalyzer()
+
+    def fake_session():
+        engine.session_body()
+        if engine.pause_after:
+            engine.pause()
+
+    def fake_close_cameras():
+        engine.calls["close_cameras"] += 1
+
+    original_end = engine._end_session
+
+    def end_session():
+        original_end()
+        engine.session_done.set()
+
+    monkeypatch.setattr(engine, "_initialize", fake_initialize)
+    monkeypatch.setattr(engine, "_run_camera", fake_session)
+    monkeypatch.setattr(engine, "_close_cameras", fake_close_cameras)
+    monkeypatch.setattr(engine, "_end_session", end_session)
+    yield engine
+    engine.stop()
+
+
+def run_session(engine):
+    engine.session_done.clear()
+    engine.resume()
+    assert engine.session_done.wait(timeout=5.0)
+
+
+def test_stage_timings_are_reset_at_session_start(engine):
+    counts = []
+
+    def body():
+        engine.stage_timer.record("total", 0.01)
+        counts.append(engine.get_timing_snapshot()["total"]["count"])
+
+    engine.session_body = body
+    run_session(engine)
+    run_session(engine)
+
+    # Phiên thứ hai không cộng dồn mẫu của phiên trước
+    assert counts == [1, 1]
+
+
+def test_sessions_reuse_one_initialized_engine(engine):
+    for _ in range(3):
+        run_session(engine)
+
+    assert engine.calls["initialize"] == 1
+    assert engine.isRunning()
+    assert not engine.is_active
+    # Mỗi phiên reset trạng thái metrics/cảnh báo
+    assert engine.analyzer.resets == 3
+
+
+def test_pause_closes_camera_unless_keep_warm(engine):
+    run_session(engine)
+    assert engine.calls["close_cameras"] == 1
+
+    engine.keep_camera_warm = True
+    run_session(engine)
+    assert engine.calls["close_cameras"] == 1
+
+
+def test_failed_session_pauses_and_closes_camera(engine):
+    engine.keep_camera_warm = True
+    engine.pause_after = False  # Phiên kết thúc mà không ai gọi pause()
+    run_session(engine)
+
+    assert engine._paused
+    assert engine.calls["close_cameras"] == 1
+
+    # Vẫn resume được sau lỗi
+    engine.pause_after = True
+    run_session(engine)
+    assert engine.calls["initialize"] == 1
+
+
+def test_resume_after_stop_reports_error(engine):
+    run_session(engine)
+    engine.stop()
+    assert not engine.isRunning()
+
+    events = []
+    engine.running_changed.connect(lambda running: events.append(("running", running)))
+    engine.error_occurred.connect(lambda error: events.append(("error", error)))
+    engine.resume()
+
+    assert events[0] == ("running", False)
+    assert events[1][0] == "error"
+    assert not engine.isRunning()
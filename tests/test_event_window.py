@@ -0,0 +1,63 @@
+"""
+Test SlidingWindowCounter - đếm sự kiện trong nhiều cửa sổ thời gian trượt
+"""
+import pytest
+
+from src.detection.event_window import SlidingWindowCounter
+
+
+@pytest.mark.parametrize("windows", [(), (0, 60), (-5,)])
+def test_invalid_windows_rejected(windows):
+    with pytest.raises(ValueError):
+        SlidingWindowCounter(windows)
+
+
+def test_windows_sorted_and_deduplicated():
+    counter = SlidingWindowCounter((60, 10, 60))
+    assert counter.windows == (10, 60)
+
+
+def test_counts_per_window():
+    counter = SlidingWindowCounter((10, 60))
+    for timestamp in (0.0, 5.0, 30.0, 55.0):
+        counter.add(timestamp)
+
+    assert counter.counts(58.0) == {10: 1, 60: 4}
+    assert counter.count(10, 58.0) == 1
+    assert counter.total == 4
+    assert counter.last_time == 55.0
+
+
+def test_window_is_half_open():
+    # Cửa sổ (now - window, now]: sự kiện đúng ở mép trái đã hết hạn
+    counter = SlidingWindowCounter((10,))
+    counter.add(0.0)
+    assert counter.count(10, 9.999) == 1
+    assert counter.count(10, 10.0) == 0
+
+
+def test_high_rate_is_not_undercounted():
+    counter = SlidingWindowCounter((60,))
+    for i in range(1000):
+        counter.add(i * 0.05)
+    # 1000 sự kiện trong 50 giây, tất cả còn trong cửa sổ 60 giây
+    assert counter.count(60, 50.0) == 1000
+    assert len(counter) == 1000
+
+
+def test_expired_events_are_evicted_on_add():
+    counter = SlidingWindowCounter((10, 60))
+    for timestamp in range(0, 100, 5):
+        counter.add(float(timestamp))
+    # Tính tới lần thêm cuối (95): cửa sổ 60 giây giữ (35, 95]
+    assert len(counter) == 12
+    assert counter.total == 20
+
+
+def test_clear():
+    counter = SlidingWindowCounter((10,))
+    counter.add(1.0)
+    counter.clear()
+    assert counter.counts(2.0) == {10: 0}
+    assert counter.total == 0
+    assert counter.last_time is None
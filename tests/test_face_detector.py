@@ -0,0 +1,176 @@
+"""
+Test FaceDetector - trích xuất landmarks vào buffer float32, ROI tracking
+"""
+import numpy as np
+import pytest
+
+from conftest import face_results
+
+pytest.importorskip("mediapipe")
+
+from src.detection.face_detector import FaceDetector
+
+FRAME_SHAPE = (480, 640)
+
+
+def make_face(seed: int = 0, num_points: int = FaceDetector.NUM_LANDMARKS) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.2, 0.8, (num_points, 2))
+
+
+def expected_pixels(face: np.ndarray, indices=None) -> np.ndarray:
+    """Cách tính cũ: từng điểm (x * w, y * h)"""
+    h, w = FRAME_SHAPE
+    points = face if indices is None else face[list(indices)]
+    return np.array([(x * w, y * h) for x, y in points], dtype=np.float32)
+
+
+@pytest.fixture
+def detector(fake_face_mesh):
+    detector = FaceDetector(mesh_level="lite")
+    yield detector
+    detector.release()
+
+
+def test_full_landmarks_match_per_point_conversion(detector):
+    face = make_face()
+    landmarks = detector.get_landmarks(face_results(face), FRAME_SHAPE)
+
+    assert landmarks.dtype == np.float32
+    assert landmarks.shape == (FaceDetector.NUM_LANDMARKS, 2)
+    np.testing.assert_allclose(landmarks, expected_pixels(face), rtol=1e-6)
+
+
+def test_key_landmarks_follow_key_indices(detector):
+    face = make_face()
+    landmarks = detector.get_landmarks(face_results(face), FRAME_SHAPE, key_only=True)
+
+    assert landmarks.shape == (len(FaceDetector.KEY_INDICES), 2)
+    np.testing.assert_allclose(
+        landmarks, expected_pixels(face, FaceDetector.KEY_INDICES), rtol=1e-6)
+
+
+def test_buffers_are_reused_between_frames(detector):
+    first = detector.get_landmarks(face_results(make_face(0)), FRAME_SHAPE)
+    second = detector.get_landmarks(face_results(make_face(1)), FRAME_SHAPE)
+    assert second is first
+    np.testing.assert_allclose(second, expected_pixels(make_face(1)), rtol=1e-6)
+
+    key = detector.get_landmarks(face_results(make_face(0)), FRAME_SHAPE, key_only=True)
+    assert detector.get_landmarks(face_results(make_face(1)), FRAME_SHAPE, key_only=True) is key
+
+
+def test_mesh_without_iris_points(detector):
+    face = make_face(num_points=468)
+    landmarks = detector.get_landmarks(face_results(face), FRAME_SHAPE)
+    assert landmarks.shape == (468, 2)
+    np.testing.assert_allclose(landmarks, expected_pixels(face), rtol=1e-6)
+
+
+def test_no_face_or_missing_index(detector):
+    assert detector.get_landmarks(face_results(), FRAME_SHAPE) is None
+    assert detector.get_landmarks(face_results(make_face()), FRAME_SHAPE, face_index=1) is None
+    assert detector.get_all_landmarks(face_results(), FRAME_SHAPE) is None
+
+
+def test_all_faces_in_one_batch(detector):
+    faces = [make_face(0), make_face(1)]
+    batch = detector.get_all_landmarks(face_results(*faces), FRAME_SHAPE)
+
+    assert batch.shape == (2, len(FaceDetector.KEY_INDICES), 2)
+    for landmarks, face in zip(batch, faces):
+        np.testing.assert_allclose(
+            landmarks, expected_pixels(face, FaceDetector.KEY_INDICES), rtol=1e-6)
+
+
+def test_mesh_points_follow_renderer_indices(detector):
+    face = make_face()
+    points = detector.get_mesh_points(face_results(face), FRAME_SHAPE)
+
+    indices = detector.mesh_renderer.point_indices
+    np.testing.assert_allclose(points, expected_pixels(face, indices.tolist()), rtol=1e-6)
+
+
+def bright_square_face(rgb_frame: np.ndarray):
+    """FaceMesh giả cho ROI: mặt là vùng sáng, landmarks nằm ở 4 góc bounding box"""
+    h, w = rgb_frame.shape[:2]
+    ys, xs = np.nonzero(rgb_frame[..., 0] > 200)
+    if len(xs) == 0:
+        return face_results()
+    corners = np.array([(xs.min(), ys.min()), (xs.max() + 1, ys.min()),
+                        (xs.min(), ys.max() + 1), (xs.max() + 1, ys.max() + 1)],
+                       dtype=np.float64) / (w, h)
+    return face_results(corners[np.arange(FaceDetector.NUM_LANDMARKS) % 4])
+
+
+def frame_with_face(x0: int, y0: int, size: int = 120) -> np.ndarray:
+    frame = np.zeros(FRAME_SHAPE + (3,), dtype=np.uint8)
+    frame[y0:y0 + size, x0:x0 + size] = 255
+    return frame
+
+
+def face_box(detector, results) -> tuple:
+    landmarks = detector.get_landmarks(results, FRAME_SHAPE)
+    (x0, y0), (x1, y1) = landmarks.min(axis=0), landmarks.max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
+
+
+@pytest.fixture
+def roi_detector(fake_face_mesh, monkeypatch):
+    monkeypatch.setattr(fake_face_mesh, "respond", staticmethod(bright_square_face))
+    detector = FaceDetector(roi_tracking=True, roi_margin=0.3, roi_max_size=1000)
+    yield detector
+    detector.release()
+
+
+def test_roi_crops_next_frame_and_maps_back(roi_detector):
+    mesh = roi_detector.face_mesh
+    frame = frame_with_face(200, 150)
+
+    results = roi_detector.process(frame)
+    assert face_box(roi_detector, results) == (200, 150, 320, 270)
+    x0, y0, x1, y1 = roi_detector._roi
+    assert x0 < 200 and y0 < 150 and x1 > 320 and y1 > 270
+
+    results = roi_detector.process(frame)
+    # Frame thứ hai chỉ đưa vùng ROI vào FaceMesh, tọa độ vẫn theo full frame
+    assert mesh.inputs == [FRAME_SHAPE + (3,), (y1 - y0, x1 - x0, 3)]
+    assert face_box(roi_detector, results) == (200, 150, 320, 270)
+
+
+def test_roi_kept_while_face_stays_inside(roi_detector):
+    roi_detector.process(frame_with_face(200, 150))
+    roi = roi_detector._roi
+    roi_detector.process(frame_with_face(205, 152))
+    assert roi_detector._roi == roi
+
+
+def test_lost_face_falls_back_to_full_frame(roi_detector):
+    mesh = roi_detector.face_mesh
+    roi_detector.process(frame_with_face(200, 150))
+
+    # Mặt nhảy ra ngoài ROI: cùng frame được detect lại trên full frame
+    results = roi_detector.process(frame_with_face(480, 20))
+    assert len(mesh.inputs) == 3
+    assert mesh.inputs[2] == FRAME_SHAPE + (3,)
+    assert face_box(roi_detector, results) == (480, 20, 600, 140)
+    assert roi_detector._roi[0] < 480
+
+
+def test_large_roi_is_downscaled(fake_face_mesh, monkeypatch):
+    monkeypatch.setattr(fake_face_mesh, "respond", staticmethod(bright_square_face))
+    detector = FaceDetector(roi_tracking=True, roi_max_size=64)
+    frame = frame_with_face(200, 150)
+    detector.process(frame)
+    results = detector.process(frame)
+
+    assert max(detector.face_mesh.inputs[1][:2]) == 64
+    # Thu nhỏ làm mờ biên - sai số vài pixel của full frame
+    np.testing.assert_allclose(face_box(detector, results), (200, 150, 320, 270), atol=4)
+    detector.release()
+
+
+def test_roi_disabled_with_several_faces(fake_face_mesh):
+    detector = FaceDetector(max_num_faces=2, roi_tracking=True)
+    assert not detector.roi_tracking
+    detector.release()
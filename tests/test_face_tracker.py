@@ -0,0 +1,90 @@
+"""
+Test FaceTracker - ghép khuôn mặt với track theo khoảng cách chuẩn hóa
+"""
+import numpy as np
+
+from src.detection.face_tracker import FaceTracker
+
+
+def make_face(cx: float, cy: float, size: float = 100.0) -> np.ndarray:
+    """20 key landmarks có tâm (cx, cy), hai khóe mắt ngoài cách nhau size"""
+    face = np.zeros((20, 2), dtype=np.float32)
+    left, right = FaceTracker.OUTER_EYE_CORNERS
+    face[left] = (size / 2, 0.0)
+    face[right] = (-size / 2, 0.0)
+    return face + np.array([cx, cy], dtype=np.float32)
+
+
+def batch(*faces) -> np.ndarray:
+    if not faces:
+        return np.empty((0, 20, 2), dtype=np.float32)
+    return np.stack(faces)
+
+
+def test_measure_center_and_size():
+    centers, sizes = FaceTracker.measure(batch(make_face(50, 60, 80)))
+    np.testing.assert_allclose(centers, [[50, 60]], atol=1e-4)
+    np.testing.assert_allclose(sizes, [80])
+
+
+def test_ids_follow_faces_when_order_changes():
+    tracker = FaceTracker()
+    ids, _ = tracker.update(batch(make_face(100, 100), make_face(400, 100)))
+    assert ids == [1, 2]
+
+    # Cùng hai mặt, dịch nhẹ, FaceMesh trả về theo thứ tự ngược lại
+    ids, removed = tracker.update(batch(make_face(410, 105), make_face(95, 98)))
+    assert ids == [2, 1]
+    assert removed == []
+
+
+def test_far_face_gets_new_id():
+    tracker = FaceTracker(max_distance=0.6)
+    tracker.update(batch(make_face(100, 100)))
+    # 70px với mặt 100px = 0.7 > max_distance
+    ids, _ = tracker.update(batch(make_face(170, 100)))
+    assert ids == [2]
+
+
+def test_distance_is_relative_to_face_size():
+    tracker = FaceTracker(max_distance=0.6)
+    tracker.update(batch(make_face(100, 100, size=200)))
+    # 70px với mặt 200px = 0.35: vẫn là cùng một người
+    ids, _ = tracker.update(batch(make_face(170, 100, size=200)))
+    assert ids == [1]
+
+
+def test_closest_pair_wins_greedy_matching():
+    tracker = FaceTracker(max_distance=1.0)
+    tracker.update(batch(make_face(100, 100), make_face(200, 100)))
+    # Mặt mới ở 190 gần track 2 hơn; mặt ở 120 về track 1
+    ids, _ = tracker.update(batch(make_face(190, 100), make_face(120, 100)))
+    assert ids == [2, 1]
+
+
+def test_track_survives_short_gap_then_is_removed():
+    tracker = FaceTracker(max_missed=2)
+    tracker.update(batch(make_face(100, 100)))
+
+    for _ in range(2):
+        ids, removed = tracker.update(batch())
+        assert ids == [] and removed == []
+        assert tracker.is_tracked(1)
+
+    # Quay lại trong max_missed frame -> giữ ID
+    ids, _ = tracker.update(batch(make_face(102, 100)))
+    assert ids == [1]
+
+    for _ in range(2):
+        tracker.update(batch())
+    ids, removed = tracker.update(batch())
+    assert removed == [1]
+    assert not tracker.is_tracked(1)
+
+
+def test_reset_restarts_ids():
+    tracker = FaceTracker()
+    tracker.update(batch(make_face(100, 100), make_face(400, 100)))
+    tracker.reset()
+    ids, _ = tracker.update(batch(make_face(400, 100)))
+    assert ids == [1]
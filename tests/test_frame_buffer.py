@@ -0,0 +1,96 @@
+"""
+Test FrameRingBuffer - latest-frame-wins, không ghi đè slot đang đọc
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.frame_buffer import FrameRingBuffer
+
+
+def make_frame(value: int) -> np.ndarray:
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_capacity_below_three_is_rejected():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(2)
+
+
+def test_reader_gets_latest_frame_and_counts_drops():
+    buffer = FrameRingBuffer(3)
+    buffer.allocate((4, 6, 3))
+    for value in range(5):
+        buffer.put(make_frame(value), timestamp=float(value))
+
+    frame, timestamp, seq = buffer.get_latest(timeout=0)
+    assert frame[0, 0, 0] == 4
+    assert timestamp == 4.0
+    assert seq == 4
+
+    stats = buffer.get_stats()
+    assert stats["frames_written"] == 5
+    assert stats["frames_processed"] == 1
+    assert stats["frames_dropped"] == 4
+
+
+def test_no_new_frame_returns_none():
+    buffer = FrameRingBuffer(3)
+    buffer.put(make_frame(1), 1.0)
+    assert buffer.get_latest(timeout=0) is not None
+    assert not buffer.has_new()
+    assert buffer.get_latest(timeout=0) is None
+
+
+def test_writer_never_overwrites_held_frame():
+    buffer = FrameRingBuffer(3)
+    buffer.allocate((4, 6, 3))
+    buffer.put(make_frame(1), 1.0)
+    held, _, _ = buffer.get_latest(timeout=0)
+
+    # Writer chạy nhiều vòng trong khi reader còn giữ frame
+    for value in range(2, 20):
+        index, slot = buffer.begin_write()
+        assert slot is not held
+        slot[...] = value
+        buffer.commit_write(index, slot, float(value))
+
+    assert held[0, 0, 0] == 1
+    frame, timestamp, _ = buffer.get_latest(timeout=0)
+    assert frame[0, 0, 0] == 19
+    assert timestamp == 19.0
+
+
+def test_frame_size_change_reallocates_slot():
+    buffer = FrameRingBuffer(3)
+    buffer.allocate((4, 6, 3))
+    buffer.put(np.full((8, 10, 3), 7, dtype=np.uint8), 1.0)
+    frame, _, _ = buffer.get_latest(timeout=0)
+    assert frame.shape == (8, 10, 3)
+    assert frame[0, 0, 0] == 7
+
+
+def test_close_wakes_waiting_reader_and_calls_on_commit():
+    buffer = FrameRingBuffer(3)
+    calls = []
+    buffer.on_commit = lambda: calls.append(True)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(buffer.get_latest(timeout=5)))
+    reader.start()
+    buffer.close()
+    reader.join(timeout=5)
+
+    assert not reader.is_alive()
+    assert results == [None]
+    assert buffer.is_closed()
+    assert calls == [True]
+
+
+def test_on_commit_called_for_each_frame():
+    buffer = FrameRingBuffer(3)
+    calls = []
+    buffer.on_commit = lambda: calls.append(True)
+    buffer.put(make_frame(1), 1.0)
+    buffer.put(make_frame(2), 2.0)
+    assert len(calls) == 2
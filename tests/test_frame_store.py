@@ -0,0 +1,178 @@
+"""
+Test DisplayFrameStore - double buffer giữa worker và GUI, tần số và scale hiển thị
+"""
+import cv2
+import numpy as np
+import pytest
+
+from src.core import frame_store
+from src.core.frame_store import DisplayFrameStore
+
+
+class FakeClock:
+    """time.monotonic giả, tiến thủ công"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(frame_store.time, "monotonic", fake)
+    return fake
+
+
+def make_frame(value: int = 0, width: int = 64, height: int = 48) -> np.ndarray:
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = value  # Kênh B
+    return frame
+
+
+def test_empty_store_reads_none():
+    store = DisplayFrameStore()
+    with store.read() as (frame, fps):
+        assert frame is None
+        assert fps == 0.0
+
+
+def test_publish_converts_to_rgb():
+    store = DisplayFrameStore()
+    store.publish(make_frame(200), 25.0)
+    with store.read() as (frame, fps):
+        assert frame.shape == (48, 64, 3)
+        assert (frame[..., 2] == 200).all() and (frame[..., 0] == 0).all()
+        assert fps == 25.0
+
+
+def test_notify_only_after_gui_consumed_frame():
+    store = DisplayFrameStore()
+    assert store.publish(make_frame(1), 30.0)
+    # GUI chưa đọc: thông báo trước vẫn đang chờ
+    assert not store.publish(make_frame(2), 30.0)
+    with store.read() as (frame, _):
+        assert frame[0, 0, 2] == 2
+    assert store.publish(make_frame(3), 30.0)
+    assert store.frames_published == 3
+
+
+def test_buffers_alternate_without_reallocation():
+    store = DisplayFrameStore()
+    store.publish(make_frame(1), 30.0)
+    with store.read() as (first, _):
+        pass
+    store.publish(make_frame(2), 30.0)
+    with store.read() as (second, _):
+        pass
+    store.publish(make_frame(3), 30.0)
+    with store.read() as (third, _):
+        pass
+
+    # Worker không ghi vào buffer GUI vừa nhận
+    assert second is not first
+    assert third is first
+    assert first[0, 0, 2] == 3
+
+
+def test_clear_drops_frames():
+    store = DisplayFrameStore()
+    store.publish(make_frame(1), 30.0)
+    store.clear()
+    with store.read() as (frame, _):
+        assert frame is None
+    assert store.publish(make_frame(2), 30.0)
+
+
+def displayed_frames(store, clock, camera_fps: float, seconds: float) -> int:
+    """Số frame được hiển thị khi camera chạy camera_fps trong seconds giây"""
+    shown = 0
+    rng = np.random.default_rng(0)
+    for i in range(int(camera_fps * seconds)):
+        # Thời điểm frame dao động ±3ms
+        clock.now = 100.0 + i / camera_fps + rng.uniform(-0.003, 0.003)
+        if store.wants_frame():
+            store.publish(make_frame(), camera_fps)
+            shown += 1
+    return shown
+
+
+@pytest.mark.parametrize("max_fps, expected", [(15, 150), (10, 100), (0, 300)])
+def test_display_rate_independent_of_camera(clock, max_fps, expected):
+    store = DisplayFrameStore(max_fps=max_fps)
+    assert displayed_frames(store, clock, camera_fps=30, seconds=10) == expected
+
+
+def test_suspended_store_wants_no_frames(clock):
+    store = DisplayFrameStore()
+    store.set_suspended(True)
+    assert not store.wants_frame()
+    store.set_suspended(False)
+    assert store.wants_frame()
+
+
+def test_schedule_restarts_after_long_gap(clock):
+    store = DisplayFrameStore(max_fps=10)
+    store.publish(make_frame(), 30.0)
+    clock.now += 5.0
+    assert store.wants_frame()
+    store.publish(make_frame(), 30.0)
+    # Không "đuổi" các chu kỳ đã lỡ
+    clock.now += 0.05
+    assert not store.wants_frame()
+
+
+def test_scaled_to_target_keeping_aspect_ratio():
+    store = DisplayFrameStore()
+    store.set_target_size(200, 200)
+    store.publish(make_frame(width=64, height=48), 30.0)
+    with store.read() as (frame, _):
+        assert frame.shape == (150, 200, 3)
+
+    store.set_target_size(0, 100)  # Kích thước không hợp lệ bị bỏ qua
+    store.publish(make_frame(width=64, height=48), 30.0)
+    with store.read() as (frame, _):
+        assert frame.shape == (150, 200, 3)
+
+
+@pytest.mark.parametrize("scaling, width, interpolation", [
+    ("fast", 32, cv2.INTER_NEAREST),
+    ("smooth", 32, cv2.INTER_AREA),
+    ("smooth", 128, cv2.INTER_LINEAR),
+])
+def test_scaling_quality(scaling, width, interpolation):
+    rng = np.random.default_rng(1)
+    source = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    size = (width, width * 3 // 4)
+
+    store = DisplayFrameStore(scaling=scaling)
+    store.set_target_size(*size)
+    store.publish(source, 30.0)
+
+    expected = cv2.cvtColor(cv2.resize(source, size, interpolation=interpolation),
+                            cv2.COLOR_BGR2RGB)
+    with store.read() as (frame, _):
+        np.testing.assert_array_equal(frame, expected)
+
+
+def test_draw_runs_at_display_resolution():
+    calls = []
+    store = DisplayFrameStore()
+    store.set_target_size(32, 24)
+    store.publish(make_frame(width=64, height=48), 30.0,
+                  draw=lambda image, scale: calls.append((image.shape, scale)))
+    assert calls == [((24, 32, 3), 0.5)]
+
+
+def test_invalid_scaling_and_config():
+    assert DisplayFrameStore(scaling="bicubic").scaling == "smooth"
+
+    class Config:
+        def get(self, path, default=None):
+            return {"display.max_fps": 20, "display.scaling": "fast"}.get(path, default)
+
+    store = DisplayFrameStore.from_config(Config())
+    assert store.scaling == "fast"
+    assert store.min_interval == pytest.approx(0.05)
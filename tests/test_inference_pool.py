@@ -0,0 +1,134 @@
+"""
+Test InferencePool - round-robin giữa các stream, một frame đang xử lý mỗi stream
+"""
+import numpy as np
+import pytest
+
+from src.core.frame_buffer import FrameRingBuffer
+from src.core.inference_pool import InferencePool, InferenceStream
+
+
+class FakeAnalyzer:
+    """Analyzer giả: trả lại giá trị pixel đầu tiên, lỗi nếu fail=True"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.frames = []
+
+    def analyze(self, frame, timestamp):
+        if self.fail:
+            raise RuntimeError("model lỗi")
+        self.frames.append(frame.copy())
+        return None, None, {"value": int(frame[0, 0, 0])}
+
+
+def make_frame(value: int) -> np.ndarray:
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    frame[0, 0] = value
+    return frame
+
+
+def make_stream(name: str, **kwargs) -> InferenceStream:
+    buffer = FrameRingBuffer(3)
+    buffer.allocate((4, 6, 3))
+    return InferenceStream(name, buffer, kwargs.pop("analyzer", FakeAnalyzer()),
+                           mirror=kwargs.pop("mirror", False))
+
+
+@pytest.fixture
+def pool_factory():
+    pools = []
+
+    def create(streams, workers=1):
+        pool = InferencePool(streams, workers)
+        pool.start()
+        pools.append(pool)
+        return pool
+
+    yield create
+    for pool in pools:
+        pool.stop()
+
+
+def test_streams_are_served_round_robin(pool_factory):
+    streams = [make_stream("a"), make_stream("b")]
+    pool = pool_factory(streams)
+    for stream in streams:
+        stream.frame_buffer.put(make_frame(1), 0.0)
+
+    order = []
+    for value in range(2, 8):
+        stream, _, _, output = pool.get_result(timeout=2.0)
+        order.append(stream.name)
+        # Luôn có frame mới ở cả hai stream: không stream nào chiếm worker
+        stream.frame_buffer.put(make_frame(value), 0.0)
+        pool.release(stream)
+
+    assert order in (["a", "b"] * 3, ["b", "a"] * 3)
+
+
+def test_one_frame_in_flight_per_stream(pool_factory):
+    stream = make_stream("a")
+    pool = pool_factory([stream], workers=2)
+    assert pool.worker_count == 1
+
+    stream.frame_buffer.put(make_frame(1), 0.0)
+    held = pool.get_result(timeout=2.0)
+    stream.frame_buffer.put(make_frame(2), 0.0)
+
+    # Chưa release -> frame mới chờ
+    assert pool.get_result(timeout=0.2) is None
+    assert held[3][2] == {"value": 1}
+
+    pool.release(stream)
+    _, _, _, output = pool.get_result(timeout=2.0)
+    assert output[2] == {"value": 2}
+    assert stream.stage_timer.snapshot()["total"]["count"] == 1
+
+
+def test_failing_analyzer_closes_only_its_stream(pool_factory):
+    bad = make_stream("bad", analyzer=FakeAnalyzer(fail=True))
+    good = make_stream("good")
+    pool = pool_factory([bad, good])
+
+    bad.frame_buffer.put(make_frame(1), 0.0)
+    stream, _, _, output = pool.get_result(timeout=2.0)
+    assert stream is bad and output is None
+    assert bad.closed and "model lỗi" in bad.error
+    pool.release(bad)
+
+    good.frame_buffer.put(make_frame(2), 0.0)
+    stream, _, _, output = pool.get_result(timeout=2.0)
+    assert stream is good and output[2] == {"value": 2}
+    assert pool.is_active()
+
+
+def test_closed_sources_end_the_pool(pool_factory):
+    streams = [make_stream("a"), make_stream("b")]
+    pool = pool_factory(streams)
+    for stream in streams:
+        stream.frame_buffer.close()
+
+    # Worker báo hết stream bằng None cho consumer đang chờ
+    assert pool.get_result(timeout=2.0) is None
+    assert not pool.is_active()
+
+
+def test_mirror_flips_before_analysis(pool_factory):
+    analyzer = FakeAnalyzer()
+    stream = make_stream("a", analyzer=analyzer, mirror=True)
+    pool = pool_factory([stream])
+
+    stream.frame_buffer.put(make_frame(9), 0.0)
+    pool.get_result(timeout=2.0)
+    assert analyzer.frames[0][0, -1, 0] == 9
+    assert analyzer.frames[0][0, 0, 0] == 0
+
+
+def test_stop_detaches_buffers():
+    stream = make_stream("a")
+    pool = InferencePool([stream])
+    pool.start()
+    assert stream.frame_buffer.on_commit is not None
+    pool.stop()
+    assert stream.frame_buffer.on_commit is None
@@ -0,0 +1,112 @@
+"""
+Test InferenceScheduler (khoảng cách inference) và LandmarkPredictor
+"""
+import numpy as np
+import pytest
+
+from src.core import inference_scheduler
+from src.core.inference_scheduler import InferenceScheduler, LandmarkPredictor
+
+
+@pytest.fixture
+def cpu_load(monkeypatch):
+    """Đặt load average giả (tính theo số CPU)"""
+    monkeypatch.setattr(inference_scheduler.os, "cpu_count", lambda: 4)
+
+    def set_pressure(pressure: float):
+        monkeypatch.setattr(inference_scheduler.os, "getloadavg",
+                            lambda: (pressure * 4, 0.0, 0.0))
+    set_pressure(0.0)
+    return set_pressure
+
+
+def make_scheduler(**kwargs) -> InferenceScheduler:
+    scheduler = InferenceScheduler(target_fps=30.0, **kwargs)
+    # Xa ngưỡng EAR để không bị ép N = 1
+    scheduler.observe(ear=0.35, ear_threshold=0.2)
+    return scheduler
+
+
+@pytest.mark.parametrize("latency_ms, expected", [
+    (10.0, 1),   # Nhanh hơn một chu kỳ frame (33ms)
+    (40.0, 2),   # Chiếm 2 chu kỳ
+    (70.0, 3),
+    (500.0, 3),  # Giới hạn max_interval
+])
+def test_interval_follows_latency(cpu_load, latency_ms, expected):
+    scheduler = make_scheduler(max_interval=3)
+    scheduler.record_inference(latency_ms / 1000.0)
+    assert scheduler.interval == expected
+
+
+def test_cpu_pressure_adds_one_frame(cpu_load):
+    cpu_load(1.5)
+    scheduler = make_scheduler(max_interval=3)
+    scheduler.record_inference(0.040)
+    assert scheduler.interval == 3
+    assert scheduler.get_stats()["cpu_pressure"] == pytest.approx(1.5)
+
+
+def test_latency_is_smoothed(cpu_load):
+    scheduler = make_scheduler(max_interval=5, smoothing=0.5)
+    scheduler.record_inference(0.010)
+    scheduler.record_inference(0.110)
+    # EWMA: 10 + 0.5 * (110 - 10) = 60ms -> 2 chu kỳ
+    assert scheduler.get_stats()["inference_ms"] == pytest.approx(60.0)
+    assert scheduler.interval == 2
+
+
+def test_should_infer_every_interval_frames(cpu_load):
+    scheduler = make_scheduler(max_interval=3)
+    scheduler.record_inference(0.070)
+    assert scheduler.interval == 3
+
+    decisions = []
+    for _ in range(6):
+        infer = scheduler.should_infer()
+        decisions.append(infer)
+        if infer:
+            scheduler.record_inference(0.070)
+    assert decisions == [False, False, True, False, False, True]
+
+
+def test_near_threshold_and_forced_inference(cpu_load):
+    scheduler = make_scheduler(max_interval=3)
+    scheduler.record_inference(0.070)
+
+    scheduler.observe(ear=0.22, ear_threshold=0.2)
+    assert scheduler.should_infer()
+
+    scheduler.observe(ear=0.35, ear_threshold=0.2)
+    assert not scheduler.should_infer()
+    scheduler.force_inference()
+    assert scheduler.should_infer()
+
+
+def test_zero_fps_disables_skipping(cpu_load):
+    scheduler = InferenceScheduler(target_fps=0.0)
+    scheduler.record_inference(1.0)
+    assert scheduler.interval == 1
+
+
+def test_predictor_extrapolates_linearly():
+    predictor = LandmarkPredictor(max_extrapolation=0.25)
+    assert predictor.predict(0.0) is None
+
+    predictor.update(np.array([[0.0, 0.0], [10.0, 10.0]]), 0.0)
+    predictor.update(np.array([[1.0, 2.0], [11.0, 12.0]]), 0.1)
+    predicted = predictor.predict(0.15)
+    np.testing.assert_allclose(predicted, [[1.5, 3.0], [11.5, 13.0]])
+
+
+def test_predictor_limits_and_reset():
+    predictor = LandmarkPredictor(max_extrapolation=0.25)
+    predictor.update(np.zeros((2, 2)), 1.0)
+    # Mới một lần inference: giữ nguyên landmarks
+    np.testing.assert_allclose(predictor.predict(1.1), np.zeros((2, 2)))
+    # Quá xa hoặc lùi thời gian
+    assert predictor.predict(1.3) is None
+    assert predictor.predict(0.9) is None
+
+    predictor.reset()
+    assert predictor.predict(1.1) is None
@@ -0,0 +1,141 @@
+"""
+Test LandmarkRecorder/LandmarkLog - ghi rồi đọc lại, file bị ngắt giữa bản ghi
+"""
+import struct
+
+import numpy as np
+import pytest
+
+from src.offline.landmark_log import HEADER_SIZE, LandmarkLog, LandmarkRecorder
+
+
+def make_landmarks(value: float, num_points: int = 20) -> np.ndarray:
+    return np.full((num_points, 2), value, dtype=np.float32)
+
+
+def record(path, frames, **kwargs):
+    """Ghi danh sách (timestamp, landmarks hoặc None) rồi đóng file"""
+    recorder = LandmarkRecorder(str(path), **kwargs)
+    for timestamp, landmarks in frames:
+        recorder.write(timestamp, landmarks)
+    recorder.close()
+    return recorder
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    recorder = record(path, [
+        (0.0, make_landmarks(1.0)),
+        (0.033, None),
+        (0.066, make_landmarks(3.0)),
+    ])
+    assert recorder.frames_written == 3
+    assert recorder.error is None
+
+    log = LandmarkLog(str(path))
+    assert len(log) == 3
+    assert log.num_points == 20
+    np.testing.assert_allclose(log.timestamps, [0.0, 0.033, 0.066])
+    assert log.faces.tolist() == [True, False, True]
+    np.testing.assert_array_equal(log.landmarks[0], make_landmarks(1.0))
+    np.testing.assert_array_equal(log.landmarks[1], make_landmarks(0.0))
+
+
+def test_more_frames_than_one_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(LandmarkRecorder, "BLOCK_SIZE", 4)
+    path = tmp_path / "landmarks.bin"
+    record(path, [(float(i), make_landmarks(i)) for i in range(11)])
+
+    log = LandmarkLog(str(path))
+    assert len(log) == 11
+    np.testing.assert_array_equal(log.timestamps, np.arange(11, dtype=np.float64))
+    assert log.landmarks[10, 0, 0] == 10.0
+
+
+def test_reopen_appends(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    record(path, [(0.0, make_landmarks(1.0))])
+    record(path, [(1.0, make_landmarks(2.0))])
+
+    log = LandmarkLog(str(path))
+    assert log.timestamps.tolist() == [0.0, 1.0]
+
+
+def test_reader_ignores_torn_tail(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    record(path, [(0.0, make_landmarks(1.0)), (1.0, make_landmarks(2.0))])
+    # Lần ghi bị ngắt giữa bản ghi thứ 3
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 17)
+
+    log = LandmarkLog(str(path))
+    assert len(log) == 2
+    assert log.timestamps.tolist() == [0.0, 1.0]
+
+
+def test_recorder_truncates_torn_tail_before_appending(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    record(path, [(0.0, make_landmarks(1.0))])
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 17)
+
+    record(path, [(1.0, make_landmarks(2.0))])
+
+    log = LandmarkLog(str(path))
+    assert log.timestamps.tolist() == [0.0, 1.0]
+    np.testing.assert_array_equal(log.landmarks[1], make_landmarks(2.0))
+    assert path.stat().st_size == HEADER_SIZE + 2 * log.dtype.itemsize
+
+
+def test_header_only_file_is_empty(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    record(path, [])
+    log = LandmarkLog(str(path))
+    assert len(log) == 0
+    assert log.faces.tolist() == []
+
+
+def test_invalid_files_rejected(tmp_path):
+    short = tmp_path / "short.bin"
+    short.write_bytes(b"DD")
+    with pytest.raises(ValueError):
+        LandmarkLog(str(short))
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"\x00" * (HEADER_SIZE + 64))
+    with pytest.raises(ValueError):
+        LandmarkLog(str(other))
+
+
+def test_recorder_refuses_different_point_count(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    record(path, [(0.0, make_landmarks(1.0))])
+    with pytest.raises(ValueError):
+        LandmarkRecorder(str(path), num_points=478)
+
+
+def test_close_is_idempotent_and_drops_late_writes(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    recorder = record(path, [(0.0, make_landmarks(1.0))])
+    recorder.write(1.0, make_landmarks(2.0))
+    recorder.close()
+    assert len(LandmarkLog(str(path))) == 1
+
+
+def test_recorder_rewrites_torn_header(tmp_path):
+    path = tmp_path / "landmarks.bin"
+    path.write_bytes(b"DDL")  # Bị ngắt giữa header
+
+    record(path, [(0.0, make_landmarks(1.0))])
+
+    log = LandmarkLog(str(path))
+    assert log.timestamps.tolist() == [0.0]
+    assert path.stat().st_size == HEADER_SIZE + log.dtype.itemsize
+
+
+def test_version_one_log_rejected(tmp_path):
+    # v1 có thêm cột "predicted" - kích thước bản ghi khác, không đọc nhầm
+    path = tmp_path / "old.bin"
+    path.write_bytes(struct.pack("<4sHHQ", b"DDLM", 1, 20, 0) + b"\x00" * 170)
+    with pytest.raises(ValueError):
+        LandmarkLog(str(path))
@@ -0,0 +1,90 @@
+"""
+Test MeshRenderer - polylines theo lớp phải giống vẽ từng cạnh bằng cv2.line
+"""
+import cv2
+import numpy as np
+import pytest
+
+from src.detection.mesh_renderer import MeshRenderer
+
+# Tập cạnh nhỏ thay cho kết nối FaceMesh (không cần mediapipe)
+EDGE_SETS = {
+    "tesselation": np.array([[0, 1], [1, 2], [2, 0], [0, 5]], dtype=np.int32),
+    "contours": np.array([[2, 3], [3, 4]], dtype=np.int32),
+    "irises": np.array([[7, 8]], dtype=np.int32),
+}
+COLORS = dict(MeshRenderer.LAYERS)
+
+
+@pytest.fixture(autouse=True)
+def edge_sets(monkeypatch):
+    monkeypatch.setattr(MeshRenderer, "_edge_sets", EDGE_SETS)
+
+
+def make_points(count: int = 9, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(10, 190, (count, 2)).astype(np.float32)
+
+
+def reference(points: np.ndarray, layers, scale: float = 1.0) -> np.ndarray:
+    """Vẽ từng cạnh một (cách cũ) trên toàn bộ landmarks"""
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    pixels = (points * scale).astype(np.int32)
+    for name in layers:
+        for a, b in EDGE_SETS[name]:
+            cv2.line(image, tuple(map(int, pixels[a])), tuple(map(int, pixels[b])),
+                     COLORS[name], 1)
+    return image
+
+
+@pytest.mark.parametrize("level, indices", [
+    ("full", [0, 1, 2, 3, 4, 5, 7, 8]),
+    ("lite", [2, 3, 4, 7, 8]),
+    ("off", []),
+])
+def test_point_indices_per_level(level, indices):
+    assert MeshRenderer(level).point_indices.tolist() == indices
+
+
+@pytest.mark.parametrize("level", ["full", "lite"])
+@pytest.mark.parametrize("scale", [1.0, 0.5])
+def test_draw_matches_per_edge_lines(level, scale):
+    renderer = MeshRenderer(level)
+    points = make_points()
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+
+    renderer.draw(image, points[renderer.point_indices], scale)
+
+    np.testing.assert_array_equal(
+        image, reference(points, MeshRenderer.LEVEL_LAYERS[level], scale))
+
+
+def test_missing_iris_points_skip_iris_layer():
+    renderer = MeshRenderer("full")
+    points = make_points()
+    # refine_landmarks=False: thiếu các điểm cuối (mống mắt)
+    available = renderer.point_indices[renderer.point_indices < 7]
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+
+    renderer.draw(image, points[available])
+
+    np.testing.assert_array_equal(image, reference(points, ("tesselation", "contours")))
+
+
+def test_off_level_draws_nothing():
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    MeshRenderer("off").draw(image, make_points())
+    assert not image.any()
+
+
+def test_invalid_level_falls_back_to_full():
+    assert MeshRenderer("medium").level == "full"
+
+
+def test_draw_eyes_marks_every_eye_point():
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    left, right = make_points(6, seed=1), make_points(6, seed=2)
+    MeshRenderer.draw_eyes(image, left, right, scale=0.5)
+
+    for x, y in (np.concatenate([left, right]) * 0.5).astype(np.int32):
+        assert tuple(image[y, x]) == MeshRenderer.EYE_COLOR
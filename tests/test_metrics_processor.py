@@ -0,0 +1,128 @@
+"""
+Test cửa sổ thời gian mắt nhắm / miệng há của MetricsProcessor
+"""
+import numpy as np
+import pytest
+
+from src.detection.metrics_processor import MetricsProcessor
+
+FPS = 30.0
+
+
+@pytest.fixture
+def processor(config_manager):
+    return MetricsProcessor(config_manager)
+
+
+def first_alert_frame(detect, value, jitter: float = 0.0):
+    """Frame (đếm từ 1) đầu tiên báo, timestamp lệch xen kẽ ±jitter"""
+    for frame in range(1, 100):
+        offset = jitter if frame % 2 else -jitter
+        if detect(value, (frame - 1) / FPS + offset):
+            return frame
+    return None
+
+
+@pytest.mark.parametrize("jitter", [0.0, 0.004])
+def test_frame_fallback_matches_old_counter(processor, jitter):
+    # Bộ đếm cũ báo ở frame nhắm mắt thứ consecutive_frames
+    assert first_alert_frame(processor.detect_drowsiness, 0.1, jitter) == 20
+    assert first_alert_frame(processor.detect_yawn, 0.9, jitter) == 20
+
+
+def test_open_eyes_reset_window(processor):
+    processor.detect_drowsiness(0.1, 0.0)
+    processor.detect_drowsiness(0.3, 0.5)
+    assert processor.eyes_closed_since is None
+    assert not processor.detect_drowsiness(0.1, 0.6)
+    assert processor.detect_drowsiness(0.1, 1.3)
+
+
+def test_skipped_calls_do_not_reset_window(processor):
+    # Frame đang ngáp / dự đoán không gọi detect_drowsiness - cửa sổ vẫn tiếp tục
+    processor.detect_drowsiness(0.1, 0.0)
+    assert processor.detect_drowsiness(0.1, 2.5)
+
+
+def test_yawn_pauses_closed_eye_window(processor):
+    # 1 frame nhắm mắt, ngáp 3 giây (không kiểm tra buồn ngủ), rồi nhắm mắt lại
+    processor.detect_drowsiness(0.1, 0.0)
+    for frame in range(1, 90):
+        processor.pause_drowsiness(frame / FPS)
+    assert not processor.detect_drowsiness(0.1, 3.0)
+
+    # Như bộ đếm cũ: frame thứ 20 tính cả frame trước khi ngáp
+    frames = [3.0 + k / FPS for k in range(1, 19)]
+    results = [processor.detect_drowsiness(0.1, t) for t in frames]
+    assert results == [False] * 17 + [True]
+
+
+def test_pause_without_closed_eyes_is_noop(processor):
+    processor.pause_drowsiness(0.0)
+    processor.detect_drowsiness(0.1, 2.0)
+    assert processor.eyes_closed_since == 2.0
+
+
+def test_short_face_loss_pauses_window(processor):
+    processor.detect_drowsiness(0.1, 0.0)
+    processor.mark_face_lost(1 / FPS)
+    processor.mark_face_lost(0.3)
+    processor.mark_face_found(0.45)
+    # 0.45 giây mất mặt không tính vào thời gian nhắm mắt (ngưỡng ~0.62 giây)
+    assert not processor.detect_drowsiness(0.1, 0.45)
+    assert processor.eyes_closed_since == pytest.approx(0.45 - 1 / FPS)
+
+
+def test_short_face_loss_pauses_mouth_window(processor):
+    processor.detect_yawn(0.9, 0.0)
+    processor.mark_face_lost(1 / FPS)
+    processor.mark_face_found(0.5)
+    assert not processor.detect_yawn(0.9, 0.5)
+
+
+def test_face_loss_during_pause_is_not_subtracted_twice(processor):
+    processor.detect_drowsiness(0.1, 0.0)
+    processor.pause_drowsiness(1 / FPS)
+    processor.mark_face_lost(0.2)
+    processor.mark_face_found(0.5)
+    processor.detect_drowsiness(0.1, 0.6)
+    assert processor.eyes_closed_since == pytest.approx(0.6 - 1 / FPS)
+
+
+def test_long_face_loss_restarts_windows(processor):
+    processor.detect_drowsiness(0.1, 0.0)
+    processor.detect_yawn(0.9, 0.0)
+    processor.mark_face_lost(0.1)
+    processor.mark_face_found(0.1 + MetricsProcessor.MAX_GAP + 0.1)
+    assert processor.eyes_closed_since is None
+    assert processor.mouth_open_since is None
+    assert not processor.detect_drowsiness(0.1, 1.3)
+
+
+def test_mark_face_found_without_loss_is_noop(processor):
+    processor.detect_drowsiness(0.1, 0.0)
+    processor.mark_face_found(5.0)
+    assert processor.eyes_closed_since == 0.0
+
+
+def test_yawn_then_closed_eyes_through_analyzer(config_manager):
+    from src.alert.alert_level import AlertLevel
+    from src.core.frame_analyzer import FrameAnalyzer
+
+    analyzer = FrameAnalyzer(config_manager)
+    landmarks = np.zeros((20, 2), dtype=np.float32)
+    landmarks[3] = (60.0, 0.0)  # Mắt rộng 60px -> quality 1.0
+
+    def run(ear, mar, start, count):
+        levels = []
+        for k in range(count):
+            analysis = analyzer.analyze_landmarks(landmarks, start + k / FPS, (ear, mar))
+            levels.append(analysis["alert_level"])
+        return levels
+
+    run(0.1, 0.2, 0.0, 1)                    # Nhắm mắt 1 frame
+    run(0.1, 0.9, 1 / FPS, 90)               # Ngáp 3 giây (mắt nhắm theo)
+    levels = run(0.1, 0.2, 91 / FPS, 10)     # Ngậm miệng, mắt vẫn nhắm
+    # Trước đây báo DROWSY ngay khi hết ngáp; giờ cần đủ ~0.6 giây mắt nhắm
+    assert AlertLevel.DROWSY not in levels
+    assert AlertLevel.DROWSY in run(0.1, 0.2, 101 / FPS, 30)
@@ -0,0 +1,69 @@
+"""
+Test OverlayCache - sprite khung cảnh báo phải giống hệt vẽ trực tiếp
+"""
+import numpy as np
+import pytest
+
+from src.alert.alert_level import AlertLevel
+from src.core import overlay
+from src.core.overlay import OverlayCache
+
+
+def make_frame(width: int = 640, height: int = 480, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("level", [AlertLevel.DROWSY, AlertLevel.FATIGUE])
+@pytest.mark.parametrize("size", [(640, 480), (1280, 720), (321, 241)])
+def test_cached_overlay_matches_direct_drawing(level, size):
+    expected = make_frame(*size)
+    actual = expected.copy()
+    overlay.draw_alert_box(expected, level)
+    OverlayCache().draw_alert_box(actual, level)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_no_alert_draws_nothing():
+    frame = make_frame()
+    original = frame.copy()
+    cache = OverlayCache()
+    cache.draw_alert_box(frame, AlertLevel.NONE)
+    np.testing.assert_array_equal(frame, original)
+    assert cache.renders == 0
+
+
+def test_sprite_rendered_once_per_level_and_size():
+    cache = OverlayCache()
+    for seed in range(3):
+        cache.draw_alert_box(make_frame(seed=seed), AlertLevel.DROWSY)
+        cache.draw_alert_box(make_frame(seed=seed), AlertLevel.FATIGUE)
+    assert cache.renders == 2
+
+    # Đổi kích thước frame -> render lại
+    frame = make_frame(800, 600)
+    expected = frame.copy()
+    cache.draw_alert_box(frame, AlertLevel.DROWSY)
+    overlay.draw_alert_box(expected, AlertLevel.DROWSY)
+    assert cache.renders == 3
+    np.testing.assert_array_equal(frame, expected)
+
+
+def test_invalidate_forces_render():
+    cache = OverlayCache()
+    cache.draw_alert_box(make_frame(), AlertLevel.DROWSY)
+    cache.invalidate()
+    cache.draw_alert_box(make_frame(), AlertLevel.DROWSY)
+    assert cache.renders == 2
+
+
+def test_mask_rects_cover_mask_exactly():
+    rng = np.random.default_rng(3)
+    mask = (rng.random((40, 60)) > 0.7).astype(np.uint8)
+    mask[10:20, 5:50] = 1
+
+    covered = np.zeros_like(mask)
+    for y0, y1, x0, x1 in overlay._mask_rects(mask):
+        assert not covered[y0:y1, x0:x1].any()  # Không chồng lên nhau
+        covered[y0:y1, x0:x1] = 1
+    np.testing.assert_array_equal(covered, mask)
@@ -0,0 +1,38 @@
+"""
+Test ParallelScorer - video chia cho process pool, lỗi của một video được gom lại
+"""
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from src.offline.parallel_scorer import ParallelScorer
+
+
+def write_video(path, num_frames: int):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (64, 48))
+    assert writer.isOpened()
+    for _ in range(num_frames):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+
+def test_results_and_errors_from_workers(tmp_path, config_manager):
+    first, second = tmp_path / "a.avi", tmp_path / "b.avi"
+    write_video(first, 4)
+    write_video(second, 2)
+    missing = str(tmp_path / "missing.avi")
+
+    results = []
+    scorer = ParallelScorer(config_manager.config_path, workers=2)
+    worker_stats = scorer.run([str(first), missing, str(second)], results.append)
+
+    # Kết quả về theo thứ tự hoàn thành, không theo thứ tự đầu vào
+    frames = {result["stats"]["video"]: len(result["frame"]) for result in results}
+    assert frames == {str(first): 4, str(second): 2}
+    assert scorer.errors == [missing]
+
+    assert sum(stats["clips"] for stats in worker_stats.values()) == 2
+    assert sum(stats["frames"] for stats in worker_stats.values()) == 6
+    assert set(worker_stats) == {result["stats"]["worker"] for result in results}
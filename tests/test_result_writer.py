@@ -0,0 +1,86 @@
+"""
+Test ResultWriter - .npz ghi dần qua file tạm, cột chuỗi lưu một lần, .csv
+"""
+import csv
+
+import numpy as np
+import pytest
+
+from src.offline.result_writer import SCORE_COLUMNS, ResultWriter
+
+
+def make_result(video: str, num_frames: int, ear: float = 0.3) -> dict:
+    return {
+        "video": np.full(num_frames, video),
+        "frame": np.arange(num_frames, dtype=np.int32),
+        "timestamp": np.arange(num_frames, dtype=np.float64) / 30.0,
+        "face": np.ones(num_frames, dtype=bool),
+        "ear": np.full(num_frames, ear, dtype=np.float32),
+        "mar": np.full(num_frames, 0.1, dtype=np.float32),
+        "alert": np.zeros(num_frames, dtype=np.int8),
+    }
+
+
+def test_npz_round_trip(tmp_path):
+    path = tmp_path / "scores.npz"
+    with ResultWriter(str(path), SCORE_COLUMNS) as writer:
+        writer.write(make_result("clips/a.mp4", 3, ear=0.3))
+        writer.write(make_result("clips/b.mp4", 2, ear=0.2))
+        writer.write(make_result("clips/a.mp4", 1, ear=0.1))
+    assert writer.rows_written == 6
+
+    data = np.load(str(path))
+    assert set(data.files) == set(SCORE_COLUMNS) | {"video_values"}
+    # Mỗi đường dẫn chỉ lưu một lần
+    assert data["video_values"].tolist() == ["clips/a.mp4", "clips/b.mp4"]
+    assert data["video"].dtype == np.int32
+    assert data["video_values"][data["video"]].tolist() == (
+        ["clips/a.mp4"] * 3 + ["clips/b.mp4"] * 2 + ["clips/a.mp4"])
+
+    assert data["frame"].tolist() == [0, 1, 2, 0, 1, 0]
+    assert data["ear"].dtype == np.float32
+    np.testing.assert_allclose(data["ear"], [0.3, 0.3, 0.3, 0.2, 0.2, 0.1])
+    assert data["alert"].dtype == np.int8
+
+
+def test_npz_streams_to_disk_before_close(tmp_path):
+    path = tmp_path / "scores.npz"
+    writer = ResultWriter(str(path), SCORE_COLUMNS)
+    writer.write(make_result("clips/a.mp4", 100))
+    # Dữ liệu đã nằm trong file tạm, không giữ lại array trong bộ nhớ
+    assert writer._spools["ear"].tell() == 100 * 4
+    assert not path.exists()
+    writer.close()
+
+    assert np.load(str(path))["ear"].shape == (100,)
+    assert writer._spools == {}
+
+
+def test_empty_npz(tmp_path):
+    path = tmp_path / "scores.npz"
+    ResultWriter(str(path), SCORE_COLUMNS).close()
+    data = np.load(str(path))
+    assert all(data[name].shape == (0,) for name in SCORE_COLUMNS)
+
+
+def test_csv_rows(tmp_path):
+    path = tmp_path / "scores.csv"
+    with ResultWriter(str(path), SCORE_COLUMNS) as writer:
+        writer.write(make_result("clips/a.mp4", 2))
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(SCORE_COLUMNS)
+    assert len(rows) == 3
+    assert rows[2][:2] == ["clips/a.mp4", "1"]
+
+
+def test_close_is_idempotent(tmp_path):
+    writer = ResultWriter(str(tmp_path / "scores.npz"), SCORE_COLUMNS)
+    writer.close()
+    writer.close()
+
+
+def test_unsupported_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResultWriter(str(tmp_path / "scores.json"), SCORE_COLUMNS)
@@ -0,0 +1,91 @@
+"""
+Test RollingStats (mean/std cửa sổ trượt) và P2Quantile (quantile streaming)
+"""
+import numpy as np
+import pytest
+
+from src.learning.running_stats import P2Quantile, RollingStats
+
+
+def test_rolling_stats_rejects_empty_window():
+    with pytest.raises(ValueError):
+        RollingStats(0)
+
+
+def test_rolling_stats_before_window_fills():
+    stats = RollingStats(10)
+    assert (stats.mean, stats.std) == (0.0, 0.0)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        stats.add(value)
+    assert stats.count == 4
+    assert stats.mean == pytest.approx(2.5)
+    assert stats.std == pytest.approx(np.std([1.0, 2.0, 3.0, 4.0]))
+
+
+def test_rolling_stats_matches_numpy_on_last_window():
+    rng = np.random.default_rng(0)
+    values = rng.normal(0.3, 0.05, 1000)
+    stats = RollingStats(100)
+    for value in values:
+        stats.add(value)
+
+    window = values[-100:]
+    assert stats.count == 100
+    assert stats.total == 1000
+    assert stats.mean == pytest.approx(window.mean(), abs=1e-12)
+    assert stats.std == pytest.approx(window.std(), abs=1e-9)
+
+
+def test_rolling_stats_resync_keeps_precision(monkeypatch):
+    monkeypatch.setattr(RollingStats, "RESYNC_INTERVAL", 50)
+    rng = np.random.default_rng(1)
+    # Giá trị lớn + phương sai nhỏ: dễ tích lũy sai số nếu không resync
+    values = 1e6 + rng.normal(0.0, 1e-3, 2000)
+    stats = RollingStats(64)
+    for value in values:
+        stats.add(value)
+    assert stats.std == pytest.approx(values[-64:].std(), rel=1e-3)
+
+
+def test_rolling_stats_reset():
+    stats = RollingStats(5)
+    for value in range(8):
+        stats.add(value)
+    stats.reset()
+    assert (stats.count, stats.total, stats.mean, stats.variance) == (0, 0, 0.0, 0.0)
+    stats.add(7.0)
+    assert stats.mean == 7.0
+
+
+@pytest.mark.parametrize("q", [0.0, 1.0, -0.5])
+def test_p2_rejects_invalid_quantile(q):
+    with pytest.raises(ValueError):
+        P2Quantile(q)
+
+
+def test_p2_with_few_samples_uses_exact_quantile():
+    estimator = P2Quantile(0.5)
+    assert estimator.value == 0.0
+    for value in (5.0, 1.0, 3.0):
+        estimator.add(value)
+    assert estimator.value == 3.0
+
+
+@pytest.mark.parametrize("q", [0.1, 0.5, 0.9])
+def test_p2_tracks_quantile_of_stream(q):
+    rng = np.random.default_rng(2)
+    values = rng.normal(0.28, 0.04, 5000)
+    estimator = P2Quantile(q)
+    for value in values:
+        estimator.add(value)
+    assert estimator.count == 5000
+    assert estimator.value == pytest.approx(np.quantile(values, q), abs=0.005)
+
+
+def test_p2_reset():
+    estimator = P2Quantile(0.5)
+    for value in range(20):
+        estimator.add(value)
+    estimator.reset()
+    assert estimator.count == 0
+    assert estimator.value == 0.0
@@ -0,0 +1,88 @@
+"""
+Test LatencyHistogram / StageTimer - percentile theo bins, reset, nhiều thread
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.stage_timer import LatencyHistogram, StageTimer
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.count == 0
+    assert histogram.percentile(99) == 0.0
+
+
+def test_percentile_is_upper_edge_of_bin():
+    histogram = LatencyHistogram(min_ms=1.0, max_ms=1000.0, bins=3)  # 1, 10, 100, 1000
+    for value in [2.0] * 50 + [20.0] * 45 + [200.0] * 5:
+        histogram.record(value)
+
+    assert histogram.percentile(50) == 10.0
+    assert histogram.percentile(95) == 100.0
+    # Không vượt quá mẫu lớn nhất
+    assert histogram.percentile(99) == 200.0
+    assert histogram.max_ms == 200.0
+    assert histogram.total_ms == pytest.approx(100.0 + 900.0 + 1000.0)
+
+
+def test_out_of_range_values():
+    histogram = LatencyHistogram(min_ms=1.0, max_ms=10.0, bins=1)
+    histogram.record(0.5)
+    assert histogram.percentile(50) == 1.0
+    histogram.record(50.0)
+    histogram.record(60.0)
+    assert histogram.percentile(99) == 60.0
+
+
+def test_percentile_error_bounded_by_bin_width():
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(mean=1.0, sigma=0.8, size=5000)
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(float(value))
+
+    ratio = histogram.edges[1] / histogram.edges[0]
+    for q in (50, 95, 99):
+        exact = np.percentile(samples, q)
+        assert exact <= histogram.percentile(q) <= exact * ratio * 1.001
+
+
+def test_snapshot_and_reset():
+    timer = StageTimer(stages=("inference", "total"))
+    timer.record("inference", 0.004)
+    timer.record("inference", 0.006)
+
+    snapshot = timer.snapshot()
+    assert set(snapshot) == {"inference", "total"}
+    assert snapshot["inference"]["count"] == 2
+    assert snapshot["inference"]["mean_ms"] == pytest.approx(5.0)
+    assert snapshot["inference"]["max_ms"] == pytest.approx(6.0)
+    assert snapshot["total"]["count"] == 0
+
+    timer.reset()
+    assert timer.snapshot()["inference"] == {
+        "count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+
+def test_unknown_stage_rejected():
+    with pytest.raises(KeyError):
+        StageTimer().record("not_a_stage", 0.001)
+
+
+def test_records_from_several_threads():
+    timer = StageTimer()
+
+    def worker():
+        for _ in range(1000):
+            timer.record("inference", 0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert timer.snapshot()["inference"]["count"] == 4000
@@ -0,0 +1,119 @@
+"""
+Test khởi động nhanh - import nhẹ, EngineLoader và nút START khi import engine lỗi
+"""
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("cv2", "mediapipe", "pygame", "PyQt5")
+
+
+def test_packages_do_not_import_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "import src.config, src.alert, src.detection, src.offline, src.core\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+class Signal:
+    """pyqtSignal tối giản cho FakeLoader"""
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class FakeLoader:
+    """EngineLoader giả: không import gì, test tự emit loaded/failed"""
+
+    instances = []
+
+    def __init__(self):
+        self.loaded = Signal()
+        self.failed = Signal()
+        self.started = False
+        FakeLoader.instances.append(self)
+
+    def start(self):
+        self.started = True
+
+    def isRunning(self):
+        return False
+
+    def wait(self):
+        pass
+
+
+@pytest.fixture
+def qt(monkeypatch):
+    pytest.importorskip("PyQt5")
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def test_engine_loader_reports_import_time(qt, monkeypatch):
+    from src.interface import engine_loader
+
+    fake_module = types.SimpleNamespace(DetectionEngine=object)
+    monkeypatch.setattr(engine_loader.importlib, "import_module", lambda *args: fake_module)
+    loader = engine_loader.EngineLoader()
+    loaded = []
+    loader.loaded.connect(lambda cls, ms: loaded.append((cls, ms)))
+    loader.run()
+
+    assert loaded[0][0] is object
+    assert loaded[0][1] >= 0.0
+
+
+def test_engine_loader_reports_failure(qt, monkeypatch):
+    from src.interface import engine_loader
+
+    def broken_import(*args):
+        raise ImportError("No module named 'mediapipe'")
+
+    monkeypatch.setattr(engine_loader.importlib, "import_module", broken_import)
+    loader = engine_loader.EngineLoader()
+    errors = []
+    loader.failed.connect(errors.append)
+    loader.run()
+
+    assert len(errors) == 1 and "mediapipe" in errors[0]
+
+
+def test_failed_engine_load_offers_retry(qt, monkeypatch, config_manager):
+    from src.interface import main_window
+
+    monkeypatch.setattr(FakeLoader, "instances", [])
+    monkeypatch.setattr(main_window, "EngineLoader", FakeLoader)
+    errors = []
+    monkeypatch.setattr(main_window.QMessageBox, "critical",
+                        lambda parent, title, text: errors.append(text))
+
+    window = main_window.MainWindow(config_manager)
+    button = window.start_stop_btn
+    assert button.text() == "LOADING..." and not button.isEnabled()
+
+    FakeLoader.instances[0].failed.emit("Không load được detection engine: boom")
+    assert errors == ["Không load được detection engine: boom"]
+    assert button.text() == "RETRY" and button.isEnabled()
+
+    # Bấm RETRY -> import lại
+    button.click()
+    assert len(FakeLoader.instances) == 2 and FakeLoader.instances[1].started
+    assert button.text() == "LOADING..." and not button.isEnabled()
+    window.close()
@@ -0,0 +1,85 @@
+"""
+Test StateChangeFilter (emit khi đổi) và MetricsSnapshot (gộp metrics theo tần số UI)
+"""
+import pytest
+
+from src.core import state_store
+from src.core.state_store import MetricsSnapshot, StateChangeFilter
+
+
+class FakeClock:
+    """time.monotonic giả, tiến thủ công"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(state_store.time, "monotonic", fake)
+    return fake
+
+
+def test_filter_reports_only_changes():
+    state = StateChangeFilter()
+    assert state.changed("face", True)
+    assert not state.changed("face", True)
+    assert state.changed("face", False)
+    assert state.changed("status", ("Normal", "#4CAF50"))
+    assert not state.changed("status", ("Normal", "#4CAF50"))
+
+
+def test_filter_keys_are_independent():
+    state = StateChangeFilter()
+    state.changed("face", True)
+    assert state.changed("alert", True)
+    assert not state.changed("face", True)
+
+
+def test_filter_reset_emits_again():
+    state = StateChangeFilter()
+    state.changed("face", True)
+    state.reset()
+    assert state.changed("face", True)
+
+
+def test_snapshot_empty_until_published():
+    snapshot = MetricsSnapshot(rate=5.0)
+    assert snapshot.read() == (None, 0)
+    assert snapshot.due()
+
+
+def test_snapshot_rate_limit(clock):
+    snapshot = MetricsSnapshot(rate=5.0)
+    snapshot.publish({"ear": 0.3})
+    assert not snapshot.due()
+
+    clock.now += 0.15
+    assert not snapshot.due()
+    clock.now += 0.1
+    assert snapshot.due()
+
+    snapshot.publish({"ear": 0.2})
+    assert snapshot.read() == ({"ear": 0.2}, 2)
+
+
+def test_snapshot_zero_rate_publishes_every_frame(clock):
+    snapshot = MetricsSnapshot(rate=0)
+    snapshot.publish({"ear": 0.3})
+    assert snapshot.due()
+
+
+def test_snapshot_clear_bumps_version_and_resets_due(clock):
+    snapshot = MetricsSnapshot(rate=5.0)
+    snapshot.publish({"ear": 0.3})
+    snapshot.clear()
+
+    metrics, version = snapshot.read()
+    assert metrics is None
+    assert version == 2
+    # Phiên mới publish ngay ở frame đầu tiên
+    assert snapshot.due()
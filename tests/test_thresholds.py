@@ -0,0 +1,107 @@
+"""
+Test Thresholds.from_config và snapshot ngưỡng của ConfigManager
+"""
+import pytest
+
+from src.config.thresholds import Thresholds
+
+
+class FakeConfig:
+    """Chỉ có get(path, default) như ConfigManager"""
+
+    def __init__(self, values: dict):
+        self.values = values
+
+    def get(self, path: str, default=None):
+        return self.values.get(path, default)
+
+
+@pytest.fixture
+def settings():
+    return {
+        "thresholds": {"ear": 0.21, "mar": 0.55, "blink": 0.22, "yawn": 0.7},
+        "consecutive_frames": {"drowsiness": 20, "yawn": 20, "blink": 3},
+        "durations": {"drowsiness": 1.5, "yawn": None},
+        "camera": {"index": 0, "fps": 30},
+        "display": {"show_fps": False},
+    }
+
+
+def test_defaults_when_config_is_empty():
+    thresholds = Thresholds.from_config(FakeConfig({}))
+    assert thresholds.ear == 0.25
+    assert thresholds.mar == 0.6
+    assert thresholds.drowsiness_frames == 20
+    assert thresholds.show_fps is True
+
+
+def test_explicit_durations_are_used_as_is():
+    thresholds = Thresholds.from_config(FakeConfig({
+        "durations.drowsiness": 2, "durations.yawn": 0.75}))
+    assert thresholds.drowsiness_seconds == 2.0
+    assert isinstance(thresholds.drowsiness_seconds, float)
+    assert thresholds.yawn_seconds == 0.75
+
+
+@pytest.mark.parametrize("frames, fps, expected", [
+    (20, 30, 18.5 / 30),
+    (15, 60, 13.5 / 60),
+    (1, 30, 0.0),
+    (0, 30, 0.0),
+])
+def test_frame_fallback_converts_without_extra_frame(frames, fps, expected):
+    thresholds = Thresholds.from_config(FakeConfig({
+        "consecutive_frames.drowsiness": frames, "consecutive_frames.yawn": frames,
+        "camera.fps": fps}))
+    assert thresholds.drowsiness_seconds == pytest.approx(expected)
+    assert thresholds.yawn_seconds == pytest.approx(expected)
+
+
+def test_frame_fallback_with_missing_fps():
+    thresholds = Thresholds.from_config(FakeConfig({"camera.fps": 0}))
+    assert thresholds.drowsiness_seconds == pytest.approx(18.5 / 30)
+
+
+def test_snapshot_loaded_from_file(config_manager):
+    thresholds = config_manager.thresholds
+    assert thresholds.ear == 0.21
+    assert thresholds.yawn == 0.7
+    assert thresholds.show_fps is False
+    assert thresholds.drowsiness_seconds == 1.5
+    assert thresholds.yawn_seconds == pytest.approx(18.5 / 30)
+
+
+def test_set_many_publishes_one_new_snapshot(config_manager):
+    before = config_manager.thresholds
+    config_manager.set_many({"thresholds.ear": 0.19, "thresholds.mar": 0.5})
+    after = config_manager.thresholds
+
+    assert after is not before
+    assert (after.ear, after.mar) == (0.19, 0.5)
+    # Snapshot cũ không bị sửa (thread khác có thể đang đọc)
+    assert (before.ear, before.mar) == (0.21, 0.55)
+
+
+def test_unrelated_change_keeps_snapshot(config_manager):
+    before = config_manager.thresholds
+    config_manager.set("camera.index", 1)
+    assert config_manager.thresholds is before
+
+    config_manager.set("thresholds.ear", 0.21)  # Giá trị không đổi
+    assert config_manager.thresholds is before
+
+
+def test_parent_path_change_republishes(config_manager):
+    config_manager.set("thresholds", {"ear": 0.3, "mar": 0.5, "blink": 0.2, "yawn": 0.6})
+    assert config_manager.thresholds.ear == 0.3
+    assert config_manager.thresholds.yawn == 0.6
+
+
+def test_duration_change_republishes(config_manager):
+    config_manager.set("durations", {"drowsiness": 3.0, "yawn": 1.0})
+    assert config_manager.thresholds.drowsiness_seconds == 3.0
+    assert config_manager.thresholds.yawn_seconds == 1.0
+
+    config_manager.set("camera.fps", 60)
+    config_manager.set("durations.yawn", None)
+    assert config_manager.thresholds.yawn_seconds == pytest.approx(18.5 / 60)
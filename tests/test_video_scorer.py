@@ -0,0 +1,68 @@
+"""
+Test VideoScorer - chấm điểm file video, FaceMesh được tạo lại cho mỗi video
+"""
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from src.detection.face_detector import FaceDetector
+from src.offline.video_scorer import VideoScorer
+
+
+class FakeConfig:
+    def get(self, path: str, default=None):
+        return default
+
+
+def write_video(path, num_frames: int, fps: float = 10.0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    assert writer.isOpened()
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+
+def test_reset_recreates_face_mesh(fake_face_mesh):
+    detector = FaceDetector(max_num_faces=1, min_tracking_confidence=0.7)
+    first = detector.face_mesh
+    detector._roi = (0, 0, 10, 10)
+
+    detector.reset()
+
+    assert first.closed
+    assert detector.face_mesh is not first
+    assert detector.face_mesh.options == first.options
+    assert detector._roi is None
+
+
+def test_score_columns_and_fresh_graph_per_video(tmp_path, fake_face_mesh):
+    first, second = tmp_path / "a.avi", tmp_path / "b.avi"
+    write_video(first, 5)
+    write_video(second, 3)
+
+    scorer = VideoScorer(FakeConfig())
+    result_a = scorer.score(str(first))
+    result_b = scorer.score(str(second))
+    scorer.release()
+
+    assert result_a["stats"]["frames"] == 5
+    assert result_a["frame"].tolist() == [0, 1, 2, 3, 4]
+    np.testing.assert_allclose(result_a["timestamp"], np.arange(5) / 10.0)
+    assert not result_a["face"].any()
+    assert np.isnan(result_a["ear"]).all()
+    assert (result_a["alert"] == -1).all()
+    assert set(result_b["video"].tolist()) == {str(second)}
+
+    # Một graph khi khởi tạo + một graph mới cho mỗi video
+    graphs = fake_face_mesh.created
+    assert len(graphs) == 3
+    assert [len(graph.inputs) for graph in graphs] == [0, 5, 3]
+    assert all(graph.closed for graph in graphs)
+
+
+def test_missing_video_raises(tmp_path, fake_face_mesh):
+    scorer = VideoScorer(FakeConfig())
+    with pytest.raises(IOError):
+        scorer.score(str(tmp_path / "missing.mp4"))